@@ -0,0 +1,40 @@
+"""Synthetic inputs for benchmarking the geometry plugins.
+
+Geometries are laid out on a jittered grid in EPSG:5070-like
+coordinates so that footprints and address points overlap in
+roughly the same way they do within a dense county.
+"""
+
+import numpy as np
+import polars as pl
+import shapely
+
+ORIGIN = (-2_200_000.0, 1_500_000.0)
+SPACING = 25.0
+
+
+def _grid(n: int, rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    side = int(np.ceil(np.sqrt(n)))
+    i = np.arange(n)
+    x = ORIGIN[0] + (i % side) * SPACING + rng.uniform(-2.0, 2.0, n)
+    y = ORIGIN[1] + (i // side) * SPACING + rng.uniform(-2.0, 2.0, n)
+    return x, y
+
+
+def footprints(n: int, *, seed: int = 0) -> pl.Series:
+    """Square footprints of 8 to 16 metres on a side, as WKB."""
+    rng = np.random.default_rng(seed)
+    x, y = _grid(n, rng)
+    half = rng.uniform(4.0, 8.0, n)
+    geoms = shapely.box(x - half, y - half, x + half, y + half)
+    return pl.Series("geometry", shapely.to_wkb(geoms), dtype=pl.Binary())
+
+
+def addresses(n: int, *, seed: int = 1) -> pl.Series:
+    """Address points scattered around the footprint grid, as WKB."""
+    rng = np.random.default_rng(seed)
+    x, y = _grid(n, rng)
+    x += rng.uniform(-10.0, 10.0, n)
+    y += rng.uniform(-10.0, 10.0, n)
+    geoms = shapely.points(x, y)
+    return pl.Series("geometry", shapely.to_wkb(geoms), dtype=pl.Binary())
@@ -0,0 +1,107 @@
+"""Benchmark bbox-scoped scans of conform outputs.
+
+The same synthetic footprints are written in generation order and in
+the layout of `conform_save` (Hilbert ordered, with bounding box
+columns and small row groups). Random bbox queries are then scanned
+from each file with `intersects_bbox` as the predicate:
+
+    python benchmarks/bench_bbox.py --rows 1000000 --queries 50
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+import shapely
+
+from bear.expr._geometry import hilbert, intersects_bbox
+
+from _data import footprints
+
+
+def with_bbox(geometry: pl.Series) -> pl.DataFrame:
+    # Bounds are computed with shapely so that only the file layout,
+    # and not the plugins, is measured.
+    bounds = shapely.bounds(shapely.from_wkb(geometry.to_numpy()))
+    return pl.DataFrame(
+        {
+            "id": np.arange(len(geometry)).astype(str),
+            "xmin": bounds[:, 0],
+            "ymin": bounds[:, 1],
+            "xmax": bounds[:, 2],
+            "ymax": bounds[:, 3],
+            "geometry": geometry,
+        }
+    )
+
+
+def timeit(path: Path, queries: list[tuple], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for bbox in queries:
+            pl.scan_parquet(path).filter(intersects_bbox(bbox)).collect()
+        best = min(best, time.perf_counter() - start)
+
+    return best / len(queries)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=250_000)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--size", type=float, default=500.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    # As `bear.cli.conform.ROW_GROUP_SIZE`
+    parser.add_argument("--row-group-size", type=int, default=16_384)
+    args = parser.parse_args()
+
+    # Shuffled, as providers give no particular spatial order
+    frame = with_bbox(footprints(args.rows)).sample(
+        fraction=1.0, shuffle=True, seed=0
+    )
+    bounds = (
+        frame["xmin"].min(),
+        frame["ymin"].min(),
+        frame["xmax"].max(),
+        frame["ymax"].max(),
+    )
+
+    rng = np.random.default_rng(0)
+    queries = [
+        (x, y, x + args.size, y + args.size)
+        for x, y in zip(
+            rng.uniform(bounds[0], bounds[2] - args.size, args.queries),
+            rng.uniform(bounds[1], bounds[3] - args.size, args.queries),
+        )
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        before = Path(tmp) / "before.parquet"
+        frame.write_parquet(before, compression="zstd")
+
+        after = Path(tmp) / "after.parquet"
+        frame.sort(
+            hilbert(
+                (pl.col("xmin") + pl.col("xmax")) / 2,
+                (pl.col("ymin") + pl.col("ymax")) / 2,
+                bounds,
+            )
+        ).write_parquet(
+            after,
+            compression="zstd",
+            statistics=True,
+            row_group_size=args.row_group_size,
+        )
+
+        print(f"{'layout':<12}{'rows':>12}{'ms/query':>12}")
+        for name, path in (("before", before), ("after", after)):
+            seconds = timeit(path, queries, args.repeat)
+            print(f"{name:<12}{args.rows:>12}{seconds * 1e3:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Benchmark bbox-scoped scans of conflated entities.
+
+The same synthetic entities are written in arbitrary order with default
+row groups, and in the layout of `entities_output` (Hilbert ordered on
+`x`/`y`, with small row groups). Random bbox queries of several sizes
+are then scanned from each file as filters on `x` and `y`:
+
+    python benchmarks/bench_entities.py --rows 1000000 --sizes 100 1000
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+import shapely
+
+from bear.expr._geometry import hilbert
+
+from _data import addresses
+
+
+def entities(n: int) -> pl.DataFrame:
+    xy = shapely.get_coordinates(shapely.from_wkb(addresses(n).to_numpy()))
+    return pl.DataFrame(
+        {
+            "id": np.arange(n).astype(str),
+            "classification": "residential",
+            "x": xy[:, 0],
+            "y": xy[:, 1],
+        }
+    )
+
+
+def within(bbox: tuple[float, float, float, float]) -> pl.Expr:
+    xmin, ymin, xmax, ymax = bbox
+    return pl.col("x").is_between(xmin, xmax) & pl.col("y").is_between(
+        ymin, ymax
+    )
+
+
+def timeit(path: Path, queries: list[tuple], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for bbox in queries:
+            pl.scan_parquet(path).filter(within(bbox)).collect()
+        best = min(best, time.perf_counter() - start)
+
+    return best / len(queries)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument(
+        "--sizes", type=float, nargs="+", default=[100.0, 1000.0, 5000.0]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    # As `bear.cli.conflate.ROW_GROUP_SIZE`
+    parser.add_argument("--row-group-size", type=int, default=16_384)
+    args = parser.parse_args()
+
+    # Shuffled, as conflation gives no particular spatial order
+    frame = entities(args.rows).sample(fraction=1.0, shuffle=True, seed=0)
+    bounds = (
+        frame["x"].min(),
+        frame["y"].min(),
+        frame["x"].max(),
+        frame["y"].max(),
+    )
+
+    rng = np.random.default_rng(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        before = Path(tmp) / "before.parquet"
+        frame.write_parquet(before)
+
+        after = Path(tmp) / "after.parquet"
+        frame.sort(hilbert(pl.col("x"), pl.col("y"), bounds)).write_parquet(
+            after, statistics=True, row_group_size=args.row_group_size
+        )
+
+        print(f"{'layout':<12}{'size':>12}{'rows':>12}{'ms/query':>12}")
+        for size in args.sizes:
+            queries = [
+                (x, y, x + size, y + size)
+                for x, y in zip(
+                    rng.uniform(bounds[0], bounds[2] - size, args.queries),
+                    rng.uniform(bounds[1], bounds[3] - size, args.queries),
+                )
+            ]
+
+            for name, path in (("before", before), ("after", after)):
+                seconds = timeit(path, queries, args.repeat)
+                print(
+                    f"{name:<12}{size:>12.0f}{args.rows:>12}"
+                    f"{seconds * 1e3:>12.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
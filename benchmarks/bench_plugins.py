@@ -0,0 +1,70 @@
+"""Benchmark the geometry plugin functions in `bear._plugins`.
+
+Each plugin is evaluated over synthetic footprints/address points
+and the best wall time over a number of repeats is reported. Run
+against two builds of the extension to compare them:
+
+    python benchmarks/bench_plugins.py --rows 1000000 --repeat 5
+
+Plus code encoding of a million points has its own benchmark in
+`bench_pluscodes.py`.
+"""
+
+import argparse
+import time
+
+import polars as pl
+
+import bear._plugins as udf
+
+from _data import addresses, footprints
+
+
+def timeit(frame: pl.DataFrame, expr: pl.Expr, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        frame.select(expr)
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=250_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    frame = pl.DataFrame(
+        {
+            "footprint": footprints(args.rows),
+            "address": addresses(args.rows),
+        }
+    )
+
+    cases = {
+        "area": udf.area("footprint"),
+        "centroid_x": udf.centroid_x("footprint"),
+        "centroid_y": udf.centroid_y("footprint"),
+        "centroid_xy": udf.centroid_xy("footprint"),
+        "centroid": udf.centroid("footprint"),
+        "pluscodes": udf.pluscodes("footprint"),
+        "pluscodes_points": udf.pluscodes("address"),
+        "explode_multipolygon": udf.explode_multipolygon("footprint"),
+        "explode_multipoint": udf.explode_multipoint("address"),
+        "intersection": udf.intersection("footprint", "footprint"),
+        "distance": udf.distance("address", "footprint"),
+        "intersects": udf.intersects("footprint", "footprint"),
+        "nearest": udf.nearest("address", "footprint"),
+        "nearest_one": udf.nearest_one("address", "footprint"),
+    }
+
+    print(f"{'function':<24}{'rows':>12}{'seconds':>12}")
+    for name, expr in cases.items():
+        elapsed = timeit(frame, expr, args.repeat)
+        print(f"{name:<24}{args.rows:>12}{elapsed:>12.4f}")
+
+
+if __name__ == "__main__":
+    main()
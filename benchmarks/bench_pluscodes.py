@@ -0,0 +1,56 @@
+"""Benchmark plus code encoding of a million address points.
+
+`bear._plugins.pluscodes` is evaluated over synthetic address points
+(and footprints, whose centroids are encoded), and the best wall time
+over a number of repeats is reported along with the throughput. Run
+against two builds of the extension to compare them:
+
+    python benchmarks/bench_pluscodes.py --repeat 5
+"""
+
+import argparse
+import time
+
+import polars as pl
+
+import bear._plugins as udf
+
+from _data import addresses, footprints
+
+
+def timeit(frame: pl.DataFrame, expr: pl.Expr, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        codes = frame.select(expr).to_series()
+        best = min(best, time.perf_counter() - start)
+
+    # Every synthetic geometry is valid, so each has a plus code
+    assert codes.null_count() == 0
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    frame = pl.DataFrame(
+        {
+            "address": addresses(args.rows),
+            "footprint": footprints(args.rows),
+        }
+    )
+
+    print(f"{'input':<12}{'rows':>12}{'seconds':>12}{'rows/s':>14}")
+    for name in ("address", "footprint"):
+        elapsed = timeit(frame, udf.pluscodes(name), args.repeat)
+        print(
+            f"{name:<12}{args.rows:>12}{elapsed:>12.4f}"
+            f"{args.rows / elapsed:>14,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark thread scaling of the spatial join plugins.
+
+The plugins run on the Polars thread pool, which is sized once per
+process from `POLARS_MAX_THREADS`. Each thread count is therefore
+measured in a fresh interpreter:
+
+    python benchmarks/bench_threads.py --rows 1000000 --max-threads 16
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import polars as pl
+
+import bear._plugins as udf
+
+from _data import addresses, footprints
+
+
+def run(rows: int, repeat: int) -> None:
+    frame = pl.DataFrame(
+        {
+            "footprint": footprints(rows),
+            "address": addresses(rows),
+        }
+    )
+
+    cases = {
+        "intersects": udf.intersects("footprint", "footprint"),
+        "nearest": udf.nearest("address", "footprint"),
+    }
+
+    for name, expr in cases.items():
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            frame.select(expr)
+            best = min(best, time.perf_counter() - start)
+
+        print(f"{name} {best}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=250_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-threads", type=int, default=os.cpu_count())
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run(args.rows, args.repeat)
+        return
+
+    threads = [1]
+    while threads[-1] * 2 <= args.max_threads:
+        threads.append(threads[-1] * 2)
+    if threads[-1] != args.max_threads:
+        threads.append(args.max_threads)
+
+    baseline: dict[str, float] = {}
+    print(f"{'function':<16}{'threads':>8}{'seconds':>12}{'speedup':>10}")
+    for n in threads:
+        output = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--worker",
+                f"--rows={args.rows}",
+                f"--repeat={args.repeat}",
+            ],
+            env={**os.environ, "POLARS_MAX_THREADS": str(n)},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+
+        for line in output.splitlines():
+            name, elapsed = line.split()
+            seconds = float(elapsed)
+            baseline.setdefault(name, seconds)
+            speedup = baseline[name] / seconds
+            print(f"{name:<16}{n:>8}{seconds:>12.4f}{speedup:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Any, Iterator, Optional
+from uuid import uuid4
 
+import polars as pl
 from polars import Expr
 from polars.plugins import register_plugin_function
 from polars._typing import IntoExpr
@@ -7,20 +11,62 @@ from polars._typing import IntoExpr
 PLUGIN_PATH = Path(__file__).parent.parent
 
 
-def intersects(lhs: IntoExpr, rhs: IntoExpr) -> Expr:
+def _index_kwargs(
+    index: Optional[Path], stamp: Optional[str] = None
+) -> dict[str, Any]:
+    # The right-hand spatial index is memory-mapped from `index` if it
+    # exists and matches the right operand, and written there otherwise.
+    # With a `stamp` (a content digest of the data the right operand was
+    # read from), the stored index is matched on the stamp alone instead
+    # of on the bounding boxes of every right geometry.
+    return {"index": None if index is None else str(index), "stamp": stamp}
+
+
+def intersects(
+    lhs: IntoExpr,
+    rhs: IntoExpr,
+    *,
+    index: Optional[Path] = None,
+    stamp: Optional[str] = None,
+) -> Expr:
     return register_plugin_function(
         plugin_path=PLUGIN_PATH,
         function_name="binary_intersects_aggregate",
         args=[lhs, rhs],
+        kwargs=_index_kwargs(index, stamp),
         is_elementwise=False,
     )
 
 
-def nearest(lhs: IntoExpr, rhs: IntoExpr) -> Expr:
+def nearest(
+    lhs: IntoExpr,
+    rhs: IntoExpr,
+    *,
+    index: Optional[Path] = None,
+    stamp: Optional[str] = None,
+) -> Expr:
     return register_plugin_function(
         plugin_path=PLUGIN_PATH,
         function_name="binary_nearest_aggregate",
         args=[lhs, rhs],
+        kwargs=_index_kwargs(index, stamp),
+        is_elementwise=False,
+    )
+
+
+def nearest_one(
+    lhs: IntoExpr,
+    rhs: IntoExpr,
+    *,
+    max_distance: float = 10.0,
+    index: Optional[Path] = None,
+    stamp: Optional[str] = None,
+) -> Expr:
+    return register_plugin_function(
+        plugin_path=PLUGIN_PATH,
+        function_name="binary_nearest_top1",
+        args=[lhs, rhs],
+        kwargs={"max_distance": max_distance, **_index_kwargs(index, stamp)},
         is_elementwise=False,
     )
 
@@ -70,6 +116,24 @@ def centroid_y(expr: IntoExpr) -> Expr:
     )
 
 
+def centroid_xy(expr: IntoExpr) -> Expr:
+    return register_plugin_function(
+        plugin_path=PLUGIN_PATH,
+        function_name="unary_centroid_xy",
+        args=expr,
+        is_elementwise=True,
+    )
+
+
+def bounds(expr: IntoExpr) -> Expr:
+    return register_plugin_function(
+        plugin_path=PLUGIN_PATH,
+        function_name="unary_bounds",
+        args=expr,
+        is_elementwise=True,
+    )
+
+
 def centroid(expr: IntoExpr) -> Expr:
     return register_plugin_function(
         plugin_path=PLUGIN_PATH,
@@ -106,3 +170,133 @@ def pluscodes(expr: IntoExpr) -> Expr:
         args=expr,
         is_elementwise=True,
     )
+
+
+def to_wkb(expr: IntoExpr) -> Expr:
+    return register_plugin_function(
+        plugin_path=PLUGIN_PATH,
+        function_name="unary_to_wkb",
+        args=expr,
+        is_elementwise=True,
+    )
+
+
+def overlaps(
+    lhs: IntoExpr,
+    rhs: IntoExpr,
+    *,
+    threshold: float = 0.3,
+    index: Optional[Path] = None,
+    stamp: Optional[str] = None,
+    areas: Optional[tuple[IntoExpr, IntoExpr]] = None,
+    min_right: Optional[IntoExpr] = None,
+) -> Expr:
+    # Left rows are only paired with right rows from `min_right` onwards
+    return register_plugin_function(
+        plugin_path=PLUGIN_PATH,
+        function_name="binary_overlaps_aggregate",
+        args=[
+            lhs,
+            rhs,
+            *(areas or ()),
+            *(() if min_right is None else (min_right,)),
+        ],
+        kwargs={
+            "threshold": threshold,
+            "min_right": min_right is not None,
+            **_index_kwargs(index, stamp),
+        },
+        is_elementwise=False,
+        changes_length=True,
+    )
+
+
+def broadcast_register(
+    expr: IntoExpr,
+    *,
+    token: str,
+    index: Optional[Path] = None,
+    stamp: Optional[str] = None,
+) -> Expr:
+    return register_plugin_function(
+        plugin_path=PLUGIN_PATH,
+        function_name="unary_broadcast_register",
+        args=expr,
+        kwargs={"token": token, **_index_kwargs(index, stamp)},
+        is_elementwise=False,
+        returns_scalar=True,
+        is_deterministic=False,
+    )
+
+
+def broadcast_release(token: IntoExpr) -> Expr:
+    return register_plugin_function(
+        plugin_path=PLUGIN_PATH,
+        function_name="unary_broadcast_release",
+        args=token,
+        is_elementwise=True,
+        is_deterministic=False,
+    )
+
+
+@contextmanager
+def broadcast(
+    geometry: pl.Series,
+    *,
+    index: Optional[Path] = None,
+    stamp: Optional[str] = None,
+) -> Iterator[str]:
+    """Index `geometry` once as the right-hand side of broadcast joins.
+
+    Yields a token referring to the indexed geometries, which the
+    `*_broadcast` plugins take in place of a right-hand column. Since
+    those plugins are elementwise in the left-hand side, they run under
+    the streaming engine. The index is released on exit.
+    """
+    token = uuid4().hex
+    geometry.to_frame().select(
+        broadcast_register(pl.first(), token=token, index=index, stamp=stamp)
+    )
+
+    try:
+        yield token
+    finally:
+        pl.select(broadcast_release(pl.lit(token)))
+
+
+def nearest_broadcast(expr: IntoExpr, *, token: str) -> Expr:
+    return register_plugin_function(
+        plugin_path=PLUGIN_PATH,
+        function_name="binary_nearest_broadcast",
+        args=expr,
+        kwargs={"token": token, "index": None},
+        is_elementwise=True,
+    )
+
+
+def nearest_one_broadcast(
+    expr: IntoExpr, *, token: str, max_distance: float = 10.0
+) -> Expr:
+    return register_plugin_function(
+        plugin_path=PLUGIN_PATH,
+        function_name="binary_nearest_top1_broadcast",
+        args=expr,
+        kwargs={"token": token, "max_distance": max_distance},
+        is_elementwise=True,
+    )
+
+
+def overlaps_broadcast(
+    expr: IntoExpr,
+    *,
+    token: str,
+    threshold: float = 0.3,
+    min_right: Optional[IntoExpr] = None,
+) -> Expr:
+    return register_plugin_function(
+        plugin_path=PLUGIN_PATH,
+        function_name="binary_overlaps_broadcast",
+        args=[expr, *(() if min_right is None else (min_right,))],
+        kwargs={"token": token, "threshold": threshold},
+        is_elementwise=True,
+    )
@@ -1,41 +1,189 @@
 import polars as pl
+import pyarrow.parquet as pq
 
-from prefect import flow, task
+from prefect import flow, get_run_logger, task
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
+from functools import partial
 from pathlib import Path
-from typing import Tuple, TypeVar
+from typing import Callable, Final, Optional, Sequence, Tuple, TypeVar
 
-from bear._plugins import centroid_x, centroid_y
+from bear._plugins import broadcast, to_wkb
+from bear.core import geoparquet, schema
 from bear.core.fips import FIPS, USCounty
+from bear.core.manifest import Manifest
+from bear.core.planner import ExecutionPlan, ProviderSize, plan
+from bear.core.profile import Profiler, collect, collect_all, max_rss
+from bear.expr._address import NORMALIZER_VERSION, AddressCache
 from bear.expr._correspondence import (
     merge_footprints_and_addresses,
+    multi_correspondence,
+    sc_merge_finalize,
+    sc_merge_match,
     spatial_correspondence,
 )
+from bear.expr._geometry import bbox_struct, centroid_xy, has_derived, hilbert
+from bear.expr._tiling import TileGrid, tiled
 from bear.providers import ProviderKind
 
+# Overlap between tiles, in meters. This covers the extent of large
+# footprints, plus the distance within which addresses are matched.
+TILE_HALO: Final = 500.0
+
+# Version of the conflation outputs, recorded in each county manifest.
+# Increment whenever correspondence thresholds or outputs change, so
+# that unchanged counties are recomputed.
+CONFLATE_VERSION: Final = 2
+
+# Rows per row group of the entities and footprints outputs, which are
+# Hilbert ordered so that each row group covers a compact area.
+ROW_GROUP_SIZE: Final = 16_384
+
+# Footprint providers, in decreasing priority.
+FOOTPRINT_PRIORITY: Final = (
+    ProviderKind.openstreetmap,
+    ProviderKind.microsoft,
+    ProviderKind.usa_structures,
+)
+
+# Address providers, corresponded by distance.
+ADDRESS_PROVIDERS: Final = (ProviderKind.nad, ProviderKind.openaddresses)
+
 
 @dataclass(slots=True)
 class ConflateTaskOptions:
     county: USCounty
     output_directory: Path
     input_directory: Path
+    persist_index: bool = False
+    tile_size: Optional[float] = None
+    max_parallel_tiles: int = 1
+    profile: bool = False
+    force: bool = False
+    checkpoint: bool = False
+    memory_limit: Optional[int] = None
+    row_group_size: int = ROW_GROUP_SIZE
+
+    def grid(self) -> Optional[TileGrid]:
+        """Tiles to conflate separately, or None to conflate at once."""
+        if self.tile_size is None:
+            return None
+
+        return TileGrid.for_county(self.county, self.tile_size, TILE_HALO)
 
     def input(self) -> Path:
         return self.input_directory / f"conform/fips={self.county.fips}"
 
+    def profile_directory(self) -> Path:
+        return (
+            self.output_directory / f"profile/conflate/fips={self.county.fips}"
+        )
+
+    def manifest_path(self) -> Path:
+        return (
+            self.output_directory
+            / f"conflate/manifest/fips={self.county.fips}/manifest.json"
+        )
+
+    def checkpoint_path(self, stage: str) -> Path:
+        return (
+            self.output_directory
+            / f"conflate/checkpoint/fips={self.county.fips}/{stage}.arrow"
+        )
+
+    def manifest(self) -> Manifest:
+        """Manifest of the current conform inputs of this county."""
+        return Manifest.from_inputs(
+            {
+                str(kind): self.data(kind)
+                for kind in ProviderKind.list_providers()
+                if self.data(kind).exists()
+            },
+            conflate_version=CONFLATE_VERSION,
+            normalizer_version=NORMALIZER_VERSION,
+            tile_size=self.tile_size,
+            row_group_size=self.row_group_size,
+            geoparquet_version=geoparquet.VERSION,
+        )
+
+    def address_cache(self) -> Path:
+        # Shared across counties, since normalized addresses do not
+        # depend on the county they were found in.
+        return self.output_directory / "cache/addresses.sqlite"
+
+    def data(self, kind: ProviderKind) -> Path:
+        return self.input() / f"provider={kind}/data.parquet"
+
+    def index(self, kind: ProviderKind) -> Optional[Path]:
+        """Path of the persisted spatial index for a provider's conform data.
+
+        Returns None unless `persist_index` is set. The index is keyed on
+        the digest of the conform data (see `Manifest.stamp`), so an index
+        of other data is rebuilt on next use.
+        """
+        if not self.persist_index:
+            return None
+
+        return self.data(kind).with_suffix(".rtree")
+
+    def footprints_index(self) -> Optional[Path]:
+        """Path of the persisted spatial index over the conform data of
+        the footprint providers, concatenated in order of priority.
+        """
+        if not self.persist_index:
+            return None
+
+        return self.input() / "footprints.rtree"
+
 
 @dataclass(slots=True)
 class ConflateProvider:
     kind: ProviderKind
-    height: int
+    path: Path
+    size: ProviderSize
+    frame: Optional[pl.DataFrame] = field(default=None, repr=False)
+
+    @classmethod
+    def open(cls, kind: ProviderKind, path: Path) -> "ConflateProvider":
+        # Row counts and uncompressed sizes are read from the parquet
+        # footer, without decoding any data pages.
+        metadata = pq.read_metadata(path)
+        nbytes = geometry_bytes = 0
+        for i in range(metadata.num_row_groups):
+            row_group = metadata.row_group(i)
+            nbytes += row_group.total_byte_size
+            for j in range(row_group.num_columns):
+                column = row_group.column(j)
+                if column.path_in_schema.split(".")[0] == "geometry":
+                    geometry_bytes += column.total_uncompressed_size
+
+        return cls(
+            kind, path, ProviderSize(metadata.num_rows, nbytes, geometry_bytes)
+        )
+
+    @property
+    def height(self) -> int:
+        return self.size.rows
 
     @property
     def available(self) -> bool:
         return self.height > 0
 
-    def query(self, scan: pl.LazyFrame) -> pl.LazyFrame:
-        return scan.filter(pl.col("provider") == self.kind)
+    def query(self) -> pl.LazyFrame:
+        return pl.scan_parquet(self.path).with_columns(
+            provider=pl.lit(str(self.kind))
+        )
+
+    def collect(self) -> pl.DataFrame:
+        """Conform data of this provider, materialized at most once."""
+        if self.frame is None:
+            self.frame = self.query().collect(engine="streaming")
+
+        return self.frame
+
+    def release(self) -> None:
+        """Drop the data materialized by `collect`."""
+        self.frame = None
 
 
 T = TypeVar("T")
@@ -44,22 +192,103 @@ ConflateTaskResult = Tuple[ConflateTaskOptions, T]
 
 @task(name="Conflate - Perform spatial correspondence")
 def perform_correspondence(
-    a: pl.DataFrame, b: pl.DataFrame, use_distance: bool = False
+    a: pl.DataFrame,
+    b: pl.DataFrame,
+    use_distance: bool = False,
+    right_index: Optional[Path] = None,
+    right_stamp: Optional[str] = None,
+    grid: Optional[TileGrid] = None,
+    max_parallel: int = 1,
+    profiler: Optional[Profiler] = None,
 ) -> pl.DataFrame:
-    return spatial_correspondence(
-        a.lazy(), b.lazy(), use_distance=use_distance
-    ).collect(streaming=True)
+    if grid is not None:
+        # Persisted indices cover a whole provider, not a tile of it.
+        return tiled(
+            partial(spatial_correspondence, use_distance=use_distance),
+            (a, b),
+            grid,
+            max_parallel=max_parallel,
+        )
+
+    # The right side is indexed once up front, so that the left side
+    # can be streamed through it.
+    with broadcast(
+        b.get_column("geometry"), index=right_index, stamp=right_stamp
+    ) as token:
+        return spatial_correspondence(
+            a.lazy(), b.lazy(), use_distance=use_distance, right_broadcast=token
+        ).pipe(collect, profiler)
+
+
+@task(name="Conflate - Perform multi-provider correspondence")
+def perform_multi_correspondence(
+    frames: Sequence[pl.DataFrame],
+    index: Optional[Path] = None,
+    stamp: Optional[str] = None,
+    grid: Optional[TileGrid] = None,
+    max_parallel: int = 1,
+    profiler: Optional[Profiler] = None,
+) -> pl.DataFrame:
+    if grid is not None:
+        # Persisted indices cover whole providers, not a tile of them.
+        return tiled(
+            lambda *lfs: multi_correspondence(lfs),
+            frames,
+            grid,
+            max_parallel=max_parallel,
+        )
+
+    # Geometries of all providers are indexed once up front, in the
+    # order they are concatenated by `multi_correspondence`, so that
+    # they can be streamed through it.
+    geometries = [df.get_column("geometry") for df in frames]
+    if len({g.dtype for g in geometries}) > 1:
+        geometries = [
+            g.to_frame().select(to_wkb(pl.first())).to_series()
+            for g in geometries
+        ]
+
+    with broadcast(pl.concat(geometries), index=index, stamp=stamp) as token:
+        return multi_correspondence(
+            [df.lazy() for df in frames], broadcast=token
+        ).pipe(collect, profiler)
 
 
 @task(name="Conflate - Merge Footprints and Addresses")
-def perform_merge(a: pl.DataFrame, b: pl.DataFrame) -> pl.DataFrame:
-    return merge_footprints_and_addresses(a.lazy(), b.lazy()).collect(
-        streaming=True
+def perform_merge(
+    a: pl.DataFrame,
+    b: pl.DataFrame,
+    address_cache: Optional[Path] = None,
+    grid: Optional[TileGrid] = None,
+    max_parallel: int = 1,
+    profiler: Optional[Profiler] = None,
+) -> pl.DataFrame:
+    with AddressCache(address_cache) as cache:
+        if grid is not None:
+            merged = (
+                tiled(sc_merge_match, (a, b), grid, max_parallel=max_parallel)
+                .lazy()
+                .pipe(sc_merge_finalize, cache)
+                .pipe(collect, profiler)
+            )
+        else:
+            with broadcast(a.get_column("geometry")) as token:
+                merged = merge_footprints_and_addresses(
+                    a.lazy(), b.lazy(), address_cache=cache, broadcast=token
+                ).pipe(collect, profiler)
+
+    get_run_logger().info(
+        "Address normalization: %d cache hits, %d misses",
+        cache.hits,
+        cache.misses,
     )
 
+    return merged
 
-@task(name="Conflate - Write Entities to Disk")
-def write_entities(opts: ConflateTaskOptions, conflated: pl.DataFrame) -> None:
+
+def entities_output(
+    opts: ConflateTaskOptions, conflated: pl.LazyFrame
+) -> pl.LazyFrame:
     output = (
         opts.output_directory
         / f"conflate/entities/fips={opts.county.fips}/data.parquet"
@@ -67,24 +296,30 @@ def write_entities(opts: ConflateTaskOptions, conflated: pl.DataFrame) -> None:
 
     output.parent.mkdir(parents=True, exist_ok=True)
 
-    (
-        conflated.lazy()
-        .select(
+    x, y = centroid_xy(conflated.collect_schema().names())
+    return (
+        conflated.select(
             "id",
             "classification",
             "address",
             "height",
             "levels",
-            pl.col("geometry").pipe(centroid_x).alias("x"),
-            pl.col("geometry").pipe(centroid_y).alias("y"),
+            x.alias("x"),
+            y.alias("y"),
+        )
+        .sort(hilbert(pl.col("x"), pl.col("y"), opts.county.bounds()))
+        .sink_parquet(
+            output,
+            statistics=True,
+            row_group_size=opts.row_group_size,
+            lazy=True,
         )
-        .collect(streaming=True)
-        .write_parquet(output)
     )
 
 
-@task(name="Conflate - Write Crossref to Disk")
-def write_crossref(opts: ConflateTaskOptions, conflated: pl.DataFrame) -> None:
+def crossref_output(
+    opts: ConflateTaskOptions, conflated: pl.LazyFrame
+) -> pl.LazyFrame:
     output = (
         opts.output_directory
         / f"conflate/crossref/fips={opts.county.fips}/data.parquet"
@@ -92,23 +327,20 @@ def write_crossref(opts: ConflateTaskOptions, conflated: pl.DataFrame) -> None:
 
     output.parent.mkdir(parents=True, exist_ok=True)
 
-    (
-        conflated.lazy()
-        .select(entity_id=pl.col("id"), footprint=pl.col("foreign"))
+    return (
+        conflated.select(entity_id=pl.col("id"), footprint=pl.col("foreign"))
         .explode("footprint")
         .unnest("footprint")
         .rename({"key": "provider_id"})
         .with_columns(provider=pl.col("provider").cast(pl.Enum(ProviderKind)))
         .sort("entity_id", "provider", nulls_last=True)
-        .collect(streaming=True)
-        .write_parquet(output)
+        .sink_parquet(output, lazy=True)
     )
 
 
-@task(name="Conflate - Write Footprints to Disk")
-def write_footprints(
-    opts: ConflateTaskOptions, footprints: pl.DataFrame
-) -> None:
+def footprints_output(
+    opts: ConflateTaskOptions, footprints: pl.LazyFrame
+) -> pl.LazyFrame:
     output = (
         opts.output_directory
         / f"conflate/footprints/fips={opts.county.fips}/data.parquet"
@@ -116,97 +348,308 @@ def write_footprints(
 
     output.parent.mkdir(parents=True, exist_ok=True)
 
-    (
-        footprints.lazy()
-        .select("provider", "id", "geometry")
-        .collect(streaming=True)
-        .write_parquet(output)
+    # Footprints are written as GeoParquet, with a bbox covering column
+    # that GeoParquet readers prune row groups of bbox-scoped scans with.
+    # The top-level bbox columns are kept as well, so that plain parquet
+    # readers can filter on their statistics (see `intersects_bbox`).
+    columns = footprints.collect_schema().names()
+    derived = has_derived(columns)
+    bbox = pl.col(geoparquet.BBOX_COVERING)
+    x, y = centroid_xy(columns)
+    footprints = (
+        footprints.with_columns(
+            bbox_struct(columns).alias(geoparquet.BBOX_COVERING)
+        )
+        .select(
+            "provider",
+            "id",
+            "geometry",
+            *(
+                schema.derived.names()
+                if derived
+                else (bbox.struct.field(name) for name in schema.bbox.names())
+            ),
+            bbox,
+            x.alias("_x"),
+            y.alias("_y"),
+        )
+        .sort(hilbert(pl.col("_x"), pl.col("_y"), opts.county.bounds()))
+        .drop("_x", "_y")
+    )
+
+    return footprints.sink_parquet(
+        output,
+        statistics=True,
+        row_group_size=opts.row_group_size,
+        metadata=geoparquet.metadata(footprints.collect_schema(), FIPS.epsg()),
+        lazy=True,
+    )
+
+
+@task(name="Conflate - Write Outputs to Disk")
+def write_outputs(
+    opts: ConflateTaskOptions,
+    conflated: pl.DataFrame,
+    footprints: pl.DataFrame,
+    profiler: Optional[Profiler] = None,
+) -> None:
+    # Entities, crossref and footprints are streamed to disk together,
+    # so that no projected copy of either input is materialized.
+    collect_all(
+        [
+            entities_output(opts, conflated.lazy()),
+            crossref_output(opts, conflated.lazy()),
+            footprints_output(opts, footprints.lazy()),
+        ],
+        profiler,
+    )
+
+
+def checkpointed(
+    opts: ConflateTaskOptions,
+    name: str,
+    manifest: Manifest,
+    compute: Callable[[], pl.DataFrame],
+    inputs: Sequence[ConflateProvider] = (),
+) -> pl.DataFrame:
+    """Output of the conflation stage `name`, as given by `compute`.
+
+    Unless checkpoints are enabled, this is just `compute()`. Otherwise,
+    the output is written to an uncompressed Arrow IPC checkpoint along
+    with `manifest`, and read back memory-mapped, so that pages of the
+    output are only resident while in use. A checkpoint whose manifest
+    equals `manifest` is reused without calling `compute`.
+
+    The providers of `inputs` are released once the output is computed,
+    so that later stages only hold the output of this one.
+    """
+    if not opts.checkpoint:
+        output = compute()
+        for provider in inputs:
+            provider.release()
+
+        return output
+
+    path = opts.checkpoint_path(name)
+    stamp = path.with_suffix(".json")
+    if not path.exists() or Manifest.read(stamp) != manifest:
+        stamp.unlink(missing_ok=True)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        compute().write_ipc(path, compression="uncompressed")
+        manifest.write(stamp)
+
+        for provider in inputs:
+            provider.release()
+    else:
+        get_run_logger().info("Reusing %s checkpoint %s", name, path)
+
+    return pl.read_ipc(path, memory_map=True)
+
+
+def plan_execution(
+    opts: ConflateTaskOptions, providers: Sequence[ConflateProvider]
+) -> ExecutionPlan:
+    """Plan conflating `providers` within the memory limit of `opts`."""
+    return plan(
+        [provider.size for provider in providers],
+        opts.memory_limit,
+        opts.county.bounds(),
+        TILE_HALO,
+        tile_size=opts.tile_size,
+        parallel=opts.max_parallel_tiles,
     )
 
 
 @task(name="Conflate - Perform Conflation")
-def conflate(opts: ConflateTaskOptions):
+def conflate(opts: ConflateTaskOptions) -> bool:
+    """Conflate a county, returning False if it was skipped since its
+    inputs are unchanged since it was last conflated."""
     # TODO(justin): organize this function
 
+    logger = get_run_logger()
+
     input_path = opts.input()
     assert input_path.exists()
     assert input_path.is_dir()
 
     # Scan Providers
     # -------------------------------------------------------------------------
-    scan = pl.scan_parquet(input_path)
-
+    # Each provider is read from its own `provider=` partition, since
+    # providers may store geometry with different encodings (see
+    # `schema.GeometryEncoding`). Partitions that are missing or empty
+    # are skipped without being scanned.
     providers = {}
     for kind in ProviderKind.list_providers():
-        providers[kind] = ConflateProvider(
-            kind,
-            scan.filter(pl.col("provider") == kind)
-            .select(pl.len())
-            .collect(streaming=True)
-            .item(),
-        )
+        if not opts.data(kind).exists():
+            continue
 
-        if not providers[kind].available:
-            del providers[kind]
+        provider = ConflateProvider.open(kind, opts.data(kind))
+        if provider.available:
+            providers[kind] = provider
 
-    # Conflate Footprints
+    # Plan Execution
     # -------------------------------------------------------------------------
-    footprints: pl.DataFrame = perform_correspondence(
-        providers[ProviderKind.openstreetmap]
-        .query(scan)
-        .collect(streaming=True),
-        providers[ProviderKind.microsoft].query(scan).collect(streaming=True),
+    # The plan only depends on the inputs and the memory limit, so it is
+    # made before the manifest, which records the planned tile size.
+    execution = plan_execution(opts, list(providers.values()))
+    if opts.memory_limit is not None:
+        logger.info("Execution plan: %s", execution)
+        opts = replace(
+            opts,
+            tile_size=execution.tile_size,
+            checkpoint=opts.checkpoint or execution.checkpoint,
+        )
+
+    manifest = opts.manifest()
+    if not opts.force and Manifest.read(opts.manifest_path()) == manifest:
+        logger.info(
+            "Skipping county %s, its inputs are unchanged", opts.county.fips
+        )
+        return False
+
+    profiler = Profiler(
+        opts.profile, workflow="conflate", fips=opts.county.fips
     )
 
-    footprints = perform_correspondence(
-        footprints,
-        providers[ProviderKind.microsoft].query(scan).collect(streaming=True),
+    # Conflate Footprints
+    # -------------------------------------------------------------------------
+    # All footprint providers are corresponded at once, in decreasing
+    # priority of their geometry and attributes.
+    def conflate_footprints() -> pl.DataFrame:
+        kinds = [kind for kind in FOOTPRINT_PRIORITY if kind in providers]
+        frames = [providers[kind].collect() for kind in kinds]
+
+        with profiler.stage(
+            "perform_multi_correspondence", sum(df.height for df in frames)
+        ) as stage:
+            footprints = perform_multi_correspondence(
+                frames,
+                index=opts.footprints_index(),
+                stamp=manifest.stamp(map(str, kinds)),
+                grid=opts.grid(),
+                max_parallel=opts.max_parallel_tiles,
+                profiler=profiler,
+            )
+            stage.rows_out = footprints.height
+
+        return footprints
+
+    footprints = checkpointed(
+        opts,
+        "footprints",
+        manifest.select(FOOTPRINT_PRIORITY, stage="footprints"),
+        conflate_footprints,
+        [providers[k] for k in FOOTPRINT_PRIORITY if k in providers],
     )
 
     # Conflate Addresses
     # -------------------------------------------------------------------------
-    if (
-        ProviderKind.openaddresses in providers
-        and ProviderKind.nad in providers
-    ):
-        addresses = perform_correspondence(
-            providers[ProviderKind.nad].query(scan).collect(streaming=True),
-            providers[ProviderKind.openaddresses]
-            .query(scan)
-            .collect(streaming=True),
-            use_distance=True,
-        )
-    elif ProviderKind.nad in providers:
-        addresses = (
-            providers[ProviderKind.nad].query(scan).collect(streaming=True)
-        )
-    else:
-        addresses = (
-            providers[ProviderKind.openaddresses]
-            .query(scan)
-            .collect(streaming=True)
-        )
+    def conflate_addresses() -> pl.DataFrame:
+        if ProviderKind.nad not in providers:
+            return providers[ProviderKind.openaddresses].collect()
+
+        if ProviderKind.openaddresses not in providers:
+            return providers[ProviderKind.nad].collect()
+
+        nad = providers[ProviderKind.nad].collect()
+        oa = providers[ProviderKind.openaddresses].collect()
+
+        with profiler.stage(
+            "perform_correspondence", nad.height + oa.height
+        ) as stage:
+            addresses = perform_correspondence(
+                nad,
+                oa,
+                use_distance=True,
+                right_index=opts.index(ProviderKind.openaddresses),
+                right_stamp=manifest.stamp([str(ProviderKind.openaddresses)]),
+                grid=opts.grid(),
+                max_parallel=opts.max_parallel_tiles,
+                profiler=profiler,
+            )
+            stage.rows_out = addresses.height
+
+        return addresses
+
+    addresses = checkpointed(
+        opts,
+        "addresses",
+        manifest.select(ADDRESS_PROVIDERS, stage="addresses"),
+        conflate_addresses,
+        [providers[k] for k in ADDRESS_PROVIDERS if k in providers],
+    )
 
     # Conflate footprints and addresses
     # -------------------------------------------------------------------------
-    conflated: pl.DataFrame = perform_merge(footprints, addresses)
+    def conflate_merge() -> pl.DataFrame:
+        with profiler.stage(
+            "perform_merge", footprints.height + addresses.height
+        ) as stage:
+            conflated = perform_merge(
+                footprints,
+                addresses,
+                opts.address_cache(),
+                grid=opts.grid(),
+                max_parallel=opts.max_parallel_tiles,
+                profiler=profiler,
+            )
+            stage.rows_out = conflated.height
+
+        return conflated
+
+    conflated = checkpointed(
+        opts,
+        "conflated",
+        manifest.select(manifest.inputs, stage="conflated"),
+        conflate_merge,
+    )
 
-    # Write out entities data
+    # Write out entities, crossref and footprints data
     # -------------------------------------------------------------------------
-    write_entities(opts, conflated)
+    with profiler.stage("write_outputs", conflated.height + footprints.height):
+        write_outputs(opts, conflated, footprints, profiler)
 
-    # Write out crossref data
-    # -------------------------------------------------------------------------
-    write_crossref(opts, conflated)
+    profiler.write(opts.profile_directory())
 
-    # Write out footprints data
-    # -------------------------------------------------------------------------
-    write_footprints(opts, footprints)
+    if opts.memory_limit is not None:
+        logger.info(
+            "Process max RSS %.2f GiB, estimated %.2f GiB",
+            max_rss() / 2**30,
+            execution.estimate / 2**30,
+        )
+
+    # Recorded last, so that an interrupted run is recomputed
+    manifest.write(opts.manifest_path())
+    return True
 
 
 @flow(name="BEAR Conflate Flow")
-def conflate_workflow(fips: str, output_directory: Path, input_directory: Path):
+def conflate_workflow(
+    fips: str,
+    output_directory: Path,
+    input_directory: Path,
+    persist_index: bool = False,
+    tile_size: Optional[float] = None,
+    max_parallel_tiles: int = 1,
+    profile: bool = False,
+    force: bool = False,
+    checkpoint: bool = False,
+    memory_limit: Optional[int] = None,
+    row_group_size: int = ROW_GROUP_SIZE,
+) -> bool:
     county = FIPS.county(fips)
-    conflate.submit(
-        ConflateTaskOptions(county, output_directory, input_directory)
-    ).wait()
+    return conflate.submit(
+        ConflateTaskOptions(
+            county,
+            output_directory,
+            input_directory,
+            persist_index,
+            tile_size,
+            max_parallel_tiles,
+            profile,
+            force,
+            checkpoint,
+            memory_limit,
+            row_group_size,
+        )
+    ).result()
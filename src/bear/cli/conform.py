@@ -6,7 +6,7 @@ from prefect.futures import PrefectFuture
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Tuple, TypeVar
+from typing import Final, Optional, Tuple, TypeVar
 
 import bear.providers.provider_microsoft
 import bear.providers.provider_nad
@@ -14,18 +14,28 @@ import bear.providers.provider_openaddresses
 import bear.providers.provider_openstreetmap
 import bear.providers.provider_usa_structures  # noqa: F401
 
-from bear.core import schema
+from bear.core import geoarrow, schema
 from bear.core.fips import FIPS, USCounty
+from bear.core.profile import Profiler, collect
+from bear.expr._geometry import bbox_columns, derive_geometry, hilbert
 from bear.providers.registry import ProviderRegistry
 from bear.typing import Provider
 
 
+# Rows per parquet row group of conform outputs. Smaller row groups let
+# bbox-scoped scans skip more of a file, at the cost of more metadata.
+ROW_GROUP_SIZE: Final = 16_384
+
+
 @dataclass(slots=True)
 class ConformTaskOptions:
     county: USCounty
     provider_name: str
     input_directory: Path = Path(".")
     output_directory: Path = Path(".")
+    geometry_encoding: schema.GeometryEncoding = schema.GeometryEncoding.wkb
+    derived_columns: bool = False
+    profile: bool = False
 
     def provider(self) -> Provider:
         return ProviderRegistry.get(self.provider_name)
@@ -36,6 +46,13 @@ class ConformTaskOptions:
             / f"conform/fips={self.county.fips}/provider={self.provider_name}/data.parquet"
         )
 
+    def profile_directory(self) -> Path:
+        return (
+            self.output_directory
+            / f"profile/conform/fips={self.county.fips}"
+            / f"provider={self.provider_name}"
+        )
+
     def input(self) -> Path:
         # TODO(justin): input paths are temporarily based on
         # a local, non-reproducible setup. This will change once
@@ -79,10 +96,12 @@ def conform_load(
 
 @task(name="Conform - Perform Data Conformance")
 def conform_process(
-    opts: ConformTaskOptions, tbl: Optional[pl.DataFrame]
+    opts: ConformTaskOptions,
+    tbl: Optional[pl.DataFrame],
+    profiler: Optional[Profiler] = None,
 ) -> ConformTaskResult[Optional[pl.DataFrame]]:
     if tbl is not None and tbl.height > 0:
-        tbl = opts.provider().conform(tbl.lazy()).collect(streaming=True)
+        tbl = opts.provider().conform(tbl.lazy()).pipe(collect, profiler)
 
     return (opts, tbl)
 
@@ -95,18 +114,51 @@ def conform_save(opts: ConformTaskOptions, tbl: Optional[pl.DataFrame]) -> None:
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    tbl.cast(schema.conform).write_parquet(output_path, compression="zstd")  # type: ignore
+    tbl = tbl.cast(schema.conform)  # type: ignore
+    if opts.derived_columns:
+        tbl = tbl.with_columns(derive_geometry()).cast(schema.derived)
+    else:
+        tbl = tbl.with_columns(bbox_columns()).cast(schema.bbox)
+
+    # Rows are ordered along a Hilbert curve over the county, so that
+    # each row group covers a compact area and its bounding box
+    # statistics can prune bbox-scoped scans.
+    tbl = tbl.sort(
+        hilbert(
+            (pl.col("xmin") + pl.col("xmax")) / 2,
+            (pl.col("ymin") + pl.col("ymax")) / 2,
+            opts.county.bounds(),
+        )
+    )
+
+    if opts.geometry_encoding == schema.GeometryEncoding.geoarrow:
+        tbl = tbl.with_columns(geoarrow.encode(tbl.get_column("geometry")))
+
+    tbl.write_parquet(
+        output_path,
+        compression="zstd",
+        statistics=True,
+        row_group_size=ROW_GROUP_SIZE,
+    )
 
 
 type FutureType = PrefectFuture[ConformTaskResult[Optional[pl.DataFrame]]]
 
 
+def _height(result: ConformTaskResult[Optional[pl.DataFrame]]) -> int:
+    _, tbl = result
+    return 0 if tbl is None else tbl.height
+
+
 @flow(name="BEAR Conform Flow")
 def conform_workflow(
     fips: str,
     provider: str,
     output_directory: Path,
     input_directory: Path,
+    geometry_encoding: schema.GeometryEncoding = schema.GeometryEncoding.wkb,
+    derived_columns: bool = False,
+    profile: bool = False,
 ) -> None:
     county = FIPS.county(fips)
 
@@ -118,15 +170,30 @@ def conform_workflow(
 
     output_directory.mkdir(parents=True, exist_ok=True)
 
-    future_load = conform_load.submit(
-        ConformTaskOptions(
-            county,
-            provider,
-            input_directory,
-            output_directory,
-        )
+    opts = ConformTaskOptions(
+        county,
+        provider,
+        input_directory,
+        output_directory,
+        geometry_encoding,
+        derived_columns,
+        profile,
     )
 
-    future_process = conform_process.submit(*future_load.result())
-    future_save = conform_save.submit(*future_process.result())
-    future_save.wait()
+    profiler = Profiler(
+        profile, workflow="conform", fips=fips, provider=provider
+    )
+
+    with profiler.stage("conform_load") as stage:
+        future_load = conform_load.submit(opts)
+        stage.rows_out = _height(future_load.result())
+
+    with profiler.stage("conform_process", stage.rows_out) as stage:
+        future_process = conform_process.submit(*future_load.result(), profiler)
+        stage.rows_out = _height(future_process.result())
+
+    with profiler.stage("conform_save", stage.rows_out):
+        future_save = conform_save.submit(*future_process.result())
+        future_save.wait()
+
+    profiler.write(opts.profile_directory())
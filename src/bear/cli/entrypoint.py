@@ -1,9 +1,10 @@
 import typer
 
-from typing import List, Annotated
+from typing import List, Annotated, Optional
 from pathlib import Path
-from bear.cli.conflate import conflate_workflow
+from bear.cli.conflate import ROW_GROUP_SIZE, conflate_workflow
 from bear.cli.conform import conform_workflow
+from bear.core.schema import GeometryEncoding
 from bear.providers import ProviderKind
 
 cli = typer.Typer(name="bear")
@@ -23,6 +24,24 @@ def conform(
     input_directory: Annotated[
         Path, typer.Option(file_okay=False, dir_okay=True)
     ] = Path(".bear/raw"),
+    geometry_encoding: Annotated[
+        GeometryEncoding,
+        typer.Option(help="Encoding of the conformed geometry column."),
+    ] = GeometryEncoding.wkb,
+    derived_columns: Annotated[
+        bool,
+        typer.Option(
+            help="Also write the area, bounding box and centroid of each "
+            "geometry, so that conflation does not recompute them."
+        ),
+    ] = False,
+    profile: Annotated[
+        bool,
+        typer.Option(
+            help="Write a per-stage profiling report (JSON and HTML) for "
+            "each county under the output directory."
+        ),
+    ] = False,
 ):
     for param_fips in fips:
         for param_provider in providers:
@@ -31,6 +50,9 @@ def conform(
                 param_provider,
                 output_directory,
                 input_directory,
+                geometry_encoding,
+                derived_columns,
+                profile,
             )
 
 
@@ -43,10 +65,77 @@ def conflate(
     input_directory: Annotated[
         Path, typer.Option(file_okay=False, dir_okay=True)
     ] = Path(".bear"),
+    persist_index: Annotated[
+        bool,
+        typer.Option(
+            help="Persist provider spatial indices next to conform outputs "
+            "and reuse them on later runs."
+        ),
+    ] = False,
+    tile_size: Annotated[
+        Optional[float],
+        typer.Option(
+            help="Conflate each county in square tiles of this size, in "
+            "meters, to bound memory usage."
+        ),
+    ] = None,
+    max_parallel_tiles: Annotated[
+        int, typer.Option(help="Number of tiles to conflate concurrently.")
+    ] = 1,
+    profile: Annotated[
+        bool,
+        typer.Option(
+            help="Write a per-stage profiling report (JSON and HTML) for "
+            "each county under the output directory."
+        ),
+    ] = False,
+    force: Annotated[
+        bool,
+        typer.Option(
+            help="Conflate every county, even those whose conform inputs "
+            "are unchanged since they were last conflated."
+        ),
+    ] = False,
+    checkpoint: Annotated[
+        bool,
+        typer.Option(
+            help="Checkpoint the footprint, address and merge stages as "
+            "Arrow IPC, and reuse checkpoints whose inputs are unchanged."
+        ),
+    ] = False,
+    memory_limit: Annotated[
+        Optional[float],
+        typer.Option(
+            help="Memory limit, in GiB. Each county is conflated at once, "
+            "in tiles or spilling to disk, as estimated to fit this limit."
+        ),
+    ] = None,
+    row_group_size: Annotated[
+        int,
+        typer.Option(
+            help="Rows per row group of the Hilbert ordered entities and "
+            "footprints outputs."
+        ),
+    ] = ROW_GROUP_SIZE,
 ):
-    for param_fips in fips:
-        conflate_workflow(
+    recomputed = [
+        param_fips
+        for param_fips in fips
+        if conflate_workflow(
             param_fips,
             output_directory,
             input_directory,
+            persist_index,
+            tile_size,
+            max_parallel_tiles,
+            profile,
+            force,
+            checkpoint,
+            None if memory_limit is None else int(memory_limit * 2**30),
+            row_group_size,
         )
+    ]
+
+    skipped = [f for f in fips if f not in recomputed]
+    typer.echo(f"Recomputed {len(recomputed)} counties: {' '.join(recomputed)}")
+    typer.echo(f"Skipped {len(skipped)} unchanged: {' '.join(skipped)}")
@@ -0,0 +1,77 @@
+import numpy as np
+import polars as pl
+import pyarrow as pa
+import shapely
+
+from typing import Final
+
+# Native GeoArrow geometry encodings, using separated coordinates.
+# Polygons are always stored as multipolygons, so that a column has
+# a single encoding regardless of the mix of polygon types.
+POINT: Final = pl.Struct({"x": pl.Float64(), "y": pl.Float64()})
+MULTIPOLYGON: Final = pl.List(pl.List(pl.List(POINT)))
+
+
+def _coords(coords: np.ndarray, mask: pa.Array | None = None) -> pa.Array:
+    return pa.StructArray.from_arrays(
+        [pa.array(coords[:, 0]), pa.array(coords[:, 1])],
+        names=["x", "y"],
+        mask=mask,
+    )
+
+
+def _offsets(offsets: np.ndarray) -> pa.Array:
+    return pa.array(offsets, type=pa.int64())
+
+
+def encode(geometry: pl.Series) -> pl.Series:
+    """Encode a WKB geometry Series using a native GeoArrow encoding.
+
+    Points are encoded as a struct of `x` and `y` coordinates, and
+    (multi)polygons as nested lists of rings over the same coordinate
+    struct. Series mixing points and polygons cannot be represented by
+    a single encoding, and are returned unchanged as WKB.
+
+    Parameters
+    ----------
+    geometry : pl.Series
+        WKB geometries.
+
+    Returns
+    -------
+    pl.Series
+        The GeoArrow encoded geometries, with the same name and nulls.
+    """
+    values = shapely.from_wkb(geometry.to_numpy())
+    missing = pa.array(shapely.is_missing(values))
+
+    try:
+        kind, coords, offsets = shapely.to_ragged_array(values, include_z=False)
+    except ValueError:
+        return geometry
+
+    match kind:
+        case shapely.GeometryType.POINT:
+            array = _coords(coords, mask=missing)
+        case shapely.GeometryType.POLYGON:
+            ring_offsets, polygon_offsets = offsets
+            geometry_offsets = np.arange(len(values) + 1)
+        case shapely.GeometryType.MULTIPOLYGON:
+            ring_offsets, polygon_offsets, geometry_offsets = offsets
+        case _:
+            return geometry
+
+    if kind != shapely.GeometryType.POINT:
+        rings = pa.LargeListArray.from_arrays(
+            _offsets(ring_offsets), _coords(coords)
+        )
+        polygons = pa.LargeListArray.from_arrays(
+            _offsets(polygon_offsets), rings
+        )
+        array = pa.LargeListArray.from_arrays(
+            _offsets(geometry_offsets), polygons, mask=missing
+        )
+
+    result = pl.from_arrow(array)
+    assert isinstance(result, pl.Series)
+    return result.alias(geometry.name)
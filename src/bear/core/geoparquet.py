@@ -0,0 +1,73 @@
+import json
+
+import polars as pl
+import pyproj
+
+from typing import Final
+
+from bear.core import geoarrow, schema
+
+# Version of the GeoParquet specification written
+VERSION: Final = "1.1.0"
+
+# Name of the struct column covering the bounding box of each geometry
+BBOX_COVERING: Final = "bbox"
+
+
+def encoding(dtype: pl.DataType) -> str:
+    """GeoParquet encoding of a geometry column of type `dtype`."""
+    if dtype == geoarrow.MULTIPOLYGON:
+        return "multipolygon"
+
+    if dtype == geoarrow.POINT:
+        return "point"
+
+    return "WKB"
+
+
+def metadata(
+    columns: pl.Schema, epsg: int, geometry: str = "geometry"
+) -> dict[str, str]:
+    """GeoParquet file metadata of a frame with schema `columns`.
+
+    The geometry column is described with the CRS `epsg` and, if
+    `columns` has a `BBOX_COVERING` column, with that column as its
+    bounding box covering. Readers supporting GeoParquet 1.1 can then
+    skip row groups of bbox-scoped scans from its statistics.
+
+    Parameters
+    ----------
+    columns : pl.Schema
+        Schema of the frame written.
+    epsg : int
+        EPSG code of the CRS of the geometries.
+    geometry : str, optional
+        Name of the geometry column. Defaults to "geometry".
+
+    Returns
+    -------
+    dict[str, str]
+        The "geo" key-value metadata, as given to `sink_parquet`.
+    """
+    column = {
+        "encoding": encoding(columns[geometry]),
+        "geometry_types": [],
+        "crs": pyproj.CRS.from_epsg(epsg).to_json_dict(),
+    }
+
+    if BBOX_COVERING in columns:
+        column["covering"] = {
+            "bbox": {
+                name: [BBOX_COVERING, name] for name in schema.bbox.names()
+            }
+        }
+
+    return {
+        "geo": json.dumps(
+            {
+                "version": VERSION,
+                "primary_column": geometry,
+                "columns": {geometry: column},
+            }
+        )
+    }
@@ -0,0 +1,85 @@
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Mapping, Optional
+
+# Read size when hashing input files
+_CHUNK_SIZE = 1 << 20
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of the contents of `path`, as a hex string."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_CHUNK_SIZE):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+@dataclass(slots=True, frozen=True)
+class Manifest:
+    """Record of the inputs an output was computed from.
+
+    Two manifests are equal when their outputs would be identical, so an
+    output whose recorded manifest equals the manifest of its current
+    inputs does not need to be recomputed.
+
+    Parameters
+    ----------
+    inputs : dict[str, str]
+        Content hash of each input file, keyed by name (e.g. provider).
+        The set of keys records which inputs were present.
+    parameters : dict[str, Any]
+        Versions and parameters of the code computing the output. These
+        must be JSON serializable.
+    """
+
+    inputs: dict[str, str] = field(default_factory=dict)
+    parameters: dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_inputs(
+        cls, inputs: Mapping[str, Path], **parameters: Any
+    ) -> "Manifest":
+        return cls(
+            {name: file_digest(path) for name, path in sorted(inputs.items())},
+            parameters,
+        )
+
+    def select(self, names: Iterable[str], **parameters: Any) -> "Manifest":
+        """Manifest of the inputs `names` only, with `parameters` added."""
+        keep = set(names)
+        return Manifest(
+            {k: v for k, v in self.inputs.items() if k in keep},
+            {**self.parameters, **parameters},
+        )
+
+    def stamp(self, names: Iterable[str]) -> Optional[str]:
+        """Stamp identifying the contents of the inputs `names`, in order,
+        or None if any of them is missing.
+        """
+        names = list(names)
+        if any(name not in self.inputs for name in names):
+            return None
+
+        return ":".join(self.inputs[name] for name in names)
+
+    @classmethod
+    def read(cls, path: Path) -> Optional["Manifest"]:
+        """Manifest stored at `path`, or None if missing or unreadable."""
+        try:
+            with open(path) as f:
+                return cls(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(asdict(self), f, indent=2, sort_keys=True)
+            f.write("\n")
+
+        tmp.replace(path)
@@ -0,0 +1,174 @@
+from dataclasses import dataclass
+from enum import StrEnum
+from math import ceil, sqrt
+from typing import Final, Iterable, Optional
+
+# Copies of the provider data held at once while conflating: the inputs,
+# the matched pairs of each correspondence and the merged output.
+WORKING_SET_COPIES: Final = 3.0
+
+# Bytes per geometry of a spatial index (bounding box and row index)
+INDEX_BYTES_PER_ROW: Final = 40
+
+# Size of geometries parsed by the plugins, relative to their WKB size
+PARSED_GEOMETRY_FACTOR: Final = 2.0
+
+# Share of the memory limit that the tiles evaluated concurrently may
+# use together, leaving room for the allocator and Python.
+TILE_BUDGET: Final = 0.5
+
+# Tiles smaller than this, relative to the tile halo, mostly repeat the
+# work of their neighbours, so data is spilled to disk instead.
+MIN_TILE_HALOS: Final = 4
+
+# Most tiles a county is split into. Each tile has a fixed cost, so
+# larger tiles are spilled to disk rather than tiling a large county
+# more finely.
+MAX_TILES: Final = 1024
+
+
+class ExecutionMode(StrEnum):
+    # Conflate the whole county at once
+    memory = "memory"
+    # Conflate the county in tiles (see `bear.expr._tiling`)
+    tiled = "tiled"
+    # Conflate in the smallest tiles, checkpointing stage outputs to disk
+    spill = "spill"
+
+
+@dataclass(slots=True, frozen=True)
+class ProviderSize:
+    """Size of a provider's conform data, from its parquet metadata.
+
+    Parameters
+    ----------
+    rows : int
+        Number of rows.
+    nbytes : int
+        Uncompressed size of all columns, in bytes.
+    geometry_bytes : int
+        Uncompressed size of the geometry column, in bytes.
+    """
+
+    rows: int
+    nbytes: int
+    geometry_bytes: int
+
+    @property
+    def average_geometry(self) -> float:
+        """Average size of a geometry, in bytes."""
+        return self.geometry_bytes / self.rows if self.rows else 0.0
+
+
+@dataclass(slots=True, frozen=True)
+class ExecutionPlan:
+    mode: ExecutionMode
+    estimate: int
+    limit: Optional[int]
+    tile_size: Optional[float] = None
+
+    @property
+    def checkpoint(self) -> bool:
+        return self.mode == ExecutionMode.spill
+
+    def __str__(self) -> str:
+        gib = 2**30
+        limit = "no" if self.limit is None else f"{self.limit / gib:.2f} GiB"
+        tiles = f", {self.tile_size:.0f} m tiles" if self.tile_size else ""
+        return (
+            f"{self.mode} execution{tiles} "
+            f"(estimated {self.estimate / gib:.2f} GiB, {limit} limit)"
+        )
+
+
+def estimate(sizes: Iterable[ProviderSize]) -> int:
+    """Estimated peak working set of conflating providers of `sizes`.
+
+    Provider data is held in `WORKING_SET_COPIES` copies, while each
+    geometry is also parsed and indexed by the plugins.
+    """
+    total = 0.0
+    for size in sizes:
+        parsed = size.average_geometry * PARSED_GEOMETRY_FACTOR
+        total += size.nbytes * WORKING_SET_COPIES
+        total += size.rows * (parsed + INDEX_BYTES_PER_ROW)
+
+    return int(total)
+
+
+def resident(sizes: Iterable[ProviderSize]) -> int:
+    """Size of the provider data held in memory throughout a tiled
+    conflation, from which the rows of each tile are gathered."""
+    return sum(size.nbytes for size in sizes)
+
+
+def plan(
+    sizes: Iterable[ProviderSize],
+    limit: Optional[int],
+    bounds: tuple[float, float, float, float],
+    halo: float,
+    tile_size: Optional[float] = None,
+    parallel: int = 1,
+) -> ExecutionPlan:
+    """Choose how to conflate a county within `limit` bytes of memory.
+
+    A county whose estimated working set fits within `limit` is
+    conflated at once. Otherwise, it is conflated in tiles sized so that
+    the `parallel` tiles evaluated concurrently are expected to use at
+    most `TILE_BUDGET` of what the resident inputs leave of the limit
+    together, assuming data is spread evenly over the county. If such
+    tiles would be smaller than `MIN_TILE_HALOS` halos across, or more
+    than `MAX_TILES`, or the inputs alone exceed the limit, the smallest
+    tiles within both bounds are used and stage outputs are spilled to
+    disk.
+
+    Parameters
+    ----------
+    sizes : Iterable[ProviderSize]
+        Sizes of the providers to conflate.
+    limit : int, optional
+        Memory limit, in bytes. If None, the county is conflated at once,
+        or in tiles of `tile_size` if given.
+    bounds : tuple[float, float, float, float]
+        Bounding box (xmin, ymin, xmax, ymax) of the county.
+    halo : float
+        Overlap between neighbouring tiles.
+    tile_size : float, optional
+        Tile size requested by the user, which is kept when within the
+        limit.
+    parallel : int, optional
+        Number of tiles evaluated concurrently. Defaults to 1.
+
+    Returns
+    -------
+    ExecutionPlan
+        The chosen plan, and the estimate it was chosen from.
+    """
+    sizes = list(sizes)
+    working_set = estimate(sizes)
+    if limit is None or (working_set <= limit and tile_size is None):
+        if tile_size is None:
+            return ExecutionPlan(ExecutionMode.memory, working_set, limit)
+
+        return ExecutionPlan(ExecutionMode.tiled, working_set, limit, tile_size)
+
+    xmin, ymin, xmax, ymax = bounds
+    area = max(xmax - xmin, 0.0) * max(ymax - ymin, 0.0)
+    smallest = max(MIN_TILE_HALOS * halo, sqrt(area / MAX_TILES))
+
+    # Inputs stay resident while tiles are evaluated, so only the rest
+    # of the limit is shared between tiles.
+    available = limit - resident(sizes)
+    if available <= 0:
+        return ExecutionPlan(ExecutionMode.spill, working_set, limit, smallest)
+
+    budget = available * TILE_BUDGET / max(1, parallel)
+    tiles = max(1, ceil(working_set / budget))
+    size = sqrt(area / tiles)
+    if tile_size is not None:
+        size = min(size, tile_size)
+
+    if size < smallest:
+        return ExecutionPlan(ExecutionMode.spill, working_set, limit, smallest)
+
+    return ExecutionPlan(ExecutionMode.tiled, working_set, limit, size)
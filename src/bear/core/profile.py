@@ -0,0 +1,198 @@
+import polars as pl
+
+import html
+import json
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+
+def max_rss() -> int:
+    """Maximum resident set size of this process so far, in bytes."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+@dataclass(slots=True)
+class Stage:
+    """Measurements of a single named stage of a workflow.
+
+    Attributes
+    ----------
+    name : str
+        Name of the stage, e.g. "perform_merge".
+    wall_time : float
+        Elapsed time of the stage, in seconds.
+    rows_in : int, optional
+        Number of rows given to the stage.
+    rows_out : int, optional
+        Number of rows produced by the stage.
+    max_rss : int
+        Maximum resident set size of the process at the end of the stage,
+        in bytes. This is cumulative: a process-wide high-water mark that
+        includes earlier stages, and only grows across stages.
+    max_rss_growth : int
+        Growth of `max_rss` during the stage, in bytes. This is nonzero
+        only when the stage raised the high-water mark of the process,
+        and then is a lower bound on its own memory use.
+    nodes : list[dict[str, Any]]
+        Timings, in microseconds since the start of their query, of each
+        node of the lazy frames collected by the stage.
+    plans : list[str]
+        Optimized query plans of the lazy frames collected by the stage.
+    """
+
+    name: str
+    wall_time: float = 0.0
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    max_rss: int = 0
+    max_rss_growth: int = 0
+    nodes: list[dict[str, Any]] = field(default_factory=list)
+    plans: list[str] = field(default_factory=list)
+
+
+class Profiler:
+    """Per-stage profile of a workflow run.
+
+    Stages are recorded in order by `stage`, and lazy frames collected
+    through `collect` within a stage have their query plan and per-node
+    timings recorded. A disabled profiler records nothing, and `collect`
+    is then a plain collect on the streaming engine.
+
+    Parameters
+    ----------
+    enabled : bool, optional
+        Whether to record stages. Defaults to False.
+    **context
+        Values identifying the run in the report, e.g. the county FIPS.
+    """
+
+    def __init__(self, enabled: bool = False, **context: Any):
+        self.enabled = enabled
+        self.context = context
+        self.stages: list[Stage] = []
+        self._current: Optional[Stage] = None
+
+    @contextmanager
+    def stage(
+        self, name: str, rows_in: Optional[int] = None
+    ) -> Iterator[Stage]:
+        """Measure the enclosed block as the stage `name`.
+
+        The yielded `Stage` may be updated, e.g. with `rows_out`.
+        """
+        stage = Stage(name, rows_in=rows_in)
+        previous, self._current = self._current, stage
+        start, start_rss = time.perf_counter(), max_rss()
+        try:
+            yield stage
+        finally:
+            stage.wall_time = time.perf_counter() - start
+            stage.max_rss = max_rss()
+            stage.max_rss_growth = stage.max_rss - start_rss
+            self._current = previous
+            if self.enabled:
+                self.stages.append(stage)
+
+    def collect(self, lf: pl.LazyFrame) -> pl.DataFrame:
+        """Collect `lf`, recording its plan and node timings in the
+        current stage."""
+        stage = self._current
+        if not self.enabled or stage is None:
+            return lf.collect(engine="streaming")
+
+        stage.plans.append(lf.explain(engine="streaming"))
+        df, nodes = lf.profile(engine="streaming")
+        stage.nodes.extend(nodes.to_dicts())
+        return df
+
+    def collect_all(self, lfs: list[pl.LazyFrame]) -> list[pl.DataFrame]:
+        """Collect `lfs` together, recording their plans in the current
+        stage. Node timings are not available for joint collections."""
+        stage = self._current
+        if self.enabled and stage is not None:
+            stage.plans.extend(lf.explain(engine="streaming") for lf in lfs)
+
+        return pl.collect_all(lfs, engine="streaming")
+
+    def report(self) -> dict[str, Any]:
+        return {
+            "context": self.context,
+            "stages": [asdict(stage) for stage in self.stages],
+        }
+
+    def write(self, directory: Path) -> None:
+        """Write the report to `directory` as report.json and report.html.
+
+        The JSON report has a stable layout, so that reports of separate
+        runs can be compared with a plain diff.
+        """
+        if not self.enabled:
+            return
+
+        directory.mkdir(parents=True, exist_ok=True)
+        report = self.report()
+
+        with open(directory / "report.json", "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+        with open(directory / "report.html", "w") as f:
+            f.write(_html(report))
+
+
+def collect(
+    lf: pl.LazyFrame, profiler: Optional[Profiler] = None
+) -> pl.DataFrame:
+    """Collect `lf`, through `profiler` when given."""
+    if profiler is None:
+        return lf.collect(engine="streaming")
+
+    return profiler.collect(lf)
+
+
+def collect_all(
+    lfs: list[pl.LazyFrame], profiler: Optional[Profiler] = None
+) -> list[pl.DataFrame]:
+    """Collect `lfs` together, through `profiler` when given."""
+    if profiler is None:
+        return pl.collect_all(lfs, engine="streaming")
+
+    return profiler.collect_all(lfs)
+
+
+def _html(report: dict[str, Any]) -> str:
+    context = ", ".join(f"{k}={v}" for k, v in report["context"].items())
+    rows = "".join(
+        "<tr>"
+        f"<td>{html.escape(s['name'])}</td>"
+        f"<td>{s['wall_time']:.3f}</td>"
+        f"<td>{'' if s['rows_in'] is None else s['rows_in']}</td>"
+        f"<td>{'' if s['rows_out'] is None else s['rows_out']}</td>"
+        f"<td>{s['max_rss'] / 2**20:.1f}</td>"
+        f"<td>{s['max_rss_growth'] / 2**20:.1f}</td>"
+        "</tr>"
+        for s in report["stages"]
+    )
+    plans = "".join(
+        f"<h2>{html.escape(s['name'])}</h2>"
+        + "".join(f"<pre>{html.escape(plan)}</pre>" for plan in s["plans"])
+        for s in report["stages"]
+        if s["plans"]
+    )
+
+    return (
+        "<!DOCTYPE html>\n<html><head><meta charset='utf-8'>"
+        f"<title>BEAR profile {html.escape(context)}</title></head><body>"
+        f"<h1>BEAR profile {html.escape(context)}</h1>"
+        "<table border='1'><tr><th>Stage</th><th>Wall time (s)</th>"
+        "<th>Rows in</th><th>Rows out</th><th>Process max RSS (MiB)</th>"
+        "<th>Max RSS growth (MiB)</th></tr>"
+        f"{rows}</table>{plans}</body></html>\n"
+    )
@@ -1,7 +1,16 @@
 import polars as pl
 
+from enum import StrEnum
 from typing import Final
 
+
+class GeometryEncoding(StrEnum):
+    # Well-known binary, as given by `conform["geometry"]`
+    wkb = "wkb"
+    # Native GeoArrow coordinate buffers, see `bear.core.geoarrow`
+    geoarrow = "geoarrow"
+
+
 conform: Final = pl.Schema(
     {
         # An identifier
@@ -14,7 +23,34 @@ conform: Final = pl.Schema(
         "height": pl.Float64(),
         # Number of levels/stories within the building
         "levels": pl.Int32(),
-        # Geometry of building (either POINT or POLYGON) stored as WKB
+        # Geometry of building (either POINT or POLYGON) stored as WKB,
+        # or natively as GeoArrow with `GeometryEncoding.geoarrow`
         "geometry": pl.Binary(),
     }
 )
+
+# Bounding box of the geometry of `conform`, written with every conform
+# output so that row group statistics let bbox-scoped scans skip row
+# groups (see `bear.expr._geometry.intersects_bbox`).
+bbox: Final = pl.Schema(
+    {
+        "xmin": pl.Float64(),
+        "ymin": pl.Float64(),
+        "xmax": pl.Float64(),
+        "ymax": pl.Float64(),
+    }
+)
+
+# Optional columns derived from the geometry of `conform`, so that they
+# are computed once per geometry rather than wherever they are needed.
+derived: Final = pl.Schema(
+    {
+        # Area of the geometry, zero for points
+        "area": pl.Float64(),
+        # Bounding box of the geometry
+        **bbox,
+        # Centroid of the geometry
+        "cx": pl.Float64(),
+        "cy": pl.Float64(),
+    }
+)
@@ -1,6 +1,7 @@
 import polars as pl
 from typing import Final
 
+from bear.expr._address import AddressCache, normalize_address
 from bear.expr._correspondence import spatial_correspondence
 
 
@@ -23,5 +24,7 @@ __all__ = [
     "NULL_UUID",
     "null_if_empty_str",
     "normalize_str",
+    "normalize_address",
+    "AddressCache",
     "spatial_correspondence",
 ]
@@ -0,0 +1,521 @@
+import polars as pl
+
+from scourgify.address_constants import (
+    DIRECTIONAL_REPLACEMENTS,
+    LONGHAND_DIRECTIONALS,
+    LONGHAND_STREET_TYPES,
+    OCCUPANCY_TYPE_ABBREVIATIONS,
+    STREET_TYPE_ABBREVIATIONS,
+)
+
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Final, Iterable, Optional
+
+# Version of `normalize_address`, which keys persisted results in an
+# `AddressCache`. Increment whenever normalized output changes.
+NORMALIZER_VERSION: Final = 3
+
+# Lookup tables are derived from the USPS Pub. 28 tables shipped with
+# scourgify, so that `normalize_address` agrees with `addr_normalize`.
+DIRECTIONALS: Final = {
+    **{long: long for long in DIRECTIONAL_REPLACEMENTS},
+    **LONGHAND_DIRECTIONALS,
+}
+
+# scourgify expands PIKE to PIKES, which is a variant of PIKE in the USPS
+# table, so it is corrected here.
+STREET_TYPES: Final = (
+    {
+        street_type: LONGHAND_STREET_TYPES[abbr]
+        for street_type, abbr in STREET_TYPE_ABBREVIATIONS.items()
+        if abbr in LONGHAND_STREET_TYPES
+    }
+    | {abbr: long for abbr, long in LONGHAND_STREET_TYPES.items()}
+    | {"PIKE": "PIKE", "PIKES": "PIKE"}
+)
+
+# Street types that are also common street name words, which
+# `addr_normalize` reads as the end of the street name when a
+# postdirectional follows, e.g. 12 NE 2 RUN S -> 12 NORTHEAST 2 RUN SOUTH
+# but 12 NE 2 RUN -> 12 NORTHEAST 2ND RUN.
+NAME_TYPES: Final = {
+    "BG",
+    "BURG",
+    "CENTER",
+    "CLB",
+    "CLUB",
+    "COVE",
+    "CV",
+    "GREEN",
+    "GRN",
+    "GROVE",
+    "HILL",
+    "HOLLOW",
+    "ISLAND",
+    "RUN",
+    "VALLEY",
+    "VILLAGE",
+    "WAYS",
+}
+
+# Street types that also abbreviate a name prefix (SAINT, MOUNT, or the
+# article LA), which start the street name when a directional is present,
+# e.g. 12 N ST JAMES -> 12 NORTH ST JAMES but 12 ST JAMES -> 12 STREET
+# JAMES.
+NAME_PREFIXES: Final = {"LA", "MT", "ST"}
+
+OCCUPANCY_TYPES: Final = OCCUPANCY_TYPE_ABBREVIATIONS | {
+    abbr: abbr for abbr in OCCUPANCY_TYPE_ABBREVIATIONS.values()
+}
+
+# Building designators, which may precede or follow a single occupancy
+# designator and are kept as written, e.g. BLDG 5 APT 3.
+SUBADDRESS_TYPES: Final = {"BLDG", "BUILDING"}
+
+# Occupancy types that are incomplete without an identifier, e.g.
+# 123 MAIN ST APT.
+IDENTIFIED_TYPES: Final = {
+    "APT",
+    "FL",
+    "FLOOR",
+    "LOT",
+    "RM",
+    "ROOM",
+    "STE",
+    "SUITE",
+    "TRAILER",
+    "TRLR",
+    "UNIT",
+}
+
+# Line 2 of a trailing occupancy type without an identifier, e.g.
+# 12 MAIN ST REAR -> 12 MAIN STREET UNIT REAR. Other such types, e.g.
+# BASEMENT or LOWER, describe the place rather than a unit and are
+# dropped.
+BARE_OCCUPANCY: Final = {
+    "#": "#",
+    "BLDG": "BLDG",
+    **{
+        occupancy: f"UNIT {occupancy}"
+        for occupancy in ("FRNT", "LOBBY", "OFC", "PH", "REAR", "SPC")
+    },
+}
+
+# Route designators outside of the USPS street types, which cannot be
+# normalized, e.g. 33 RR 2 or 77 INTERSTATE 10.
+ROUTE_TYPES: Final = {
+    "FM",
+    "HC",
+    "HCR",
+    "INTERSTATE",
+    "RR",
+    "RURAL ROUTE",
+    "SH",
+    "SR",
+}
+
+
+def _alternation(values: Iterable[str]) -> str:
+    # Longest first, so that e.g. NORTHEAST is preferred over NORTH.
+    return "|".join(re.escape(v) for v in sorted(values, key=len, reverse=True))
+
+
+_DIR: Final = _alternation(DIRECTIONALS)
+_TYPE: Final = _alternation(STREET_TYPES)
+_OCC: Final = _alternation(OCCUPANCY_TYPES)
+_ROUTES: Final = _alternation(ROUTE_TYPES)
+
+_NUMBER: Final = r"^(?P<number>\d\S*)"
+_PREDIR: Final = rf"(?: (?P<predir>{_DIR}))?"
+_POSTDIR: Final = rf"(?: (?P<postdir>{_DIR}))?$"
+
+# Street name followed by a street type, e.g. 123 N MAIN ST SE
+_SUFFIXED: Final = (
+    rf"{_NUMBER}{_PREDIR} (?P<name>.+?) (?P<type>{_TYPE}){_POSTDIR}"
+)
+# Street type followed by a route or name, e.g. 44 US HWY 1, 6 AVE A or
+# 5 AVE OF THE AMERICAS
+_ROUTE: Final = rf"{_NUMBER}{_PREDIR} (?P<type>{_TYPE}) (?P<name>.+?){_POSTDIR}"
+# Street name without a street type, e.g. 7 BROADWAY
+_PLAIN: Final = rf"{_NUMBER}{_PREDIR} (?P<name>.+?){_POSTDIR}"
+
+# Occupancy type and identifier, e.g. APT 4
+_UNIT: Final = rf"(?:{_OCC}) \S+"
+
+# Line 1 of at least two words, e.g. 5 FRONT ST, followed by any number
+# of designators with an identifier and one without.
+_LINES: Final = (
+    rf"^(?P<line1>\S+ .+?)(?P<units>(?: {_UNIT})*)(?: (?P<bare>{_OCC}))?$"
+)
+
+
+def _ordinal(number: pl.Expr) -> pl.Expr:
+    value = number.cast(pl.Int64(), strict=False)
+    suffix = (
+        pl.when((value % 100).is_between(11, 13))
+        .then(pl.lit("TH"))
+        .otherwise(
+            (value % 10).replace_strict(
+                {1: "ST", 2: "ND", 3: "RD"}, default="TH"
+            )
+        )
+    )
+
+    return pl.concat_str(value.cast(pl.String()), suffix)
+
+
+def normalize_address(address: pl.Expr) -> pl.Expr:
+    """Normalize street addresses to USPS long-hand form.
+
+    This is a vectorized equivalent of `addr_normalize`: directionals
+    and street types are expanded (N -> NORTH, ST -> STREET), numbered
+    streets gain an ordinal (3 ST -> 3RD STREET), occupancy types are
+    abbreviated (APARTMENT -> APT) and the result is upper case. Address
+    line 1 and line 2 are joined by a single space. Line 2 may hold a
+    building and an occupancy designator (BLDG 5 APT 3), and a trailing
+    designator without an identifier is kept (REAR -> UNIT REAR) or
+    dropped (BASEMENT) as `addr_normalize` does.
+
+    Addresses that cannot be normalized, such as those without a house
+    number, with an occupancy type but no identifier, with two occupancy
+    types, with only a street type (123 ST) or on a rural or interstate
+    route (33 RR 2), become null.
+
+    Parameters
+    ----------
+    address : pl.Expr
+        Single line street addresses, e.g. "123 n main st apt 4".
+
+    Returns
+    -------
+    pl.Expr
+        The normalized addresses, e.g. "123 NORTH MAIN STREET APT 4".
+    """
+    cleaned = (
+        address.str.to_uppercase()
+        .str.replace_all(r"[.,]", "")
+        .str.replace_all("#", " # ", literal=True)
+        .str.replace_all(r"\s+", " ")
+        .str.strip_chars()
+    )
+
+    # Each step adds fields to a struct computed from the previous fields
+    # (`pl.field`), rather than nesting whole expressions into each other,
+    # which would grow the expression exponentially with every step.
+    f = pl.field
+
+    def parsed(parse: str, name: str) -> pl.Expr:
+        return f(parse).struct.field(name)
+
+    def street_field(name: str) -> pl.Expr:
+        return (
+            pl.when(f("is_suffixed"))
+            .then(parsed("suffixed", name))
+            .when(f("is_route"))
+            .then(parsed("route", name))
+            .otherwise(
+                parsed("plain", name)
+                if name != "type"
+                else pl.lit(None, dtype=pl.String())
+            )
+        )
+
+    unit_type = pl.element().str.extract(rf"^({_OCC}) ")
+
+    return (
+        cleaned.str.extract_groups(_LINES)
+        .struct.with_fields(
+            suffixed=f("line1").str.extract_groups(_SUFFIXED),
+            route=f("line1").str.extract_groups(_ROUTE),
+            plain=f("line1").str.extract_groups(_PLAIN),
+            units=f("units").str.extract_all(_UNIT),
+        )
+        # Name types and prefixes are read as part of the street name
+        # next to a directional (see NAME_TYPES and NAME_PREFIXES).
+        .struct.with_fields(
+            is_suffixed=parsed("suffixed", "number").is_not_null()
+            & (
+                parsed("suffixed", "postdir").is_null()
+                | parsed("suffixed", "type").is_in(list(NAME_TYPES)).not_()
+            ),
+            is_route=parsed("route", "number").is_not_null()
+            & (
+                parsed("route", "predir").is_null()
+                & parsed("route", "postdir").is_null()
+                | parsed("route", "type").is_in(list(NAME_PREFIXES)).not_()
+            ),
+        )
+        .struct.with_fields(
+            **{
+                name: street_field(name)
+                for name in ("number", "predir", "name", "type", "postdir")
+            }
+        )
+        # A lone directional before a street type is the street name,
+        # e.g. 123 E ST -> 123 E STREET.
+        .struct.with_fields(
+            directional_name=f("type").is_null()
+            & f("predir").is_not_null()
+            & f("name").is_in(list(STREET_TYPES))
+        )
+        .struct.with_fields(
+            type=pl.when(f("directional_name"))
+            .then(f("name"))
+            .otherwise(f("type")),
+            name=pl.when(f("directional_name"))
+            .then(f("predir"))
+            .otherwise(f("name")),
+            predir=pl.when(f("directional_name"))
+            .then(None)
+            .otherwise(f("predir")),
+        )
+        # Street types alone are not street names, e.g. 123 ST, except
+        # for highways, e.g. 7 HWY -> 7 HIGHWAY.
+        .struct.with_fields(
+            type_only=f("type").is_null()
+            & f("predir").is_null()
+            & f("name").is_in(list(STREET_TYPES))
+        )
+        .struct.with_fields(
+            type=pl.when(f("type_only")).then(f("name")).otherwise(f("type")),
+            name=pl.when(f("type_only")).then(None).otherwise(f("name")),
+            type_only=f("type_only")
+            & (
+                f("name").replace_strict(STREET_TYPES, default=None)
+                != "HIGHWAY"
+            ),
+        )
+        .struct.with_fields(
+            unsupported_route=f("name")
+            .str.contains(rf"^(?:{_ROUTES}) ")
+            .fill_null(False),
+            name=pl.when(f("is_suffixed") & f("name").str.contains(r"^\d+$"))
+            .then(_ordinal(f("name")))
+            .otherwise(f("name")),
+            route_first=f("is_suffixed").not_() & f("is_route"),
+            typeless=f("type").is_null() & f("postdir").is_null(),
+        )
+        # APARTMENT right after a street name without a street type or
+        # postdirectional ends the name, and its identifier is a unit,
+        # e.g. 3 N MAIN APARTMENT 4 -> 3 NORTH MAIN APARTMENT UNIT 4. A
+        # street name of only APARTMENT takes the identifier from the name.
+        .struct.with_fields(
+            apartment_unit=f("typeless")
+            & f("units").list.first().str.starts_with("APARTMENT "),
+            apartment_name=f("typeless")
+            & f("name").str.contains(r"^APARTMENT \S+$"),
+        )
+        .struct.with_fields(
+            apartment_id=pl.when(f("apartment_name")).then(
+                pl.concat_str(
+                    pl.lit("UNIT "), f("name").str.extract(r" (\S+)$")
+                )
+            ),
+            name=pl.when(f("apartment_name"))
+            .then(pl.lit("APARTMENT"))
+            .otherwise(f("name")),
+        )
+        .struct.with_fields(
+            line1=pl.concat_str(
+                f("number"),
+                f("predir").replace_strict(DIRECTIONALS, default=None),
+                pl.when(f("route_first")).then(None).otherwise(f("name")),
+                f("type").replace_strict(STREET_TYPES, default=None),
+                pl.when(f("route_first")).then(f("name")).otherwise(None),
+                f("postdir").replace_strict(DIRECTIONALS, default=None),
+                pl.when(f("apartment_unit")).then(pl.lit("APARTMENT")),
+                separator=" ",
+                ignore_nulls=True,
+            ),
+            line2=f("units")
+            .list.eval(
+                pl.concat_str(
+                    pl.when(unit_type.is_in(list(SUBADDRESS_TYPES)))
+                    .then(unit_type)
+                    .otherwise(unit_type.replace_strict(OCCUPANCY_TYPES)),
+                    pl.element().str.extract(r" (\S+)$"),
+                    separator=" ",
+                )
+            )
+            .list.join(" "),
+            # At most one designator of each kind, e.g. APT 2 FL 3 is
+            # ambiguous while BLDG 5 APT 3 is not.
+            repeated=f("units")
+            .list.eval(
+                pl.when(unit_type.is_in(list(SUBADDRESS_TYPES)))
+                .then(pl.lit("subaddress"))
+                .when(unit_type == "#")
+                .then(pl.lit("#"))
+                .otherwise(pl.lit("occupancy"))
+            )
+            .list.n_unique()
+            < f("units").list.len(),
+            has_units=f("units").list.len() > 0,
+            # A designator without an identifier extends that of the
+            # preceding designator, e.g. APT 4 REAR, or stands alone.
+            incomplete=f("bare").is_in(list(IDENTIFIED_TYPES)).fill_null(False),
+        )
+        .struct.with_fields(
+            line2=pl.when(f("apartment_unit"))
+            .then(f("line2").str.replace("^APT ", "UNIT "))
+            .when(f("has_units"))
+            .then(f("line2")),
+            bare=pl.when(f("has_units") | f("apartment_name"))
+            .then(f("bare"))
+            .otherwise(f("bare").replace_strict(BARE_OCCUPANCY, default=None)),
+        )
+        .struct.with_fields(
+            normalized=pl.when(
+                f("number").is_not_null()
+                & f("incomplete").not_()
+                & f("repeated").not_()
+                & f("type_only").not_()
+                & f("unsupported_route").not_()
+            ).then(
+                pl.concat_str(
+                    f("line1"),
+                    f("apartment_id"),
+                    f("line2"),
+                    f("bare"),
+                    separator=" ",
+                    ignore_nulls=True,
+                )
+            )
+        )
+        .struct.field("normalized")
+    )
+
+
+class AddressCache:
+    """Memoized `normalize_address` over the unique values of a column.
+
+    Raw addresses repeat heavily, both within a county (units sharing a
+    street line, overlapping providers) and across counties and runs.
+    Only addresses without a cached result are normalized, and results
+    are persisted to `path` keyed by raw address and
+    `NORMALIZER_VERSION`, so that later runs reuse them.
+
+    Results are kept in a SQLite database, so that only the addresses
+    looked up are read and new results are appended in a transaction.
+    Concurrent runs sharing `path` are serialized by SQLite's file
+    locks, and threads sharing a cache by a lock of its own.
+
+    Parameters
+    ----------
+    path : Path, optional
+        SQLite database persisting normalized addresses. If None,
+        results are only kept in memory.
+
+    Attributes
+    ----------
+    hits : int
+        Number of unique addresses found in the cache.
+    misses : int
+        Number of unique addresses that had to be normalized.
+    """
+
+    # Seconds to wait for other runs holding the database lock
+    TIMEOUT: Final = 600.0
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            if self.path is not None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+
+            # Used from the threads evaluating `expr`, under `_lock`
+            self._connection = sqlite3.connect(
+                ":memory:" if self.path is None else self.path,
+                timeout=self.TIMEOUT,
+                check_same_thread=False,
+            )
+            with self._connection:
+                self._connection.execute(
+                    "CREATE TABLE IF NOT EXISTS addresses ("
+                    " raw TEXT NOT NULL,"
+                    " version INTEGER NOT NULL,"
+                    " normalized TEXT,"
+                    " PRIMARY KEY (raw, version)"
+                    ") WITHOUT ROWID"
+                )
+
+        return self._connection
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def __enter__(self) -> "AddressCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _lookup(self, raw: list[str]) -> list[tuple[str, Optional[str]]]:
+        self.connection.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS lookup (raw TEXT PRIMARY KEY)"
+        )
+        self.connection.execute("DELETE FROM lookup")
+        self.connection.executemany(
+            "INSERT INTO lookup VALUES (?)", ((r,) for r in raw)
+        )
+        return self.connection.execute(
+            "SELECT raw, normalized FROM addresses JOIN lookup USING (raw) "
+            "WHERE version = ?",
+            (NORMALIZER_VERSION,),
+        ).fetchall()
+
+    def normalize(self, addresses: pl.Series) -> pl.Series:
+        """Normalize `addresses`, reusing and updating cached results."""
+        unique = addresses.drop_nulls().unique().to_frame("raw")
+        schema = {"raw": pl.String(), "normalized": pl.String()}
+
+        with self._lock:
+            with self.connection:
+                known = pl.DataFrame(
+                    self._lookup(unique["raw"].to_list()),
+                    schema=schema,
+                    orient="row",
+                )
+
+            missing = unique.join(known, on="raw", how="anti").with_columns(
+                normalized=pl.col("raw").pipe(normalize_address)
+            )
+
+            # Other runs may have added the same addresses meanwhile,
+            # with the same results.
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT OR IGNORE INTO addresses VALUES (?, ?, ?)",
+                    (
+                        (raw, NORMALIZER_VERSION, normalized)
+                        for raw, normalized in missing.iter_rows()
+                    ),
+                )
+
+        self.hits += known.height
+        self.misses += missing.height
+
+        lookup = pl.concat((known, missing), how="vertical")
+        return addresses.replace_strict(
+            lookup["raw"],
+            lookup["normalized"],
+            default=None,
+            return_dtype=pl.String(),
+        )
+
+    def expr(self, address: pl.Expr) -> pl.Expr:
+        """Expression normalizing `address` through this cache."""
+        return address.map_batches(self.normalize, return_dtype=pl.String())
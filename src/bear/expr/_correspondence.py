@@ -4,9 +4,14 @@ from polars._typing import IntoExpr
 from scourgify import normalize_address_record
 
 from dataclasses import dataclass
-from typing import Iterable
+from functools import partial
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
 
 import bear._plugins as udf
+from bear.core import schema
+from bear.expr._address import AddressCache
+from bear.expr._geometry import has_derived
 
 
 @dataclass(slots=True)
@@ -35,6 +40,24 @@ def addr_normalize(s: str) -> str:
         return " ".join([result["address_line_1"], result["address_line_2"]])
 
 
+def sc_foreign() -> pl.Expr:
+    """The `foreign` column, or an empty list if there is none."""
+    return pl.coalesce(
+        pl.col("^foreign$"),
+        pl.lit(
+            [],
+            dtype=pl.List(
+                pl.Struct(
+                    {
+                        "provider": pl.String(),
+                        "key": pl.String(),
+                    }
+                )
+            ),
+        ),
+    )
+
+
 def sc_initialize_lazy(
     lf: pl.LazyFrame,
     args: JoinArgs,
@@ -44,57 +67,45 @@ def sc_initialize_lazy(
 ) -> pl.LazyFrame:
     return (
         lf.with_row_index(row_index_name)
-        .with_columns(
-            foreign=pl.coalesce(
-                pl.col("^foreign$"),
-                pl.lit(
-                    [],
-                    dtype=pl.List(
-                        pl.Struct(
-                            {
-                                "provider": pl.String(),
-                                "key": pl.String(),
-                            }
-                        )
-                    ),
-                ),
-            ),
-        )
+        .with_columns(foreign=sc_foreign())
         .rename({args.geometry: "geometry", args.id: "id"})
         .select(pl.all().name.suffix(suffix))
     )
 
 
-def sc_coalesce_attr(attr: str) -> pl.Expr:
-    return pl.coalesce(pl.selectors.starts_with(attr))
+def sc_geometry_as_wkb(
+    lf: pl.LazyFrame, geometry: str = "geometry"
+) -> pl.LazyFrame:
+    return lf.with_columns(pl.col(geometry).pipe(udf.to_wkb))
 
 
-def sc_correspond_overlap(
-    lf: pl.LazyFrame,
-    left_col: IntoExpr,
-    right_col: IntoExpr,
-    *,
-    column_name: str = "corresponds",
-    threshold: IntoExpr = 0.3,
-) -> pl.LazyFrame:
+def sc_common_geometry(
+    left: pl.LazyFrame,
+    right: pl.LazyFrame,
+    left_args: JoinArgs,
+    right_args: JoinArgs,
+) -> tuple[pl.LazyFrame, pl.LazyFrame]:
+    """Bring the geometry of `left` and `right` to a common encoding.
+
+    Geometries stored with different GeoArrow encodings (or mixing
+    GeoArrow and WKB) are converted to WKB, since geometries of both
+    sides end up in the same column.
+    """
+    left_dtype = left.collect_schema()[left_args.geometry]
+    right_dtype = right.collect_schema()[right_args.geometry]
+    if left_dtype == right_dtype:
+        return left, right
+
     return (
-        lf.with_columns(
-            # Intersection Area
-            udf.area(udf.intersection(left_col, right_col)).alias(
-                "area_intersection"
-            ),
-            # Relative Area
-            pl.min_horizontal(udf.area(left_col), udf.area(right_col)).alias(
-                "area_relative"
-            ),
-        )
-        .with_columns(
-            metric=(pl.col("area_intersection") / pl.col("area_relative"))
-        )
-        .with_columns((pl.col("metric") > threshold).alias(column_name))
+        sc_geometry_as_wkb(left, left_args.geometry),
+        sc_geometry_as_wkb(right, right_args.geometry),
     )
 
 
+def sc_coalesce_attr(attr: str) -> pl.Expr:
+    return pl.coalesce(pl.selectors.starts_with(attr))
+
+
 def sc_correspond_distance(
     lf: pl.LazyFrame,
     left_col: IntoExpr,
@@ -108,75 +119,81 @@ def sc_correspond_distance(
     ).with_columns((pl.col("metric") < threshold).alias(column_name))
 
 
-def sc_anti_join(
-    origin: pl.LazyFrame,
-    joined: pl.LazyFrame,
-    select: Iterable[str],
-    **join_kwargs,
+def sc_match_overlap(
+    lhs: pl.LazyFrame,
+    rhs: pl.LazyFrame,
+    *,
+    threshold: float = 0.3,
+    index: Optional[Path] = None,
 ) -> pl.LazyFrame:
-    join_kwargs["how"] = "anti"
+    """Pair LHS and RHS rows whose geometries overlap.
 
+    The index query, intersection area and relative area ratio are
+    evaluated in a single plugin call that returns the flat table of
+    corresponding `(index_left, index_right, metric)` rows, which are
+    then joined back onto both sides.
+    """
     return (
-        origin.join(joined, **join_kwargs)
+        # Join RHS geometry onto LHS so that RHS geometry is
+        # in lazy context of LHS data frame.
+        pl.concat(
+            (lhs.select("geometry_left"), rhs.select("geometry_right")),
+            how="horizontal",
+        )
+        .select(
+            udf.overlaps(
+                pl.col("geometry_left"),
+                pl.col("geometry_right"),
+                threshold=threshold,
+                index=index,
+            ).alias("pairs")
+        )
+        .unnest("pairs")
         .with_columns(
-            foreign=pl.coalesce(
-                pl.col("^foreign$"),
-                pl.lit(
-                    [],
-                    dtype=pl.List(
-                        pl.Struct(
-                            {
-                                "provider": pl.String(),
-                                "key": pl.String(),
-                            }
-                        )
-                    ),
-                ),
-            ),
+            pl.col("index_left", "index_right").cast(pl.get_index_type())
         )
-        .select(*select)
+        # inner-join both sides (including geometry) onto the pairs
+        .join(lhs, how="inner", on="index_left")
+        .join(rhs, how="inner", on="index_right")
     )
 
 
-def spatial_correspondence(
-    left: pl.LazyFrame,
-    right: pl.LazyFrame,
-    /,
-    left_args=JoinArgs(),
-    right_args=JoinArgs(),
-    use_distance=False,
+def sc_match_overlap_broadcast(
+    lhs: pl.LazyFrame,
+    rhs: pl.LazyFrame,
+    *,
+    token: str,
+    threshold: float = 0.3,
 ) -> pl.LazyFrame:
-    """Perform a spatial correspondence between two datasets.
+    """Streaming counterpart of `sc_match_overlap`.
 
-    Parameters
-    ----------
-    left : pl.LazyFrame
-        Primary data frame. Geometry and attributes take
-        priority from this data frame.
-    right : pl.LazyFrame
-        Secondary data frame to join onto `left`.
-    left_args : _type_, optional
-        Join arguments for left data frame.
-    right_args : _type_, optional
-        Join arguments for right data frame.
-    use_distance : bool, optional
-        If True, use distance to correspond features rather than
-        polygon overlap. Defaults to False.
-
-    Returns
-    -------
-    pl.LazyFrame
-        The lazy computation for corresponding `right` onto `left`.
+    RHS geometries are taken from the broadcast index `token` (see
+    `bear._plugins.broadcast`), so LHS rows are matched in independent
+    batches and RHS geometries never enter the LHS lazy context.
     """
-    lhs = sc_initialize_lazy(left, left_args, "_left")
-    rhs = sc_initialize_lazy(right, right_args, "_right")
-
-    udf_join_indices = udf.nearest if use_distance else udf.intersects
-    udf_corresponds = (
-        sc_correspond_distance if use_distance else sc_correspond_overlap
+    return (
+        lhs.with_columns(
+            pl.col("geometry_left")
+            .pipe(udf.overlaps_broadcast, token=token, threshold=threshold)
+            .alias("pairs")
+        )
+        .unnest("pairs")
+        .explode("index_right", "metric")
+        .filter(pl.col("index_right").is_not_null())
+        .with_columns(pl.col("index_right").cast(pl.get_index_type()))
+        .join(rhs, how="inner", on="index_right")
     )
 
-    intersected = (
+
+def sc_match_distance(
+    lhs: pl.LazyFrame,
+    rhs: pl.LazyFrame,
+    *,
+    threshold: IntoExpr = 10,
+    index: Optional[Path] = None,
+) -> pl.LazyFrame:
+    """Pair LHS and RHS rows whose geometries are within `threshold`."""
+    return (
         # Join RHS geometry onto LHS so that RHS geometry is
         # in lazy context of LHS data frame.
         pl.concat(
@@ -198,7 +215,7 @@ def spatial_correspondence(
         .with_columns(
             pl.col("geometry_left")
             .drop_nulls()
-            .pipe(udf_join_indices, pl.col("geometry_right"))
+            .pipe(udf.nearest, pl.col("geometry_right"), index=index)
             .alias("index_right")
         )
         # Convert list column to integer column, adding more rows to data frame
@@ -210,14 +227,144 @@ def spatial_correspondence(
         # inner-join RHS columns (including geometry) onto LHS based on indices
         .join(rhs, how="inner", on="index_right")
         .filter(pl.col("index_right").is_not_null())
-        # Apply correspondence function (overlaps or distance) to ensure correspondence
+        # Apply correspondence function to ensure correspondence
         # and filter to only corresponding rows
         .pipe(
-            udf_corresponds,
+            sc_correspond_distance,
+            pl.col("geometry_left"),
+            pl.col("geometry_right"),
+            threshold=threshold,
+        )
+        .filter("corresponds")
+        .drop("corresponds")
+    )
+
+
+def sc_match_distance_broadcast(
+    lhs: pl.LazyFrame,
+    rhs: pl.LazyFrame,
+    *,
+    token: str,
+    threshold: IntoExpr = 10,
+) -> pl.LazyFrame:
+    """Streaming counterpart of `sc_match_distance`."""
+    return (
+        lhs.with_columns(
+            pl.col("geometry_left")
+            .pipe(udf.nearest_broadcast, token=token)
+            .alias("index_right")
+        )
+        .explode("index_right")
+        .filter(pl.col("index_right").is_not_null())
+        .with_columns(pl.col("index_right").cast(pl.get_index_type()))
+        .join(rhs, how="inner", on="index_right")
+        .pipe(
+            sc_correspond_distance,
             pl.col("geometry_left"),
             pl.col("geometry_right"),
+            threshold=threshold,
         )
         .filter("corresponds")
+        .drop("corresponds")
+    )
+
+
+def sc_match_indices(matched: pl.LazyFrame) -> pl.LazyFrame:
+    """Distinct `index_left` and `index_right` of the `matched` pairs.
+
+    Both are gathered into lists of a single row, from one evaluation of
+    `matched` that is cached for the unmatched rows of either side (see
+    `sc_unmatched`).
+    """
+    return matched.select(
+        pl.col("index_left", "index_right").unique().implode()
+    ).cache()
+
+
+def sc_unmatched(
+    origin: pl.LazyFrame,
+    indices: pl.LazyFrame,
+    index: str,
+    select: Iterable[str],
+) -> pl.LazyFrame:
+    """Rows of `origin` whose row index is absent from `indices[index]`.
+
+    `indices` are the matched row indices of `sc_match_indices`, so that
+    unmatched rows are found by an anti join on row position rather than
+    by joining `origin` onto the matched rows by id.
+    """
+    matched = indices.select(
+        pl.col(index).explode().cast(pl.get_index_type()).alias("_index")
+    )
+    return (
+        origin.with_row_index("_index")
+        .join(matched, on="_index", how="anti")
+        .with_columns(foreign=sc_foreign())
+        .select(*select)
+    )
+
+
+def spatial_correspondence(
+    left: pl.LazyFrame,
+    right: pl.LazyFrame,
+    /,
+    left_args=JoinArgs(),
+    right_args=JoinArgs(),
+    use_distance=False,
+    right_index: Optional[Path] = None,
+    right_broadcast: Optional[str] = None,
+) -> pl.LazyFrame:
+    """Perform a spatial correspondence between two datasets.
+
+    Parameters
+    ----------
+    left : pl.LazyFrame
+        Primary data frame. Geometry and attributes take
+        priority from this data frame.
+    right : pl.LazyFrame
+        Secondary data frame to join onto `left`.
+    left_args : _type_, optional
+        Join arguments for left data frame.
+    right_args : _type_, optional
+        Join arguments for right data frame.
+    use_distance : bool, optional
+        If True, use distance to correspond features rather than
+        polygon overlap. Defaults to False.
+    right_index : Path, optional
+        If given, the spatial index of `right` is memory-mapped from
+        this path when it holds a valid index, and persisted to it
+        otherwise.
+    right_broadcast : str, optional
+        Token of the broadcast index of `right` geometries (see
+        `bear._plugins.broadcast`). If given, `left` is matched in
+        independent batches, so the correspondence can run under the
+        streaming engine. `right_index` is then unused.
+
+    Returns
+    -------
+    pl.LazyFrame
+        The lazy computation for corresponding `right` onto `left`.
+    """
+    left, right = sc_common_geometry(left, right, left_args, right_args)
+
+    lhs = sc_initialize_lazy(left, left_args, "_left")
+    rhs = sc_initialize_lazy(right, right_args, "_right")
+
+    if right_broadcast is not None:
+        sc_match = partial(
+            sc_match_distance_broadcast
+            if use_distance
+            else sc_match_overlap_broadcast,
+            token=right_broadcast,
+        )
+    else:
+        sc_match = partial(
+            sc_match_distance if use_distance else sc_match_overlap,
+            index=right_index,
+        )
+
+    intersected = (
+        sc_match(lhs, rhs)
         # Below handles tied observations
         # > .filter(
         # >     pl.col("metric")
@@ -235,7 +382,7 @@ def spatial_correspondence(
         #     .first()
         # )
         # ---------------
-        .drop("corresponds", "geometry_right")
+        .drop("geometry_right")
         # At this point, we have a data frame that contains only the
         # geometries between LHS and RHS that have some correspondence.
         # The following expressions clean the code to conform to the base schema.
@@ -258,8 +405,9 @@ def spatial_correspondence(
         )
         .with_columns(foreign=pl.concat_list("old_foreign", "new_foreign"))
         .select(
+            "index_left",
+            "index_right",
             pl.col("id_left").alias("id"),
-            pl.col("id_right").alias("tmp"),
             pl.col("provider_left").alias("provider"),
             *("classification", "address", "height", "levels", "foreign"),
             pl.col("geometry_left").alias("geometry"),
@@ -277,24 +425,18 @@ def spatial_correspondence(
         "geometry",
     )
 
+    # Matched pairs are computed once, for both the output and the
+    # unmatched rows of either side.
+    intersected = intersected.cache()
+    indices = sc_match_indices(intersected)
+
     # Get unmatched rows from left data frame
-    left_missing = sc_anti_join(
-        left,
-        intersected,
-        select_cols,
-        on="id",
-    )
+    left_missing = sc_unmatched(left, indices, "index_left", select_cols)
 
     # Get unmatched rows from right data frame
-    right_missing = sc_anti_join(
-        right,
-        intersected,
-        select_cols,
-        left_on="id",
-        right_on="tmp",
-    )
+    right_missing = sc_unmatched(right, indices, "index_right", select_cols)
 
-    intersected = intersected.drop("tmp")
+    intersected = intersected.drop("index_left", "index_right")
 
     # Join all data frames together
     intersected = pl.concat(
@@ -305,35 +447,278 @@ def spatial_correspondence(
     return intersected
 
 
-def merge_footprints_and_addresses(
-    footprints: pl.LazyFrame, addresses: pl.LazyFrame
+def sc_cluster_roots(pairs: pl.LazyFrame, datasets: int) -> pl.LazyFrame:
+    """Root of the cluster of each geometry anchored by `pairs`.
+
+    `pairs` are overlapping pairs from a higher priority `index_left` to
+    a lower priority `index_right`, with the `priority` of the left
+    geometry and their overlap `metric`. Each right geometry is anchored
+    to its overlap of highest priority (ties going to the largest
+    overlap, then to the lowest index), and anchors are followed until
+    a geometry without an anchor is reached. Geometries without an
+    anchor are the roots of their own clusters, and are omitted.
+    """
+    anchors = (
+        pairs.sort(
+            "priority",
+            "metric",
+            "index_left",
+            descending=[False, True, False],
+        )
+        .group_by("index_right")
+        .first()
+        .select(index="index_right", root="index_left")
+    )
+
+    # Anchors are of strictly higher priority, so following them
+    # reaches the root of every cluster in fewer steps than datasets.
+    roots = anchors
+    for _ in range(datasets - 2):
+        roots = roots.join(
+            anchors.rename({"index": "root", "root": "anchor"}),
+            on="root",
+            how="left",
+        ).select("index", root=pl.coalesce("anchor", "root"))
+
+    return roots
+
+
+def multi_correspondence(
+    frames: Sequence[pl.LazyFrame],
+    /,
+    args=JoinArgs(),
+    threshold: float = 0.3,
+    broadcast: Optional[str] = None,
 ) -> pl.LazyFrame:
+    """Perform a spatial correspondence between any number of datasets.
+
+    All geometries are indexed together, and every overlapping pair
+    between different datasets is found in a single sweep, where each
+    geometry is only tested against those of lower priority datasets.
+    Each
+    geometry is then anchored to the overlapping geometry of the
+    highest priority dataset (ties going to the largest overlap),
+    and anchors are followed transitively to form clusters. Each
+    cluster is output as a single row with the id and geometry of its
+    highest priority member.
+
+    Parameters
+    ----------
+    frames : Sequence[pl.LazyFrame]
+        Data frames to correspond, in decreasing priority. Geometry
+        and attributes are taken from the first data frame that
+        provides them within a cluster.
+    args : JoinArgs, optional
+        Join arguments shared by all data frames.
+    threshold : float, optional
+        Minimum overlap, relative to the smaller geometry of a pair,
+        for two geometries to correspond. Defaults to 0.3.
+    broadcast : str, optional
+        Token of the broadcast index of the geometries of all `frames`,
+        concatenated in order (see `bear._plugins.broadcast`). If given,
+        geometries are matched in independent batches against it.
+
+    Returns
+    -------
+    pl.LazyFrame
+        The lazy computation of the corresponding clusters, with the
+        same columns as `spatial_correspondence`, followed by the
+        `schema.derived` columns when all `frames` have them.
+    """
+    schemas = [frame.collect_schema() for frame in frames]
+    if len({s[args.geometry] for s in schemas}) > 1:
+        frames = [sc_geometry_as_wkb(frame, args.geometry) for frame in frames]
+
+    # Derived geometry columns are carried through when every dataset
+    # has them, and their areas are reused by the overlap sweep.
+    derived = (
+        schema.derived.names()
+        if all(has_derived(s.names()) for s in schemas)
+        else []
+    )
+
+    combined = pl.concat(
+        [
+            frame.rename({args.geometry: "geometry", args.id: "id"})
+            .with_columns(foreign=sc_foreign())
+            .select(
+                "id",
+                "provider",
+                *("classification", "address", "height", "levels"),
+                "foreign",
+                "geometry",
+                *derived,
+                priority=pl.lit(priority, dtype=pl.UInt32()),
+            )
+            for priority, frame in enumerate(frames)
+        ],
+        how="vertical_relaxed",
+    ).with_row_index("index")
+
+    # Datasets are concatenated in priority order, so the geometries of
+    # lower priority datasets are those after the end of each dataset.
+    # Pairs within a dataset, or from a lower to a higher priority, are
+    # then skipped before their overlap is computed.
+    min_right = pl.col("index").max().over("priority") + 1
+
+    # Overlapping pairs from a higher (left) to a lower (right) priority
+    # dataset, using a single index over all geometries.
+    if broadcast is not None:
+        pairs = (
+            combined.select(
+                "priority",
+                index_left="index",
+                pairs=udf.overlaps_broadcast(
+                    pl.col("geometry"),
+                    token=broadcast,
+                    threshold=threshold,
+                    min_right=min_right,
+                ),
+            )
+            .unnest("pairs")
+            .explode("index_right", "metric")
+            .filter(pl.col("index_right").is_not_null())
+            .with_columns(pl.col("index_right").cast(pl.get_index_type()))
+        )
+    else:
+        pairs = (
+            pl.concat(
+                (
+                    combined.select(
+                        geometry_left=pl.col("geometry"),
+                        area_left=pl.col("^area$"),
+                        min_right=min_right,
+                    ),
+                    combined.select(
+                        geometry_right=pl.col("geometry"),
+                        area_right=pl.col("^area$"),
+                    ),
+                ),
+                how="horizontal",
+            )
+            .select(
+                udf.overlaps(
+                    pl.col("geometry_left"),
+                    pl.col("geometry_right"),
+                    threshold=threshold,
+                    areas=(
+                        (pl.col("area_left"), pl.col("area_right"))
+                        if derived
+                        else None
+                    ),
+                    min_right=pl.col("min_right"),
+                ).alias("pairs")
+            )
+            .unnest("pairs")
+            .with_columns(
+                pl.col("index_left", "index_right").cast(pl.get_index_type())
+            )
+            .join(
+                combined.select("priority", index_left="index"),
+                on="index_left",
+            )
+        )
+
+    roots = sc_cluster_roots(pairs, len(frames))
+
+    # Null foreign lists, and empty ones before polars 2, explode to
+    # nulls, which are dropped.
+    foreign = pl.col("foreign").list.drop_nulls().explode()
+
+    return (
+        combined.join(roots, on="index", how="left")
+        .with_columns(root=pl.coalesce("root", "index"))
+        .sort("root", "priority", "index")
+        .group_by("root", maintain_order=True)
+        .agg(
+            pl.col("id", "provider", "geometry", *derived).first(),
+            *(
+                pl.col(attr).drop_nulls().first()
+                for attr in ("classification", "address", "height", "levels")
+            ),
+            old_foreign=foreign.filter(foreign.is_not_null()),
+            new_foreign=pl.struct(
+                provider=pl.col("provider"),
+                key=pl.col("id"),
+                schema={
+                    "provider": pl.String(),
+                    "key": pl.String(),
+                },
+            ).slice(1),
+        )
+        .select(
+            "id",
+            "provider",
+            *("classification", "address", "height", "levels"),
+            pl.concat_list("old_foreign", "new_foreign").alias("foreign"),
+            "geometry",
+            *derived,
+        )
+    )
+
+
+def sc_merge_match(
+    footprints: pl.LazyFrame,
+    addresses: pl.LazyFrame,
+    *,
+    max_distance: float = 10.0,
+    broadcast: Optional[str] = None,
+) -> pl.LazyFrame:
+    """Match addresses onto their nearest footprint.
+
+    Returns matched addresses, along with the unmatched footprints
+    and addresses, before addresses are normalized and deduplicated.
+    If `broadcast` is the token of the broadcast index of footprint
+    geometries, addresses are matched in independent batches.
+    """
+    # Footprint and address geometries are mixed in the output, so
+    # any native GeoArrow encodings are brought back to WKB.
+    footprints = sc_geometry_as_wkb(footprints)
+    addresses = sc_geometry_as_wkb(addresses)
+
     # Left = Footprints
     lhs = sc_initialize_lazy(footprints, JoinArgs(), "_left")
     # Right = Addresses
     rhs = sc_initialize_lazy(addresses, JoinArgs(), "_right")
 
-    merged = (
-        # Join footprint geometries onto addresses.
-        pl.concat((rhs, lhs.select("geometry_left")), how="horizontal")
-        .with_columns(
-            index_left=pl.col("geometry_right").pipe(
-                udf.nearest, pl.col("geometry_left")
+    # Retrieve the single nearest footprint (and its distance) within
+    # `max_distance` of each address, as an {index, distance} struct.
+    # Ties go to the lowest footprint row, so each address is matched at
+    # most once and every address matched to a footprint is kept.
+    if broadcast is not None:
+        nearest = rhs.with_columns(
+            nearest=pl.col("geometry_right").pipe(
+                udf.nearest_one_broadcast,
+                token=broadcast,
+                max_distance=max_distance,
+            )
+        )
+    else:
+        nearest = (
+            # Join footprint geometries onto addresses.
+            pl.concat((rhs, lhs.select("geometry_left")), how="horizontal")
+            .with_columns(
+                nearest=pl.col("geometry_right").pipe(
+                    udf.nearest_one,
+                    pl.col("geometry_left"),
+                    max_distance=max_distance,
+                )
             )
+            .drop("geometry_left")
+            # We may have NULL RHS indices, since height(LHS) might be larger than height(RHS)
+            .filter(pl.col("index_right").is_not_null())
         )
-        .explode("index_left")
-        .drop("geometry_left")
+
+    merged = (
+        nearest.with_columns(
+            index_left=pl.col("nearest")
+            .struct.field("index")
+            .cast(pl.get_index_type()),
+            metric=pl.col("nearest").struct.field("distance"),
+        )
+        .drop("nearest")
         .filter(pl.col("index_left").is_not_null())
         .join(lhs, how="inner", on="index_left")
-        .filter(pl.col("index_left").is_not_null())
-        .pipe(
-            sc_correspond_distance,
-            pl.col("geometry_right"),
-            pl.col("geometry_left"),
-        )
-        .filter("corresponds")
-        .filter(pl.col("metric") == pl.col("metric").min().over("id_left"))
-        .drop("corresponds")
         .with_columns(
             classification=sc_coalesce_attr("classification"),
             address=sc_coalesce_attr("address"),
@@ -353,9 +738,10 @@ def merge_footprints_and_addresses(
         )
         .with_columns(foreign=pl.concat_list("old_foreign", "new_foreign"))
         .select(
+            "index_left",
+            "index_right",
             pl.col("id_right").alias("id"),
             pl.col("provider_right").alias("provider"),
-            pl.col("id_left").alias("tmp"),
             *("classification", "address", "height", "levels", "foreign"),
             # When the point is ON the footprint surface, we use that (i.e. units),
             # otherwise, we use the footprint centroid (i.e. when address is in front of structure)
@@ -377,42 +763,44 @@ def merge_footprints_and_addresses(
         "geometry",
     )
 
+    # Matched pairs are computed once, for both the output and the
+    # unmatched rows of either side.
+    merged = merged.cache()
+    indices = sc_match_indices(merged)
+
     # Get unmatched rows from left data frame
-    footprints_missing = sc_anti_join(
-        footprints,
-        merged,
-        select_cols,
-        left_on="id",
-        right_on="tmp",
+    footprints_missing = sc_unmatched(
+        footprints, indices, "index_left", select_cols
     )
 
     # Get unmatched rows from right data frame
-    addresses_missing = sc_anti_join(
-        addresses,
-        merged,
-        select_cols,
-        left_on="id",
-        right_on="id",
+    addresses_missing = sc_unmatched(
+        addresses, indices, "index_right", select_cols
     )
 
-    merged = (
-        pl.concat(
-            (merged.drop("tmp"), footprints_missing, addresses_missing),
-            how="vertical",
-        )
-        .with_columns(
+    return pl.concat(
+        (
+            merged.drop("index_left", "index_right"),
+            footprints_missing,
+            addresses_missing,
+        ),
+        how="vertical",
+    )
+
+
+def sc_merge_finalize(
+    merged: pl.LazyFrame, address_cache: Optional[AddressCache] = None
+) -> pl.LazyFrame:
+    """Normalize and deduplicate the addresses of `sc_merge_match`."""
+    # Addresses are normalized once per unique value, reusing results
+    # persisted by `address_cache` when given.
+    if address_cache is None:
+        address_cache = AddressCache()
+
+    return (
+        merged.with_columns(
             address=pl.col("address")
-            .str.replace_all("\\s+dr$", " drive")
-            .str.replace_all("\\s+st$", " street")
-            .str.replace_all("\\s+ct$", " court")
-            .str.replace_all("\\s+ln$", " lane")
-            .str.replace_all("\\s+ave$", " avenue")
-            .str.replace_all("\\s+rd$", " road")
-            .map_elements(
-                addr_normalize,
-                return_dtype=pl.String(),
-            )
-            .replace("", pl.lit(None))
+            .pipe(address_cache.expr)
             .str.to_lowercase()
         )
         .with_columns(geometry=udf.centroid("geometry"))
@@ -437,4 +825,15 @@ def merge_footprints_and_addresses(
         .drop("provider")
     )
 
-    return merged
+
+def merge_footprints_and_addresses(
+    footprints: pl.LazyFrame,
+    addresses: pl.LazyFrame,
+    *,
+    max_distance: float = 10.0,
+    address_cache: Optional[AddressCache] = None,
+    broadcast: Optional[str] = None,
+) -> pl.LazyFrame:
+    return sc_merge_match(
+        footprints, addresses, max_distance=max_distance, broadcast=broadcast
+    ).pipe(sc_merge_finalize, address_cache)
@@ -0,0 +1,149 @@
+import numpy as np
+import polars as pl
+from polars._typing import IntoExpr
+
+from typing import Iterable
+
+import bear._plugins as udf
+from bear.core import schema
+
+
+def bbox_columns(geometry: IntoExpr = "geometry") -> pl.Expr:
+    """Expression of the `schema.bbox` columns of `geometry`."""
+    return udf.bounds(geometry).struct.unnest()
+
+
+def derive_geometry(geometry: IntoExpr = "geometry") -> list[pl.Expr]:
+    """Expressions of the `schema.derived` columns of `geometry`."""
+    return [
+        udf.area(geometry).alias("area"),
+        bbox_columns(geometry),
+        udf.centroid_xy(geometry)
+        .struct.rename_fields(["cx", "cy"])
+        .struct.unnest(),
+    ]
+
+
+def intersects_bbox(bounds: tuple[float, float, float, float]) -> pl.Expr:
+    """Whether the `schema.bbox` columns intersect `bounds`.
+
+    Used as a `pl.scan_parquet` predicate, row groups whose bounding box
+    statistics lie outside of `bounds` are skipped without decoding.
+    """
+    xmin, ymin, xmax, ymax = bounds
+    return (
+        (pl.col("xmax") >= xmin)
+        & (pl.col("xmin") <= xmax)
+        & (pl.col("ymax") >= ymin)
+        & (pl.col("ymin") <= ymax)
+    )
+
+
+def _hilbert(x: np.ndarray, y: np.ndarray, order: int) -> np.ndarray:
+    # Vectorized form of the iterative xy -> d conversion, one bit of
+    # both coordinates per step from the most significant.
+    n = np.uint64(1 << order)
+    d = np.zeros(len(x), dtype=np.uint64)
+    s = n >> np.uint64(1)
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        d += s * s * ((np.uint64(3) * rx) ^ ry).astype(np.uint64)
+
+        # Rotate the quadrant, so that the curve stays continuous
+        flip = ~ry & rx
+        x = np.where(flip, n - np.uint64(1) - x, x)
+        y = np.where(flip, n - np.uint64(1) - y, y)
+        x, y = np.where(ry, x, y), np.where(ry, y, x)
+        s >>= np.uint64(1)
+
+    return d
+
+
+def hilbert(
+    x: pl.Expr,
+    y: pl.Expr,
+    bounds: tuple[float, float, float, float],
+    order: int = 16,
+) -> pl.Expr:
+    """Position of the points (`x`, `y`) along a Hilbert curve.
+
+    `bounds` is divided into a grid of 2^`order` by 2^`order` cells,
+    and points are keyed by the position of their cell along the curve,
+    so that sorting by the key keeps nearby points close together.
+    Points outside of `bounds` are clamped to the nearest edge cell, and
+    NaN coordinates to the first cell.
+
+    Parameters
+    ----------
+    x : pl.Expr
+        X coordinates, e.g. of geometry centroids.
+    y : pl.Expr
+        Y coordinates.
+    bounds : tuple[float, float, float, float]
+        Bounding box (xmin, ymin, xmax, ymax) spanned by the curve.
+    order : int, optional
+        Number of bits per coordinate, at most 32. Defaults to 16.
+
+    Returns
+    -------
+    pl.Expr
+        The UInt64 Hilbert keys.
+    """
+    xmin, ymin, xmax, ymax = bounds
+    cells = 1 << order
+
+    def cell(v: pl.Expr, lo: float, hi: float) -> pl.Expr:
+        scale = cells / max(hi - lo, 1e-12)
+        return (
+            ((v - lo) * scale)
+            .fill_nan(0.0)
+            .floor()
+            .clip(0, cells - 1)
+            .cast(pl.UInt64())
+        )
+
+    def key(s: pl.Series) -> pl.Series:
+        xy = s.struct.unnest()
+        return pl.Series(
+            s.name,
+            _hilbert(
+                xy["x"].fill_null(0).to_numpy(),
+                xy["y"].fill_null(0).to_numpy(),
+                order,
+            ),
+            dtype=pl.UInt64(),
+        )
+
+    return pl.struct(x=cell(x, xmin, xmax), y=cell(y, ymin, ymax)).map_batches(
+        key, return_dtype=pl.UInt64(), is_elementwise=True
+    )
+
+
+def has_derived(columns: Iterable[str], *names: str) -> bool:
+    """Whether `columns` hold the derived columns `names`, or all of
+    `schema.derived` if none are given."""
+    return set(names or schema.derived.names()) <= set(columns)
+
+
+def centroid_xy(
+    columns: Iterable[str], geometry: IntoExpr = "geometry"
+) -> tuple[pl.Expr, pl.Expr]:
+    """Centroid coordinates of `geometry`, read from the derived `cx`
+    and `cy` columns when present in `columns`."""
+    if has_derived(columns, "cx", "cy"):
+        return pl.col("cx"), pl.col("cy")
+
+    xy = udf.centroid_xy(geometry)
+    return xy.struct.field("x"), xy.struct.field("y")
+
+
+def bbox_struct(
+    columns: Iterable[str], geometry: IntoExpr = "geometry"
+) -> pl.Expr:
+    """Bounding box of `geometry` as a struct of the `schema.bbox`
+    fields, read from the bbox columns when present in `columns`."""
+    if has_derived(columns, *schema.bbox.names()):
+        return pl.struct(schema.bbox.names())
+
+    return udf.bounds(geometry)
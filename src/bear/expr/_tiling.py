@@ -0,0 +1,201 @@
+import polars as pl
+
+from dataclasses import dataclass
+from math import ceil
+from typing import Callable, Iterator, Sequence
+
+from bear.core.fips import USCounty
+from bear.expr._geometry import centroid_xy
+
+
+@dataclass(slots=True, frozen=True)
+class TileGrid:
+    """Regular grid of square tiles over a bounding box.
+
+    Every geometry has a single home tile, given by its centroid.
+    Geometries outside of the bounding box belong to the nearest edge
+    tile. A tile covers its home geometries, and every geometry whose
+    centroid lies within `halo` of the tile.
+
+    Parameters
+    ----------
+    bounds : tuple[float, float, float, float]
+        Bounding box (xmin, ymin, xmax, ymax) of the grid.
+    size : float
+        Width and height of each tile.
+    halo : float
+        Overlap between neighbouring tiles. This must be at least the
+        largest distance between the centroids of two geometries that
+        may correspond, so that each tile sees every candidate of the
+        geometries it is home to.
+    """
+
+    bounds: tuple[float, float, float, float]
+    size: float
+    halo: float = 0.0
+
+    @classmethod
+    def for_county(
+        cls, county: USCounty, size: float, halo: float = 0.0
+    ) -> "TileGrid":
+        return cls(county.bounds(), size, halo)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        xmin, ymin, xmax, ymax = self.bounds
+        return (
+            max(1, ceil((xmax - xmin) / self.size)),
+            max(1, ceil((ymax - ymin) / self.size)),
+        )
+
+    def __len__(self) -> int:
+        nx, ny = self.shape
+        return nx * ny
+
+    def _column(self, v: pl.Expr, origin: float, n: int) -> pl.Expr:
+        return (
+            ((v - origin) / self.size).floor().clip(0, n - 1).cast(pl.Int64())
+        )
+
+    def tile(self, x: pl.Expr, y: pl.Expr) -> pl.Expr:
+        """Home tile of the points (`x`, `y`)."""
+        xmin, ymin, _, _ = self.bounds
+        nx, ny = self.shape
+        return self._column(y, ymin, ny) * nx + self._column(x, xmin, nx)
+
+    def covers(self, tile: int, x: pl.Expr, y: pl.Expr) -> pl.Expr:
+        """Whether the points (`x`, `y`) lie in `tile` or its halo."""
+        xmin, ymin, _, _ = self.bounds
+        nx, ny = self.shape
+        tx, ty = tile % nx, tile // nx
+        return (
+            (self._column(x - self.halo, xmin, nx) <= tx)
+            & (self._column(x + self.halo, xmin, nx) >= tx)
+            & (self._column(y - self.halo, ymin, ny) <= ty)
+            & (self._column(y + self.halo, ymin, ny) >= ty)
+        )
+
+    def rows(self, xy: pl.DataFrame) -> dict[int, pl.Series]:
+        """Indices of the points in `xy` covered by each tile.
+
+        Each point is assigned to the tiles covering it, as by `covers`,
+        at once, so that rows are partitioned in a single pass rather
+        than filtered per tile. Only row indices are kept, so that the
+        rows of a tile can be gathered when it is evaluated. Tiles
+        covering no points are omitted, and indices are ascending within
+        each tile.
+        """
+        xmin, ymin, _, _ = self.bounds
+        nx, ny = self.shape
+        x, y = pl.col("x"), pl.col("y")
+
+        def span(v: pl.Expr, origin: float, n: int) -> pl.Expr:
+            return pl.int_ranges(
+                self._column(v - self.halo, origin, n),
+                self._column(v + self.halo, origin, n) + 1,
+            )
+
+        covered = (
+            xy.select(tx=span(x, xmin, nx), ty=span(y, ymin, ny))
+            .with_row_index("row")
+            .explode("tx")
+            .explode("ty")
+            .select("row", tile=pl.col("ty") * nx + pl.col("tx"))
+        )
+
+        return {
+            tile: rows.get_column("row")
+            for (tile,), rows in covered.partition_by(
+                "tile", as_dict=True, include_key=False, maintain_order=True
+            ).items()
+        }
+
+
+def _centroids(df: pl.DataFrame, grid: TileGrid) -> pl.DataFrame:
+    # Null geometries have NaN centroids, which are placed in the
+    # first tile since they cannot correspond to anything.
+    xmin, ymin, _, _ = grid.bounds
+    x, y = centroid_xy(df.columns)
+    return df.select(x=x.fill_nan(xmin), y=y.fill_nan(ymin))
+
+
+def tiled(
+    func: Callable[..., pl.LazyFrame],
+    frames: Sequence[pl.DataFrame],
+    grid: TileGrid,
+    *,
+    max_parallel: int = 1,
+) -> pl.DataFrame:
+    """Evaluate a correspondence between `frames` per tile.
+
+    `func` is evaluated on the rows of each of `frames` covered by each
+    tile of `grid`, and must output rows identified by their `provider`
+    and `id`, as found in one of `frames`. Each output row is kept only
+    from the home tile of the input row it is identified by, so that
+    rows seen through the halo of neighbouring tiles are resolved
+    deterministically. Output rows are ordered by tile.
+
+    `frames` are partitioned into tiles once, as row indices, and the
+    rows of each tile are only gathered when its batch of `max_parallel`
+    tiles is evaluated, then released once the batch is collected. Peak
+    memory beyond `frames` thus scales with the number of rows per tile,
+    times `max_parallel`.
+
+    Parameters
+    ----------
+    func : Callable[..., pl.LazyFrame]
+        Correspondence to evaluate, e.g. `spatial_correspondence`. It is
+        called with one lazy frame per data frame of `frames`, in order.
+    frames : Sequence[pl.DataFrame]
+        Inputs of `func`.
+    grid : TileGrid
+        Tiles to evaluate `func` on.
+    max_parallel : int, optional
+        Number of tiles to evaluate concurrently. Defaults to 1.
+
+    Returns
+    -------
+    pl.DataFrame
+        The concatenated output of `func` across all tiles.
+    """
+    centroids = [_centroids(df, grid) for df in frames]
+
+    home = (
+        pl.concat(
+            [
+                df.select("provider", "id").with_columns(
+                    tile=xy.select(
+                        grid.tile(pl.col("x"), pl.col("y"))
+                    ).to_series()
+                )
+                for df, xy in zip(frames, centroids)
+            ],
+            how="vertical",
+        )
+        .unique(["provider", "id"], keep="first", maintain_order=True)
+        .partition_by("tile", as_dict=True, include_key=False)
+    )
+
+    rows = [grid.rows(xy) for xy in centroids]
+    del centroids
+
+    # Rows of tiles owning none of their inputs would be dropped
+    tiles = [tile for tile in sorted(set().union(*rows)) if (tile,) in home]
+
+    def evaluate(tile: int) -> pl.LazyFrame:
+        inputs = [
+            df[part.pop(tile)] if tile in part else df.clear()
+            for df, part in zip(frames, rows)
+        ]
+        return func(*(df.lazy() for df in inputs)).join(
+            home.pop((tile,)).lazy(), on=["provider", "id"], how="semi"
+        )
+
+    results = []
+    for start in range(0, len(tiles), max_parallel):
+        # Rows are gathered per batch, and released once it is collected
+        batch = [evaluate(tile) for tile in tiles[start : start + max_parallel]]
+        results.extend(pl.collect_all(batch))
+        del batch
+
+    return pl.concat(results, how="vertical")
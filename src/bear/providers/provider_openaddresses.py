@@ -7,7 +7,7 @@ from bear import expr
 from bear.core.fips import USCounty
 from bear.typing import ArrowBatchGenerator, Provider
 from bear.providers.registry import register_provider
-from bear._plugins import centroid_x, centroid_y, explode_multipoint
+from bear._plugins import centroid_xy, explode_multipoint
 
 
 @register_provider("openaddresses")
@@ -35,7 +35,10 @@ class OpenAddressesProvider(Provider):
         lf = (
             lf.drop("id", "region")
             .unique()
-            .with_columns(X=centroid_x("geometry"), Y=centroid_y("geometry"))
+            .with_columns(
+                XY=centroid_xy("geometry").struct.rename_fields(["X", "Y"])
+            )
+            .unnest("XY")
             .with_columns(
                 count=pl.col("hash")
                 .over(["X", "Y", "number", "street"])
@@ -0,0 +1,38 @@
+use polars::prelude::*;
+
+use std::collections::HashMap;
+use std::sync::{Arc, LazyLock, RwLock};
+
+use super::geoarray::GeoArray;
+
+/// Indexed right-hand geometries of broadcast joins, keyed by token.
+///
+/// A right-hand Series is registered (and indexed) once, after which
+/// elementwise plugins can stream the left-hand side through it in
+/// independent batches.
+static REGISTRY: LazyLock<RwLock<HashMap<String, Arc<GeoArray>>>> =
+    LazyLock::new(Default::default);
+
+/// Build the spatial index of `array` and register it under `token`,
+/// replacing any array previously registered under it.
+pub fn register(token: String, array: GeoArray) {
+    array.index();
+    REGISTRY.write().unwrap().insert(token, Arc::new(array));
+}
+
+/// The array registered under `token`.
+pub fn get(token: &str) -> PolarsResult<Arc<GeoArray>> {
+    REGISTRY
+        .read()
+        .unwrap()
+        .get(token)
+        .cloned()
+        .ok_or_else(|| polars_err!(ComputeError: "no broadcast geometry registered as '{}'", token))
+}
+
+/// Drop the array registered under `token`, returning whether it existed.
+///
+/// Batches still holding the array keep it alive until they complete.
+pub fn release(token: &str) -> bool {
+    REGISTRY.write().unwrap().remove(token).is_some()
+}
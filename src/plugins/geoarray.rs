@@ -1,25 +1,122 @@
 use polars::prelude::*;
-use polars_arrow::array::Int64Array;
+use polars_arrow::array::{Float64Array, Int64Array};
 use polars_arrow::bitmap::utils::BitmapIter;
 use polars_arrow::{bitmap::Bitmap, buffer::Buffer};
+use polars_core::utils::split_offsets;
+use polars_core::POOL;
+use rayon::prelude::*;
 
-use geo::{Area, BoundingRect, Centroid, Convert, CoordsIter, Intersects, Point};
-use geo_index::rtree::{sort::STRSort, RTree, RTreeBuilder, RTreeIndex};
+use geo::{
+    Area, BoundingRect, Centroid, Convert, CoordsIter, Distance, Euclidean, Intersects, Point,
+};
 use geo_traits::to_geo::ToGeoGeometry;
 use geos::Geom;
 use geozero::{CoordDimensions, ToGeo, ToGeos, ToWkb};
 use wkb::reader::read_wkb;
 
 use std::iter::Zip;
+use std::path::PathBuf;
 use std::slice::Iter;
+use std::sync::OnceLock;
+
+use super::index::SpatialIndex;
 
 pub struct GeoArray {
     pub values: Buffer<geo::Geometry>,
     pub bitmap: Bitmap,
-    index: RTree<f64>,
+    index: OnceLock<SpatialIndex>,
+    index_path: Option<PathBuf>,
+    index_stamp: Option<String>,
+}
+
+/// Flat table of corresponding row pairs and their metric.
+#[derive(Default)]
+pub struct OverlapPairs {
+    pub left: Vec<u32>,
+    pub right: Vec<u32>,
+    pub metric: Vec<f64>,
+}
+
+impl OverlapPairs {
+    /// Group pairs in left row order into per-row lists of right rows
+    /// and metrics, for a left array with validity `bitmap`.
+    pub fn by_left(self, bitmap: &Bitmap) -> (ListChunked, ListChunked) {
+        let mut rows = Vec::with_capacity(bitmap.len());
+        let mut start = 0;
+        for (i, ok) in bitmap.iter().enumerate() {
+            let mut end = start;
+            while end < self.left.len() && self.left[end] as usize == i {
+                end += 1;
+            }
+
+            rows.push(if ok { Some(start..end) } else { None });
+            start = end;
+        }
+
+        let right = rows
+            .iter()
+            .map(|r| {
+                r.clone().map(|r| {
+                    Int64Array::from_vec(self.right[r].iter().map(|&j| j as i64).collect()).boxed()
+                })
+            })
+            .collect_ca_with_dtype(PlSmallStr::default(), DataType::List(DataType::Int64.boxed()));
+
+        let metric = rows
+            .iter()
+            .map(|r| r.clone().map(|r| Float64Array::from_slice(&self.metric[r]).boxed()))
+            .collect_ca_with_dtype(
+                PlSmallStr::default(),
+                DataType::List(DataType::Float64.boxed()),
+            );
+
+        (right, metric)
+    }
 }
 
 impl GeoArray {
+    pub fn new(values: Buffer<geo::Geometry>, bitmap: Bitmap) -> GeoArray {
+        GeoArray {
+            values,
+            bitmap,
+            index: OnceLock::new(),
+            index_path: None,
+            index_stamp: None,
+        }
+    }
+
+    /// Persist the spatial index of this array at `path`.
+    ///
+    /// When the index is first needed, a valid index already stored at
+    /// `path` is memory-mapped instead of being built; otherwise the
+    /// index is built and written to `path` for later calls. The stored
+    /// index is keyed on `stamp`, a content stamp of the data this array
+    /// was read from, or on the bounding boxes of the array without one.
+    pub fn with_index_path(mut self, path: Option<PathBuf>, stamp: Option<String>) -> GeoArray {
+        self.index_path = path;
+        self.index_stamp = stamp;
+        self
+    }
+
+    /// Spatial index over this array, built on first use.
+    ///
+    /// Only operands that are queried against (i.e. the right-hand side
+    /// of the aggregate joins) ever pay for building the tree.
+    pub fn index(&self) -> &SpatialIndex {
+        let stamp = self.index_stamp.as_deref();
+        self.index.get_or_init(|| match &self.index_path {
+            Some(path) => SpatialIndex::load(path, stamp, &self.values, &self.bitmap)
+                .unwrap_or_else(|| {
+                    let index = SpatialIndex::new(&self.values, &self.bitmap);
+                    // The persisted index is only a cache, so a failed
+                    // write just means it is rebuilt next time.
+                    let _ = index.save(path, stamp);
+                    index
+                }),
+            None => SpatialIndex::new(&self.values, &self.bitmap),
+        })
+    }
+
     pub fn iter(&self) -> Zip<Iter<'_, geo::Geometry>, BitmapIter> {
         self.values.iter().zip(self.bitmap.iter())
     }
@@ -81,61 +178,222 @@ impl GeoArray {
         builder.finish()
     }
 
-    pub fn nearest_within_agg(&self, other: &GeoArray) -> ListChunked {
-        self.iter()
-            .map(|(g, ok)| {
-                if ok {
-                    let centroid = g.centroid().unwrap();
-                    let (x, y) = centroid.x_y();
-                    let query = other.index.neighbors(x, y, None, Some(20.0));
-
-                    let matches: Vec<i64> = query
-                        .into_iter()
-                        .map(|i: u32| -> usize { i.try_into().unwrap() })
-                        .filter(|i: &usize| {
-                            g.to_geos()
-                                .unwrap()
-                                .distance(&other.values[*i].to_geos().unwrap())
-                                .unwrap()
-                                < 10.0
+    /// Map each valid geometry to a list of row indices in parallel.
+    ///
+    /// The array is split into one contiguous chunk per thread of the
+    /// Polars thread pool and the per-chunk results are concatenated in
+    /// order, so the output is identical to a serial evaluation.
+    fn par_agg<F>(&self, f: F) -> ListChunked
+    where
+        F: Fn(&geo::Geometry) -> Vec<i64> + Sync,
+    {
+        let offsets = split_offsets(self.values.len(), POOL.current_num_threads());
+
+        let chunks: Vec<ListChunked> = POOL.install(|| {
+            offsets
+                .into_par_iter()
+                .map(|(offset, len)| {
+                    (offset..offset + len)
+                        .map(|i| {
+                            if self.bitmap.get_bit(i) {
+                                Some(Int64Array::from_vec(f(&self.values[i])).boxed())
+                            } else {
+                                None
+                            }
                         })
-                        .map(|i: usize| -> i64 { i.try_into().unwrap() })
-                        .collect();
+                        .collect_ca_with_dtype(
+                            PlSmallStr::default(),
+                            DataType::List(DataType::Int64.boxed()),
+                        )
+                })
+                .collect()
+        });
+
+        let mut chunks = chunks.into_iter();
+        let mut result = chunks.next().unwrap();
+        for chunk in chunks {
+            result.append(&chunk).unwrap();
+        }
 
-                    Some(Int64Array::from_vec(matches).boxed())
-                } else {
-                    None
-                }
-            })
-            .collect_ca_trusted_with_dtype(
-                PlSmallStr::default(),
-                DataType::List(DataType::Int64.boxed()),
-            )
+        result
+    }
+
+    pub fn nearest_within_agg(&self, other: &GeoArray) -> ListChunked {
+        let index = other.index().reader();
+
+        self.par_agg(|g| {
+            let centroid = g.centroid().unwrap();
+            let (x, y) = centroid.x_y();
+
+            index
+                .neighbors(x, y, 20.0)
+                .into_iter()
+                .filter(|i: &usize| Euclidean::distance(g, &other.values[*i]) < 10.0)
+                .map(|i: usize| -> i64 { i.try_into().unwrap() })
+                .collect()
+        })
     }
 
     pub fn intersects_agg(&self, other: &GeoArray) -> ListChunked {
-        self.iter()
-            .map(|(g, ok)| {
-                if ok {
-                    let bbox = g.bounding_rect().unwrap();
-                    let query = other.index.search_rect(&bbox);
+        let index = other.index().reader();
+
+        self.par_agg(|g| {
+            let bbox = g.bounding_rect().unwrap();
+
+            index
+                .search_rect(&bbox)
+                .into_iter()
+                .filter(|i: &usize| g.intersects(&other.values[*i]))
+                .map(|i: usize| -> i64 { i.try_into().unwrap() })
+                .collect()
+        })
+    }
 
-                    let matches: Vec<i64> = query
-                        .into_iter()
-                        .map(|i: u32| -> usize { i.try_into().unwrap() })
-                        .filter(|i: &usize| g.intersects(&other.values[*i]))
-                        .map(|i: usize| -> i64 { i.try_into().unwrap() })
-                        .collect();
+    /// Nearest geometry of `other` to each geometry of this array.
+    ///
+    /// Only geometries strictly within `max_distance` are considered, and
+    /// ties are broken by the lowest row position. Returns the row position
+    /// and distance of the nearest geometry, or nulls if there is none.
+    pub fn nearest_agg(&self, other: &GeoArray, max_distance: f64) -> (UInt32Chunked, Float64Chunked) {
+        let index = other.index().reader();
+        let offsets = split_offsets(self.values.len(), POOL.current_num_threads());
+
+        let chunks: Vec<Vec<Option<(u32, f64)>>> = POOL.install(|| {
+            offsets
+                .into_par_iter()
+                .map(|(offset, len)| {
+                    (offset..offset + len)
+                        .map(|i| {
+                            if !self.bitmap.get_bit(i) {
+                                return None;
+                            }
+
+                            let g = &self.values[i];
+                            let bbox = g.bounding_rect().unwrap();
+                            let search = geo::Rect::new(
+                                (bbox.min().x - max_distance, bbox.min().y - max_distance),
+                                (bbox.max().x + max_distance, bbox.max().y + max_distance),
+                            );
+
+                            let mut best: Option<(usize, f64)> = None;
+                            for j in index.search_rect(&search) {
+                                let d = Euclidean::distance(g, &other.values[j]);
+                                if d >= max_distance {
+                                    continue;
+                                }
+
+                                best = match best {
+                                    Some((k, e)) if e < d || (e == d && k < j) => Some((k, e)),
+                                    _ => Some((j, d)),
+                                };
+                            }
+
+                            best.map(|(j, d)| (j.try_into().unwrap(), d))
+                        })
+                        .collect()
+                })
+                .collect()
+        });
+
+        let (index, distance): (Vec<Option<u32>>, Vec<Option<f64>>) = chunks
+            .into_iter()
+            .flatten()
+            .map(|best| (best.map(|(j, _)| j), best.map(|(_, d)| d)))
+            .unzip();
+
+        (
+            UInt32Chunked::from_iter_options(PlSmallStr::default(), index.into_iter()),
+            Float64Chunked::from_iter_options(PlSmallStr::default(), distance.into_iter()),
+        )
+    }
 
-                    Some(Int64Array::from_vec(matches).boxed())
-                } else {
-                    None
-                }
-            })
-            .collect_ca_trusted_with_dtype(
-                PlSmallStr::default(),
-                DataType::List(DataType::Int64.boxed()),
-            )
+    /// Overlapping pairs between this array and `other`.
+    ///
+    /// Candidates for each valid geometry `a` are taken from the index of
+    /// `other`, and a candidate `b` corresponds to `a` when
+    ///
+    ///     area(a ∩ b) / min(area(a), area(b)) > threshold
+    ///
+    /// Right-hand geometries are converted to GEOS once, when first
+    /// needed, into a table indexed by row that is shared by all chunks,
+    /// so conversions are bounded by the length of `other`.
+    /// Areas are taken from `areas` (left, right) when given and not NaN,
+    /// and computed from the geometries otherwise.
+    /// With `min_right`, candidates of left row `i` below right row
+    /// `min_right[i]` are skipped before any intersection test.
+    /// Returns the (left row, right row, metric) triples in left row order.
+    pub fn overlaps_agg(
+        &self,
+        other: &GeoArray,
+        threshold: f64,
+        areas: Option<(&[f64], &[f64])>,
+        min_right: Option<&[u32]>,
+    ) -> OverlapPairs {
+        let area_of = |g: &geo::Geometry, precomputed: Option<f64>| match precomputed {
+            Some(area) if !area.is_nan() => area,
+            _ => g.unsigned_area(),
+        };
+
+        let index = other.index().reader();
+        let offsets = split_offsets(self.values.len(), POOL.current_num_threads());
+        let converted: Vec<OnceLock<(geos::Geometry, f64)>> =
+            (0..other.values.len()).map(|_| OnceLock::new()).collect();
+
+        let chunks: Vec<OverlapPairs> = POOL.install(|| {
+            offsets
+                .into_par_iter()
+                .map(|(offset, len)| {
+                    let mut pairs = OverlapPairs::default();
+
+                    for i in offset..offset + len {
+                        if !self.bitmap.get_bit(i) {
+                            continue;
+                        }
+
+                        let a = &self.values[i];
+                        let bbox = a.bounding_rect().unwrap();
+                        let mut a_geos: Option<geos::Geometry> = None;
+                        let a_area = area_of(a, areas.map(|(l, _)| l[i]));
+
+                        for j in index.search_rect(&bbox) {
+                            if min_right.is_some_and(|m| j < m[i] as usize) {
+                                continue;
+                            }
+
+                            let b = &other.values[j];
+                            if !a.intersects(b) {
+                                continue;
+                            }
+
+                            let a_geos = a_geos.get_or_insert_with(|| a.to_geos().unwrap());
+                            let (b_geos, b_area) = converted[j].get_or_init(|| {
+                                (b.to_geos().unwrap(), area_of(b, areas.map(|(_, r)| r[j])))
+                            });
+
+                            let area = a_geos.intersection(b_geos).unwrap().area().unwrap();
+                            let metric = area / a_area.min(*b_area);
+
+                            if metric > threshold {
+                                pairs.left.push(i.try_into().unwrap());
+                                pairs.right.push(j.try_into().unwrap());
+                                pairs.metric.push(metric);
+                            }
+                        }
+                    }
+
+                    pairs
+                })
+                .collect()
+        });
+
+        let mut result = OverlapPairs::default();
+        for chunk in chunks {
+            result.left.extend(chunk.left);
+            result.right.extend(chunk.right);
+            result.metric.extend(chunk.metric);
+        }
+
+        result
     }
 
     // pub fn intersects_elementwise(&self, other: &GeoArray) -> BooleanChunked {
@@ -170,32 +428,11 @@ impl GeoArray {
         self.iter()
             .zip(other.iter())
             .map(|ab| match ab {
-                ((a, true), (b, true)) => Some(
-                    a.to_geos()
-                        .unwrap()
-                        .distance(&b.to_geos().unwrap())
-                        .unwrap(),
-                ),
+                ((a, true), (b, true)) => Some(Euclidean::distance(a, b)),
                 _ => None,
             })
             .collect_ca_trusted(PlSmallStr::default())
     }
-
-    pub fn area(&self) -> Float64Chunked {
-        self.iter()
-            .map(|(g, ok)| if ok { Some(g.unsigned_area()) } else { None })
-            .collect_ca_trusted(PlSmallStr::default())
-    }
-
-    pub fn centroid(mut self) -> GeoArray {
-        self.values = self
-            .values
-            .iter()
-            .map(|g| g.centroid().unwrap().to_geometry())
-            .collect();
-
-        self
-    }
 }
 
 impl From<Vec<Option<geo::Geometry>>> for GeoArray {
@@ -215,29 +452,14 @@ impl From<Vec<Option<geo::Geometry>>> for GeoArray {
             b.push(false);
         };
 
-        let mut ngeoms: u32 = 0;
         for maybe_geom in value.into_iter() {
             match maybe_geom {
-                Some(geom) => {
-                    add_geom(geom, &mut values, &mut bitmap);
-                    ngeoms += 1;
-                }
+                Some(geom) => add_geom(geom, &mut values, &mut bitmap),
                 None => add_null(&mut values, &mut bitmap),
             }
         }
 
-        let mut tree = RTreeBuilder::<f64>::new(ngeoms);
-        for (g, ok) in values.iter().zip(bitmap.iter()) {
-            if *ok {
-                tree.add_rect(&g.bounding_rect().unwrap());
-            }
-        }
-
-        GeoArray {
-            values: values.into(),
-            bitmap: bitmap.into(),
-            index: tree.finish::<STRSort>(),
-        }
+        GeoArray::new(values.into(), bitmap.into())
     }
 }
 
@@ -258,15 +480,11 @@ impl From<&BinaryChunked> for GeoArray {
             b.push(false);
         };
 
-        let mut ngeoms: u32 = 0;
         for maybe_wkb in value.into_iter() {
             match maybe_wkb {
                 Some(wkb) => match read_wkb(wkb) {
                     Ok(maybe_geom) => match maybe_geom.try_to_geometry() {
-                        Some(geom) => {
-                            add_geom(geom, &mut values, &mut bitmap);
-                            ngeoms += 1;
-                        }
+                        Some(geom) => add_geom(geom, &mut values, &mut bitmap),
                         None => add_null(&mut values, &mut bitmap),
                     },
                     Err(_) => add_null(&mut values, &mut bitmap),
@@ -275,18 +493,7 @@ impl From<&BinaryChunked> for GeoArray {
             }
         }
 
-        let mut tree = RTreeBuilder::<f64>::new(ngeoms);
-        for (g, ok) in values.iter().zip(bitmap.iter()) {
-            if *ok {
-                tree.add_rect(&g.bounding_rect().unwrap());
-            }
-        }
-
-        GeoArray {
-            values: values.into(),
-            bitmap: bitmap.into(),
-            index: tree.finish::<STRSort>(),
-        }
+        GeoArray::new(values.into(), bitmap.into())
     }
 }
 
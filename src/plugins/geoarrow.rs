@@ -0,0 +1,117 @@
+use polars::prelude::*;
+use polars_arrow::array::{Array, LargeListArray, PrimitiveArray, StructArray};
+
+use super::geoarray::GeoArray;
+
+/// Decode a geometry Series into a GeoArray.
+///
+/// Geometries are either WKB (`Binary`) or one of the native GeoArrow
+/// encodings written by `bear.core.geoarrow`:
+///
+/// - points as a separated `struct<x: f64, y: f64>`, and
+/// - multipolygons as `list<list<list<struct<x: f64, y: f64>>>>`.
+///
+/// Native encodings are read straight from their coordinate and offset
+/// buffers, without any WKB parsing. This is a copying decoder: like
+/// WKB, every geometry is materialized as an owned `geo::Geometry`,
+/// since that is what GeoArray and its indices operate on. The saving
+/// over WKB is the parsing, not the allocation of the coordinates.
+pub fn geoarray(s: &Series) -> PolarsResult<GeoArray> {
+    match s.dtype() {
+        DataType::Binary => Ok(s.binary()?.into()),
+        DataType::Struct(_) => points(s.struct_()?),
+        DataType::List(_) => multipolygons(s.list()?),
+        dtype => polars_bail!(ComputeError: "unsupported geometry encoding: {}", dtype),
+    }
+}
+
+/// The `x` and `y` coordinate columns of a GeoArrow point Series.
+pub fn point_fields(ca: &StructChunked) -> PolarsResult<(Series, Series)> {
+    Ok((ca.field_by_name("x")?, ca.field_by_name("y")?))
+}
+
+/// Copy each point of a GeoArrow point Series into a `geo::Point`.
+fn points(ca: &StructChunked) -> PolarsResult<GeoArray> {
+    let (x, y) = point_fields(ca)?;
+    let valid = ca.is_not_null();
+
+    Ok(x.f64()?
+        .iter()
+        .zip(y.f64()?.iter())
+        .zip(valid.iter())
+        .map(|xy| match xy {
+            ((Some(x), Some(y)), Some(true)) => Some(geo::Point::new(x, y).into()),
+            _ => None,
+        })
+        .collect::<Vec<Option<geo::Geometry>>>()
+        .into())
+}
+
+fn list_values(arr: &dyn Array) -> PolarsResult<&LargeListArray> {
+    arr.as_any()
+        .downcast_ref::<LargeListArray>()
+        .ok_or_else(|| polars_err!(ComputeError: "expected a GeoArrow multipolygon"))
+}
+
+fn f64_values(arr: &dyn Array) -> PolarsResult<&[f64]> {
+    arr.as_any()
+        .downcast_ref::<PrimitiveArray<f64>>()
+        .map(|a| a.values().as_slice())
+        .ok_or_else(|| polars_err!(ComputeError: "expected f64 GeoArrow coordinates"))
+}
+
+fn coord_values(arr: &dyn Array) -> PolarsResult<(&[f64], &[f64])> {
+    let coords = arr
+        .as_any()
+        .downcast_ref::<StructArray>()
+        .ok_or_else(|| polars_err!(ComputeError: "expected GeoArrow coordinates"))?;
+
+    Ok((
+        f64_values(coords.values()[0].as_ref())?,
+        f64_values(coords.values()[1].as_ref())?,
+    ))
+}
+
+/// Copy the rings of a GeoArrow multipolygon Series into owned
+/// `geo::MultiPolygon`s, walking its offset buffers.
+fn multipolygons(ca: &ListChunked) -> PolarsResult<GeoArray> {
+    let mut values: Vec<Option<geo::Geometry>> = Vec::with_capacity(ca.len());
+
+    for geometries in ca.downcast_iter() {
+        let polygons = list_values(geometries.values().as_ref())?;
+        let rings = list_values(polygons.values().as_ref())?;
+        let (xs, ys) = coord_values(rings.values().as_ref())?;
+
+        let geometry_offsets = geometries.offsets().as_slice();
+        let polygon_offsets = polygons.offsets().as_slice();
+        let ring_offsets = rings.offsets().as_slice();
+
+        let ring = |r: usize| -> geo::LineString {
+            (ring_offsets[r] as usize..ring_offsets[r + 1] as usize)
+                .map(|c| geo::Coord { x: xs[c], y: ys[c] })
+                .collect()
+        };
+
+        let polygon = |p: usize| -> geo::Polygon {
+            let mut rings = (polygon_offsets[p] as usize..polygon_offsets[p + 1] as usize).map(&ring);
+            let exterior = rings.next().unwrap_or_else(|| geo::LineString::new(vec![]));
+            geo::Polygon::new(exterior, rings.collect())
+        };
+
+        for i in 0..geometries.len() {
+            if !geometries.is_valid(i) {
+                values.push(None);
+                continue;
+            }
+
+            let mp: geo::MultiPolygon = (geometry_offsets[i] as usize
+                ..geometry_offsets[i + 1] as usize)
+                .map(&polygon)
+                .collect();
+
+            values.push(Some(mp.into()));
+        }
+    }
+
+    Ok(values.into())
+}
@@ -0,0 +1,262 @@
+use polars_arrow::bitmap::Bitmap;
+
+use geo::BoundingRect;
+use geo_index::rtree::{sort::STRSort, RTreeBuilder, RTreeIndex, RTreeRef};
+use memmap2::Mmap;
+
+use std::fs::File;
+use std::io::Write;
+use std::path::{Path, PathBuf};
+
+/// Backing storage of a packed R-tree.
+enum TreeBuffer {
+    Owned(Vec<u8>),
+    Mapped(Mmap),
+}
+
+impl AsRef<[u8]> for TreeBuffer {
+    fn as_ref(&self) -> &[u8] {
+        match self {
+            TreeBuffer::Owned(buffer) => buffer,
+            TreeBuffer::Mapped(mmap) => mmap,
+        }
+    }
+}
+
+/// Packed R-tree over the valid geometries of a GeoArray.
+///
+/// The tree uses the flat buffer layout of `geo-index`, so it can either
+/// be built in memory or memory-mapped from a file written by `save`.
+///
+/// Null geometries are not inserted into the tree, so tree item ids
+/// are mapped back to row positions when the array contains nulls.
+/// Arrays without any valid geometry have no tree at all.
+pub struct SpatialIndex {
+    buffer: Option<TreeBuffer>,
+    rows: Option<Vec<u32>>,
+    digest: Option<u64>,
+}
+
+/// 64-bit FNV-1a hash, which unlike `DefaultHasher` is stable across
+/// builds, so that digests can be persisted.
+struct Digest(u64);
+
+impl Digest {
+    fn new() -> Digest {
+        Digest(0xcbf29ce484222325)
+    }
+
+    fn write(&mut self, bytes: &[u8]) {
+        for &b in bytes {
+            self.0 ^= b as u64;
+            self.0 = self.0.wrapping_mul(0x100000001b3);
+        }
+    }
+
+    /// Add the bounding box of a row to the digest, or None for nulls.
+    fn row(&mut self, rect: Option<&geo::Rect>) {
+        match rect {
+            Some(r) => {
+                self.write(&[1]);
+                for v in [r.min().x, r.min().y, r.max().x, r.max().y] {
+                    self.write(&v.to_le_bytes());
+                }
+            }
+            None => self.write(&[0]),
+        }
+    }
+}
+
+/// Digest of the bounding boxes and validity of an array, which
+/// identifies the tree built from it.
+fn digest(values: &[geo::Geometry], bitmap: &Bitmap) -> u64 {
+    let mut digest = Digest::new();
+    for (g, ok) in values.iter().zip(bitmap.iter()) {
+        digest.row(if ok { g.bounding_rect() } else { None }.as_ref());
+    }
+
+    digest.0
+}
+
+/// Path of the digest stored next to a persisted index at `path`.
+fn digest_path(path: &Path) -> PathBuf {
+    path.with_extension("rtree.digest")
+}
+
+/// Query handle over a SpatialIndex, returning row positions.
+pub struct IndexReader<'a> {
+    tree: Option<RTreeRef<'a, f64>>,
+    rows: Option<&'a [u32]>,
+}
+
+fn valid_rows(bitmap: &Bitmap) -> Option<Vec<u32>> {
+    if bitmap.unset_bits() == 0 {
+        return None;
+    }
+
+    Some(
+        bitmap
+            .iter()
+            .enumerate()
+            .filter(|(_, ok)| *ok)
+            .map(|(i, _)| -> u32 { i.try_into().unwrap() })
+            .collect(),
+    )
+}
+
+impl SpatialIndex {
+    pub fn new(values: &[geo::Geometry], bitmap: &Bitmap) -> SpatialIndex {
+        let nvalid = values.len() - bitmap.unset_bits();
+        if nvalid == 0 {
+            return SpatialIndex {
+                buffer: None,
+                rows: None,
+                digest: Some(digest(values, bitmap)),
+            };
+        }
+
+        let mut tree = RTreeBuilder::<f64>::new(nvalid.try_into().unwrap());
+        let mut digest = Digest::new();
+        for (g, ok) in values.iter().zip(bitmap.iter()) {
+            if ok {
+                let rect = g.bounding_rect().unwrap();
+                tree.add_rect(&rect);
+                digest.row(Some(&rect));
+            } else {
+                digest.row(None);
+            }
+        }
+
+        SpatialIndex {
+            buffer: Some(TreeBuffer::Owned(tree.finish::<STRSort>().into_inner())),
+            rows: valid_rows(bitmap),
+            digest: Some(digest.0),
+        }
+    }
+
+    /// Memory-map a persisted index for the array `values`.
+    ///
+    /// The index is keyed on `stamp`, a content stamp of the data
+    /// `values` were read from (e.g. the digest of a conform output),
+    /// which is compared to the stamp stored next to the index without
+    /// looking at `values` at all. Without a stamp, the index is keyed
+    /// on the digest of the bounding boxes of `values` instead, which
+    /// costs a pass over every geometry.
+    ///
+    /// Returns None if the file does not exist, is not a valid R-tree, or
+    /// its stored key differs (e.g. the index of another county, or of
+    /// earlier data with as many rows).
+    pub fn load(
+        path: &Path,
+        stamp: Option<&str>,
+        values: &[geo::Geometry],
+        bitmap: &Bitmap,
+    ) -> Option<SpatialIndex> {
+        let stored = std::fs::read_to_string(digest_path(path)).ok()?;
+        let (digest, key) = match stamp {
+            Some(stamp) => (None, stamp.to_string()),
+            None => {
+                let digest = digest(values, bitmap);
+                (Some(digest), format!("{:016x}", digest))
+            }
+        };
+        if stored.trim() != key {
+            return None;
+        }
+
+        let file = File::open(path).ok()?;
+
+        // SAFETY: index files are written once to a temporary path and
+        // renamed into place, so a mapped file is never modified.
+        let mmap = unsafe { Mmap::map(&file) }.ok()?;
+
+        let nvalid = bitmap.len() - bitmap.unset_bits();
+        let num_items = RTreeRef::<f64>::try_new(&mmap).ok()?.num_items() as usize;
+        if num_items != nvalid {
+            return None;
+        }
+
+        Some(SpatialIndex {
+            buffer: Some(TreeBuffer::Mapped(mmap)),
+            rows: valid_rows(bitmap),
+            digest,
+        })
+    }
+
+    /// Write the flat buffer of this index to `path`, and the key it is
+    /// loaded by next to it: `stamp` if given, as in `load`, or else the
+    /// digest of the bounding boxes.
+    pub fn save(&self, path: &Path, stamp: Option<&str>) -> std::io::Result<()> {
+        let Some(buffer) = &self.buffer else {
+            return Ok(());
+        };
+        let key = match (stamp, self.digest) {
+            (Some(stamp), _) => stamp.to_string(),
+            (None, Some(digest)) => format!("{:016x}", digest),
+            (None, None) => return Ok(()),
+        };
+
+        // The previous digest is removed first, so that a digest on disk
+        // always describes the index written before it.
+        let digest = digest_path(path);
+        match std::fs::remove_file(&digest) {
+            Err(e) if e.kind() != std::io::ErrorKind::NotFound => return Err(e),
+            _ => {}
+        }
+
+        let tmp = path.with_extension("rtree.tmp");
+
+        let mut file = File::create(&tmp)?;
+        file.write_all(buffer.as_ref())?;
+        file.sync_all()?;
+        std::fs::rename(tmp, path)?;
+
+        let tmp = path.with_extension("rtree.digest.tmp");
+        std::fs::write(&tmp, format!("{}\n", key))?;
+        std::fs::rename(tmp, digest)
+    }
+
+    pub fn reader(&self) -> IndexReader<'_> {
+        IndexReader {
+            tree: self
+                .buffer
+                .as_ref()
+                .map(|buffer| RTreeRef::try_new(buffer).unwrap()),
+            rows: self.rows.as_deref(),
+        }
+    }
+}
+
+impl IndexReader<'_> {
+    fn row(&self, id: u32) -> usize {
+        match self.rows {
+            Some(rows) => rows[id as usize] as usize,
+            None => id as usize,
+        }
+    }
+
+    /// Row positions of geometries whose bounding box intersects `rect`.
+    pub fn search_rect(&self, rect: &geo::Rect) -> Vec<usize> {
+        let Some(tree) = &self.tree else {
+            return vec![];
+        };
+
+        tree.search_rect(rect)
+            .into_iter()
+            .map(|id| self.row(id))
+            .collect()
+    }
+
+    /// Row positions of geometries whose bounding box is within
+    /// `max_distance` of (`x`, `y`), ordered by increasing distance.
+    pub fn neighbors(&self, x: f64, y: f64, max_distance: f64) -> Vec<usize> {
+        let Some(tree) = &self.tree else {
+            return vec![];
+        };
+
+        tree.neighbors(x, y, None, Some(max_distance))
+            .into_iter()
+            .map(|id| self.row(id))
+            .collect()
+    }
+}
@@ -1,21 +1,85 @@
+mod broadcast;
 mod geoarray;
+mod geoarrow;
+mod index;
+mod wkbview;
 
-use geo::{proj::Proj, Centroid, Convert, Point, Transform};
+use geo::{proj::Proj, Area, BoundingRect, Centroid, Coord};
 use geoarray::GeoArray;
 
 use polars::prelude::*;
+use polars_core::utils::split_offsets;
+use polars_core::POOL;
+use rayon::prelude::*;
 use pyo3_polars::derive::polars_expr;
+use serde::Deserialize;
+
+use std::path::PathBuf;
 
 fn unary_input(inputs: &[Series]) -> PolarsResult<GeoArray> {
-    let a: &BinaryChunked = inputs[0].binary()?;
-    Ok(a.into())
+    geoarrow::geoarray(&inputs[0])
+}
+
+fn unary_wkb_input(inputs: &[Series]) -> PolarsResult<&BinaryChunked> {
+    inputs[0].binary()
+}
+
+/// Evaluate `f` on borrowed WKB views of each geometry, without decoding
+/// into owned geometries. Null and invalid WKB map to None.
+fn unary_wkb_map<T, F>(inputs: &[Series], f: F) -> PolarsResult<impl Iterator<Item = Option<T>> + '_>
+where
+    F: Fn(&wkb::reader::Wkb<'_>) -> Option<T> + 'static,
+{
+    Ok(unary_wkb_input(inputs)?
+        .into_iter()
+        .map(move |maybe_wkb| maybe_wkb.and_then(wkbview::view).and_then(|g| f(&g))))
 }
 
 fn binary_inputs(inputs: &[Series]) -> PolarsResult<(GeoArray, GeoArray)> {
-    let a: &BinaryChunked = inputs[0].binary()?;
-    let b: &BinaryChunked = inputs[1].binary()?;
+    Ok((geoarrow::geoarray(&inputs[0])?, geoarrow::geoarray(&inputs[1])?))
+}
+
+/// Centroid of each geometry. WKB is evaluated on borrowed views, while
+/// native GeoArrow encodings are decoded straight from their buffers.
+fn unary_centroids(inputs: &[Series]) -> PolarsResult<Vec<Option<(f64, f64)>>> {
+    if let DataType::Binary = inputs[0].dtype() {
+        return Ok(unary_wkb_map(inputs, wkbview::centroid)?.collect());
+    }
+
+    Ok(unary_input(inputs)?
+        .iter()
+        .map(|(g, ok)| if ok { g.centroid().map(|c| c.x_y()) } else { None })
+        .collect())
+}
 
-    Ok((a.into(), b.into()))
+/// The coordinate columns of a GeoArrow point Series without nulls, which
+/// are their own centroids.
+fn unary_point_fields(inputs: &[Series]) -> PolarsResult<Option<(Series, Series)>> {
+    match inputs[0].dtype() {
+        DataType::Struct(_) if inputs[0].null_count() == 0 => {
+            Ok(Some(geoarrow::point_fields(inputs[0].struct_()?)?))
+        }
+        _ => Ok(None),
+    }
+}
+
+#[derive(Deserialize)]
+struct IndexKwargs {
+    index: Option<String>,
+    #[serde(default)]
+    stamp: Option<String>,
+}
+
+/// Binary inputs where the spatial index of the right operand may be
+/// persisted at, or memory-mapped from, the path `index`, keyed on the
+/// content `stamp` of the right operand if given.
+fn binary_indexed_inputs(
+    inputs: &[Series],
+    index: Option<String>,
+    stamp: Option<String>,
+) -> PolarsResult<(GeoArray, GeoArray)> {
+    let (a, b) = binary_inputs(inputs)?;
+    Ok((a, b.with_index_path(index.map(PathBuf::from), stamp)))
 }
 
 fn intersects_output_type(fields: &[Field]) -> PolarsResult<Field> {
@@ -32,8 +96,8 @@ fn intersects_output_type(fields: &[Field]) -> PolarsResult<Field> {
 /// the left input, and a spatial index of the right Series is used
 /// to determine intersecting geometries.
 #[polars_expr(output_type_func=intersects_output_type)]
-fn binary_intersects_aggregate(inputs: &[Series]) -> PolarsResult<Series> {
-    let (a, b) = binary_inputs(inputs)?;
+fn binary_intersects_aggregate(inputs: &[Series], kwargs: IndexKwargs) -> PolarsResult<Series> {
+    let (a, b) = binary_indexed_inputs(inputs, kwargs.index, kwargs.stamp)?;
     let series = a.intersects_agg(&b).into_series();
 
     let a_len = a.values.len();
@@ -49,8 +113,8 @@ fn binary_intersects_aggregate(inputs: &[Series]) -> PolarsResult<Series> {
 /// the left input, and a spatial index of the right Series is used
 /// to determine neighboring geometries.
 #[polars_expr(output_type_func=intersects_output_type)]
-fn binary_nearest_aggregate(inputs: &[Series]) -> PolarsResult<Series> {
-    let (a, b) = binary_inputs(inputs)?;
+fn binary_nearest_aggregate(inputs: &[Series], kwargs: IndexKwargs) -> PolarsResult<Series> {
+    let (a, b) = binary_indexed_inputs(inputs, kwargs.index, kwargs.stamp)?;
     let series = a.nearest_within_agg(&b).into_series();
 
     let a_len = a.values.len();
@@ -61,6 +125,232 @@ fn binary_nearest_aggregate(inputs: &[Series]) -> PolarsResult<Series> {
     series.extend_constant(AnyValue::Null, remaining)
 }
 
+#[derive(Deserialize)]
+struct OverlapsKwargs {
+    threshold: f64,
+    index: Option<String>,
+    #[serde(default)]
+    stamp: Option<String>,
+    #[serde(default)]
+    min_right: bool,
+}
+
+/// Values of a Float64 Series, with nulls as NaN.
+fn nan_filled(s: &Series) -> PolarsResult<Vec<f64>> {
+    Ok(s.f64()?.iter().map(|v| v.unwrap_or(f64::NAN)).collect())
+}
+
+/// Values of an integer Series as row indices, with nulls as 0.
+fn row_indices(s: &Series) -> PolarsResult<Vec<u32>> {
+    Ok(s.cast(&DataType::UInt32)?.u32()?.iter().map(|v| v.unwrap_or(0)).collect())
+}
+
+fn overlaps_output_type(fields: &[Field]) -> PolarsResult<Field> {
+    let field = Field::new(
+        fields[0].name.clone(),
+        DataType::Struct(vec![
+            Field::new("index_left".into(), DataType::UInt32),
+            Field::new("index_right".into(), DataType::UInt32),
+            Field::new("metric".into(), DataType::Float64),
+        ]),
+    );
+
+    Ok(field.clone())
+}
+
+/// Perform a fused overlap correspondence between two Polars Series.
+/// A spatial index of the right Series is queried for each left geometry,
+/// and candidate pairs are kept when the ratio of their intersection area
+/// to the smaller of their areas exceeds `threshold`. The resulting Series
+/// is a flat struct of `(index_left, index_right, metric)` rows.
+///
+/// Precomputed areas of the left and right geometries may be given as a
+/// third and fourth Series, in which case null areas are computed. With
+/// `min_right`, a last Series gives the smallest right row index that
+/// each left row may pair with, and other candidates are skipped before
+/// any intersection is computed.
+#[polars_expr(output_type_func=overlaps_output_type)]
+fn binary_overlaps_aggregate(inputs: &[Series], kwargs: OverlapsKwargs) -> PolarsResult<Series> {
+    let (a, b) = binary_indexed_inputs(inputs, kwargs.index, kwargs.stamp)?;
+    let (extra, min_right) = match (kwargs.min_right, &inputs[2..]) {
+        (true, [extra @ .., min_right]) => (extra, Some(row_indices(min_right)?)),
+        (_, extra) => (extra, None),
+    };
+    let areas = match extra {
+        [left, right] => Some((nan_filled(left)?, nan_filled(right)?)),
+        _ => None,
+    };
+
+    let pairs = a.overlaps_agg(
+        &b,
+        kwargs.threshold,
+        areas.as_ref().map(|(l, r)| (l.as_slice(), r.as_slice())),
+        min_right.as_deref(),
+    );
+
+    let fields = [
+        UInt32Chunked::from_vec("index_left".into(), pairs.left).into_series(),
+        UInt32Chunked::from_vec("index_right".into(), pairs.right).into_series(),
+        Float64Chunked::from_vec("metric".into(), pairs.metric).into_series(),
+    ];
+
+    Ok(
+        StructChunked::from_series(inputs[0].name().clone(), fields[0].len(), fields.iter())?
+            .into_series(),
+    )
+}
+
+#[derive(Deserialize)]
+struct NearestKwargs {
+    max_distance: f64,
+    index: Option<String>,
+    #[serde(default)]
+    stamp: Option<String>,
+}
+
+fn nearest_top1_output_type(fields: &[Field]) -> PolarsResult<Field> {
+    let field = Field::new(
+        fields[0].name.clone(),
+        DataType::Struct(vec![
+            Field::new("index".into(), DataType::UInt32),
+            Field::new("distance".into(), DataType::Float64),
+        ]),
+    );
+
+    Ok(field.clone())
+}
+
+/// Find the single nearest right geometry for each left geometry.
+/// The resulting Series has equal length to the left input and holds
+/// the `(index, distance)` of the nearest right geometry strictly within
+/// `max_distance`, or nulls when there is none.
+#[polars_expr(output_type_func=nearest_top1_output_type)]
+fn binary_nearest_top1(inputs: &[Series], kwargs: NearestKwargs) -> PolarsResult<Series> {
+    let (a, b) = binary_indexed_inputs(inputs, kwargs.index, kwargs.stamp)?;
+    let (index, distance) = a.nearest_agg(&b, kwargs.max_distance);
+    nearest_top1_struct(inputs[0].name().clone(), index, distance)
+}
+
+fn nearest_top1_struct(
+    name: PlSmallStr,
+    index: UInt32Chunked,
+    distance: Float64Chunked,
+) -> PolarsResult<Series> {
+    let fields = [
+        index.with_name("index".into()).into_series(),
+        distance.with_name("distance".into()).into_series(),
+    ];
+
+    Ok(StructChunked::from_series(name, fields[0].len(), fields.iter())?.into_series())
+}
+
+#[derive(Deserialize)]
+struct BroadcastKwargs {
+    token: String,
+    index: Option<String>,
+    #[serde(default)]
+    stamp: Option<String>,
+}
+
+/// Index a right-hand geometry Series once and register it under
+/// `token`, for the `*_broadcast` plugins to stream left-hand batches
+/// through. Returns the number of registered geometries.
+#[polars_expr(output_type=UInt64)]
+fn unary_broadcast_register(inputs: &[Series], kwargs: BroadcastKwargs) -> PolarsResult<Series> {
+    let array = unary_input(inputs)?.with_index_path(kwargs.index.map(PathBuf::from), kwargs.stamp);
+    let len = array.values.len() as u64;
+    broadcast::register(kwargs.token, array);
+
+    Ok(Series::new(inputs[0].name().clone(), [len]))
+}
+
+/// Release the right-hand geometries registered under each token of
+/// a String Series, returning whether each was registered.
+#[polars_expr(output_type=Boolean)]
+fn unary_broadcast_release(inputs: &[Series]) -> PolarsResult<Series> {
+    let released: BooleanChunked = inputs[0]
+        .str()?
+        .iter()
+        .map(|token| token.map(broadcast::release))
+        .collect();
+
+    Ok(released.with_name(inputs[0].name().clone()).into_series())
+}
+
+/// Streaming counterpart of `binary_nearest_aggregate`, against the
+/// right-hand geometries registered under `token`.
+#[polars_expr(output_type_func=intersects_output_type)]
+fn binary_nearest_broadcast(inputs: &[Series], kwargs: BroadcastKwargs) -> PolarsResult<Series> {
+    let a = unary_input(inputs)?;
+    let b = broadcast::get(&kwargs.token)?;
+    Ok(a.nearest_within_agg(&b).with_name(inputs[0].name().clone()).into_series())
+}
+
+#[derive(Deserialize)]
+struct BroadcastNearestKwargs {
+    token: String,
+    max_distance: f64,
+}
+
+/// Streaming counterpart of `binary_nearest_top1`, against the
+/// right-hand geometries registered under `token`.
+#[polars_expr(output_type_func=nearest_top1_output_type)]
+fn binary_nearest_top1_broadcast(
+    inputs: &[Series],
+    kwargs: BroadcastNearestKwargs,
+) -> PolarsResult<Series> {
+    let a = unary_input(inputs)?;
+    let b = broadcast::get(&kwargs.token)?;
+    let (index, distance) = a.nearest_agg(&b, kwargs.max_distance);
+    nearest_top1_struct(inputs[0].name().clone(), index, distance)
+}
+
+#[derive(Deserialize)]
+struct BroadcastOverlapsKwargs {
+    token: String,
+    threshold: f64,
+}
+
+fn overlaps_broadcast_output_type(fields: &[Field]) -> PolarsResult<Field> {
+    let field = Field::new(
+        fields[0].name.clone(),
+        DataType::Struct(vec![
+            Field::new("index_right".into(), DataType::List(DataType::Int64.boxed())),
+            Field::new("metric".into(), DataType::List(DataType::Float64.boxed())),
+        ]),
+    );
+
+    Ok(field.clone())
+}
+
+/// Streaming counterpart of `binary_overlaps_aggregate`, against the
+/// right-hand geometries registered under `token`. For each left
+/// geometry, returns the list of overlapping right rows and the list
+/// of their metrics. A second Series may give the smallest right row
+/// index that each left row may pair with.
+#[polars_expr(output_type_func=overlaps_broadcast_output_type)]
+fn binary_overlaps_broadcast(
+    inputs: &[Series],
+    kwargs: BroadcastOverlapsKwargs,
+) -> PolarsResult<Series> {
+    let a = unary_input(inputs)?;
+    let b = broadcast::get(&kwargs.token)?;
+    let min_right = inputs.get(1).map(row_indices).transpose()?;
+    let (index, metric) = a
+        .overlaps_agg(&b, kwargs.threshold, None, min_right.as_deref())
+        .by_left(&a.bitmap);
+
+    let fields = [
+        index.with_name("index_right".into()).into_series(),
+        metric.with_name("metric".into()).into_series(),
+    ];
+
+    Ok(
+        StructChunked::from_series(inputs[0].name().clone(), fields[0].len(), fields.iter())?
+            .into_series(),
+    )
+}
+
 /// Perfom an elementwise intersection between equal length WKB Series.
 #[polars_expr(output_type=Binary)]
 fn binary_intersection_elementwise(inputs: &[Series]) -> PolarsResult<Series> {
@@ -68,10 +358,18 @@ fn binary_intersection_elementwise(inputs: &[Series]) -> PolarsResult<Series> {
     Ok(a.intersection_elementwise(&b).into())
 }
 
-/// Compute the area of each geometry in a WKB Series.
+/// Compute the area of each geometry in a Series.
 #[polars_expr(output_type=Float64)]
 fn unary_area_elementwise(inputs: &[Series]) -> PolarsResult<Series> {
-    Ok(unary_input(inputs)?.area().into_series())
+    let result: Float64Chunked = match inputs[0].dtype() {
+        DataType::Binary => unary_wkb_map(inputs, wkbview::area)?.collect(),
+        _ => unary_input(inputs)?
+            .iter()
+            .map(|(g, ok)| if ok { Some(g.unsigned_area()) } else { None })
+            .collect(),
+    };
+
+    Ok(result.into_series())
 }
 
 /// Compute the (elementwise) distance between geometries.
@@ -83,35 +381,126 @@ fn binary_distance_elementwise(inputs: &[Series]) -> PolarsResult<Series> {
 
 #[polars_expr(output_type=Float64)]
 fn unary_x(inputs: &[Series]) -> PolarsResult<Series> {
-    unary_input(inputs)?
-        .iter()
-        .map(|(g, ok)| {
-            if ok {
-                Ok(g.centroid().unwrap().x())
-            } else {
-                Ok(f64::NAN)
-            }
-        })
-        .collect()
+    if let Some((x, _)) = unary_point_fields(inputs)? {
+        return Ok(x.with_name(inputs[0].name().clone()));
+    }
+
+    let result: Float64Chunked = unary_centroids(inputs)?
+        .into_iter()
+        .map(|c| Some(c.map_or(f64::NAN, |(x, _)| x)))
+        .collect();
+
+    Ok(result.with_name(inputs[0].name().clone()).into_series())
 }
 
 #[polars_expr(output_type=Float64)]
 fn unary_y(inputs: &[Series]) -> PolarsResult<Series> {
-    unary_input(inputs)?
-        .iter()
-        .map(|(g, ok)| {
-            if ok {
-                Ok(g.centroid().unwrap().y())
-            } else {
-                Ok(f64::NAN)
-            }
-        })
-        .collect()
+    if let Some((_, y)) = unary_point_fields(inputs)? {
+        return Ok(y.with_name(inputs[0].name().clone()));
+    }
+
+    let result: Float64Chunked = unary_centroids(inputs)?
+        .into_iter()
+        .map(|c| Some(c.map_or(f64::NAN, |(_, y)| y)))
+        .collect();
+
+    Ok(result.with_name(inputs[0].name().clone()).into_series())
+}
+
+fn centroid_xy_output_type(fields: &[Field]) -> PolarsResult<Field> {
+    let field = Field::new(
+        fields[0].name.clone(),
+        DataType::Struct(vec![
+            Field::new("x".into(), DataType::Float64),
+            Field::new("y".into(), DataType::Float64),
+        ]),
+    );
+
+    Ok(field.clone())
+}
+
+/// Compute the centroid coordinates of each geometry in a Series
+/// in a single pass, returning a struct of `x` and `y`.
+#[polars_expr(output_type_func=centroid_xy_output_type)]
+fn unary_centroid_xy(inputs: &[Series]) -> PolarsResult<Series> {
+    let fields = match unary_point_fields(inputs)? {
+        Some((x, y)) => [x, y],
+        None => {
+            let (x, y): (Vec<f64>, Vec<f64>) = unary_centroids(inputs)?
+                .into_iter()
+                .map(|c| c.unwrap_or((f64::NAN, f64::NAN)))
+                .unzip();
+
+            [
+                Float64Chunked::from_vec("x".into(), x).into_series(),
+                Float64Chunked::from_vec("y".into(), y).into_series(),
+            ]
+        }
+    };
+
+    Ok(
+        StructChunked::from_series(inputs[0].name().clone(), fields[0].len(), fields.iter())?
+            .into_series(),
+    )
+}
+
+fn bounds_output_type(fields: &[Field]) -> PolarsResult<Field> {
+    let field = Field::new(
+        fields[0].name.clone(),
+        DataType::Struct(vec![
+            Field::new("xmin".into(), DataType::Float64),
+            Field::new("ymin".into(), DataType::Float64),
+            Field::new("xmax".into(), DataType::Float64),
+            Field::new("ymax".into(), DataType::Float64),
+        ]),
+    );
+
+    Ok(field.clone())
+}
+
+/// Compute the bounding box of each geometry in a Series, returning a
+/// struct of `xmin`, `ymin`, `xmax` and `ymax`. Null or empty geometries
+/// have NaN bounds.
+#[polars_expr(output_type_func=bounds_output_type)]
+fn unary_bounds(inputs: &[Series]) -> PolarsResult<Series> {
+    let array = unary_input(inputs)?;
+    let mut bounds: [Vec<f64>; 4] = Default::default();
+
+    for (g, ok) in array.iter() {
+        let rect = if ok { g.bounding_rect() } else { None };
+        let values = rect.map_or([f64::NAN; 4], |r| {
+            [r.min().x, r.min().y, r.max().x, r.max().y]
+        });
+
+        for (column, value) in bounds.iter_mut().zip(values) {
+            column.push(value);
+        }
+    }
+
+    let fields: Vec<Series> = ["xmin", "ymin", "xmax", "ymax"]
+        .into_iter()
+        .zip(bounds)
+        .map(|(name, values)| Float64Chunked::from_vec(name.into(), values).into_series())
+        .collect();
+
+    Ok(
+        StructChunked::from_series(inputs[0].name().clone(), fields[0].len(), fields.iter())?
+            .into_series(),
+    )
 }
 
 #[polars_expr(output_type=Binary)]
 fn unary_centroid(inputs: &[Series]) -> PolarsResult<Series> {
-    Ok(unary_input(inputs)?.centroid().to_wkb().into_series())
+    let mut builder = BinaryChunkedBuilder::new("".into(), inputs[0].len());
+
+    for c in unary_centroids(inputs)? {
+        match c {
+            Some((x, y)) => builder.append_value(wkbview::point_wkb(x, y)),
+            None => builder.append_null(),
+        }
+    }
+
+    Ok(builder.finish().into_series())
 }
 
 #[polars_expr(output_type=Binary)]
@@ -130,23 +519,68 @@ fn unary_explode_multipolygon(inputs: &[Series]) -> PolarsResult<Series> {
         .into_series())
 }
 
-#[polars_expr(output_type=String)]
-fn unary_pluscode(inputs: &[Series]) -> PolarsResult<Series> {
-    let proj = Proj::new_known_crs("EPSG:5070", "EPSG:4326", None).unwrap();
+thread_local! {
+    /// Transformer from CONUS Albers (EPSG:5070) to WGS84 (EPSG:4326).
+    ///
+    /// PROJ contexts cannot be shared between threads, so one transformer
+    /// is created lazily per thread and reused across plugin calls.
+    static ALBERS_TO_WGS84: Proj = Proj::new_known_crs("EPSG:5070", "EPSG:4326", None).unwrap();
+}
 
-    let result: StringChunked = unary_input(inputs)?
-        .centroid()
+/// Encode a chunk of EPSG:5070 centroids as plus codes.
+///
+/// Centroids are transformed to WGS84 with a single batched PROJ call.
+fn pluscode_chunk(centroids: &[Option<(f64, f64)>]) -> StringChunked {
+    let mut coords: Vec<Coord> = centroids
         .iter()
-        .map(|(g, ok)| {
-            if ok {
-                let pt: Point = g.convert().try_into().unwrap();
-                let latlon = pt.transformed(&proj).unwrap().x_y();
-                Some(open_location_code::encode(latlon.into(), 13))
-            } else {
-                None
-            }
-        })
+        .flatten()
+        .map(|&(x, y)| Coord { x, y })
         .collect();
 
+    ALBERS_TO_WGS84
+        .with(|proj| proj.convert_array(&mut coords).map(|_| ()))
+        .unwrap();
+
+    let mut lonlat = coords.into_iter();
+    centroids
+        .iter()
+        .map(|c| {
+            c.map(|_| {
+                let p = lonlat.next().unwrap();
+                open_location_code::encode(p.x_y().into(), 13)
+            })
+        })
+        .collect()
+}
+
+#[polars_expr(output_type=String)]
+fn unary_pluscode(inputs: &[Series]) -> PolarsResult<Series> {
+    let offsets = split_offsets(inputs[0].len(), POOL.current_num_threads());
+
+    let chunks: Vec<StringChunked> = POOL.install(|| {
+        offsets
+            .into_par_iter()
+            .map(|(offset, len)| {
+                let chunk = inputs[0].slice(offset as i64, len);
+                Ok(pluscode_chunk(&unary_centroids(&[chunk])?))
+            })
+            .collect::<PolarsResult<_>>()
+    })?;
+
+    let mut chunks = chunks.into_iter();
+    let mut result = chunks.next().unwrap();
+    for chunk in chunks {
+        result.append(&chunk)?;
+    }
+
     Ok(result.into_series())
 }
+
+/// Encode each geometry of a Series as WKB.
+#[polars_expr(output_type=Binary)]
+fn unary_to_wkb(inputs: &[Series]) -> PolarsResult<Series> {
+    match inputs[0].dtype() {
+        DataType::Binary => Ok(inputs[0].clone()),
+        _ => Ok(unary_input(inputs)?.to_wkb().into_series()),
+    }
+}
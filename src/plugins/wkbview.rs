@@ -0,0 +1,170 @@
+use geo::{Area, Centroid};
+use geo_traits::to_geo::ToGeoGeometry;
+use geo_traits::{
+    CoordTrait, GeometryTrait, GeometryType, LineStringTrait, MultiPointTrait, MultiPolygonTrait,
+    PointTrait, PolygonTrait,
+};
+use wkb::reader::{read_wkb, Wkb};
+
+/// Area and first moments of a polygonal geometry, relative to an origin.
+///
+/// Moments are weighted by unsigned area, so that the centroid of the
+/// geometry is `origin + (mx, my) / area`.
+#[derive(Default)]
+struct Moments {
+    area: f64,
+    mx: f64,
+    my: f64,
+}
+
+impl Moments {
+    fn ring(ring: &impl LineStringTrait<T = f64>, origin: (f64, f64)) -> Moments {
+        let (ox, oy) = origin;
+        let (mut a2, mut sx, mut sy) = (0.0, 0.0, 0.0);
+
+        // Rings in WKB are closed, so the closing segment back to the
+        // first coordinate contributes nothing unless a ring is open.
+        let first = ring.coords().next();
+        let next = ring.coords().skip(1).chain(first);
+        for (p, q) in ring.coords().zip(next) {
+            let (px, py) = (p.x() - ox, p.y() - oy);
+            let (qx, qy) = (q.x() - ox, q.y() - oy);
+            let cross = px * qy - qx * py;
+            a2 += cross;
+            sx += (px + qx) * cross;
+            sy += (py + qy) * cross;
+        }
+
+        let sign = a2.signum();
+        Moments {
+            area: a2.abs() / 2.0,
+            mx: sx * sign / 6.0,
+            my: sy * sign / 6.0,
+        }
+    }
+
+    fn polygon(polygon: &impl PolygonTrait<T = f64>, origin: (f64, f64)) -> Moments {
+        let mut moments = match polygon.exterior() {
+            Some(exterior) => Moments::ring(&exterior, origin),
+            None => return Moments::default(),
+        };
+
+        for interior in polygon.interiors() {
+            let hole = Moments::ring(&interior, origin);
+            moments.area -= hole.area;
+            moments.mx -= hole.mx;
+            moments.my -= hole.my;
+        }
+
+        moments
+    }
+
+    fn multipolygon(multipolygon: &impl MultiPolygonTrait<T = f64>, origin: (f64, f64)) -> Moments {
+        multipolygon
+            .polygons()
+            .map(|polygon| Moments::polygon(&polygon, origin))
+            .fold(Moments::default(), |acc, m| Moments {
+                area: acc.area + m.area,
+                mx: acc.mx + m.mx,
+                my: acc.my + m.my,
+            })
+    }
+
+    fn centroid(&self, origin: (f64, f64)) -> Option<(f64, f64)> {
+        if self.area > 0.0 {
+            Some((origin.0 + self.mx / self.area, origin.1 + self.my / self.area))
+        } else {
+            None
+        }
+    }
+}
+
+fn polygon_origin(polygon: &impl PolygonTrait<T = f64>) -> (f64, f64) {
+    polygon
+        .exterior()
+        .and_then(|ring| ring.coords().next().map(|c| (c.x(), c.y())))
+        .unwrap_or((0.0, 0.0))
+}
+
+/// Decode a WKB buffer into a borrowed view, or None if it is invalid.
+pub fn view(buf: &[u8]) -> Option<Wkb<'_>> {
+    read_wkb(buf).ok()
+}
+
+/// Fallback for geometry types without a borrowed fast path: decode
+/// into an owned `geo::Geometry`.
+fn owned(g: &Wkb<'_>) -> Option<geo::Geometry> {
+    g.try_to_geometry()
+}
+
+/// Unsigned area of a WKB geometry.
+pub fn area(g: &Wkb<'_>) -> Option<f64> {
+    match g.as_type() {
+        GeometryType::Point(_)
+        | GeometryType::MultiPoint(_)
+        | GeometryType::LineString(_)
+        | GeometryType::MultiLineString(_)
+        | GeometryType::Line(_) => Some(0.0),
+        GeometryType::Polygon(p) => Some(Moments::polygon(p, polygon_origin(p)).area),
+        GeometryType::MultiPolygon(mp) => {
+            let origin = mp
+                .polygons()
+                .next()
+                .map(|p| polygon_origin(&p))
+                .unwrap_or((0.0, 0.0));
+            Some(Moments::multipolygon(mp, origin).area)
+        }
+        _ => owned(g).map(|g| g.unsigned_area()),
+    }
+}
+
+/// Centroid coordinates of a WKB geometry, or None if it is empty.
+///
+/// Points, multipoints and polygons with a non-zero area are evaluated
+/// directly on the WKB buffer; anything else falls back to `geo`.
+pub fn centroid(g: &Wkb<'_>) -> Option<(f64, f64)> {
+    let fast = match g.as_type() {
+        GeometryType::Point(p) => return p.coord().map(|c| (c.x(), c.y())),
+        GeometryType::MultiPoint(mp) => {
+            let (mut n, mut x, mut y) = (0.0, 0.0, 0.0);
+            for c in mp.points().filter_map(|p| p.coord().map(|c| (c.x(), c.y()))) {
+                n += 1.0;
+                x += c.0;
+                y += c.1;
+            }
+
+            if n > 0.0 {
+                return Some((x / n, y / n));
+            }
+
+            return None;
+        }
+        GeometryType::Polygon(p) => {
+            let origin = polygon_origin(p);
+            Moments::polygon(p, origin).centroid(origin)
+        }
+        GeometryType::MultiPolygon(mp) => {
+            let origin = mp
+                .polygons()
+                .next()
+                .map(|p| polygon_origin(&p))
+                .unwrap_or((0.0, 0.0));
+            Moments::multipolygon(mp, origin).centroid(origin)
+        }
+        _ => None,
+    };
+
+    // Degenerate (zero area) polygons and other geometry types are
+    // handled by geo, which falls back to lower dimensional centroids.
+    fast.or_else(|| owned(g)?.centroid().map(|c| c.x_y()))
+}
+
+/// Encode a point as little-endian XY WKB.
+pub fn point_wkb(x: f64, y: f64) -> [u8; 21] {
+    let mut buf = [0u8; 21];
+    buf[0] = 1;
+    buf[1..5].copy_from_slice(&1u32.to_le_bytes());
+    buf[5..13].copy_from_slice(&x.to_le_bytes());
+    buf[13..21].copy_from_slice(&y.to_le_bytes());
+    buf
+}
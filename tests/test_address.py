@@ -0,0 +1,215 @@
+import itertools
+import polars as pl
+import pytest
+import random
+import re
+import sqlite3
+
+from bear.expr import AddressCache, normalize_address
+from bear.expr._correspondence import addr_normalize
+
+# Single line addresses as produced by the NAD, OpenAddresses and
+# OpenStreetMap providers (see `normalize_str`).
+ADDRESSES = [
+    "123 main street",
+    "123 main st",
+    "123 n main st",
+    "123 north main street apt 4",
+    "123 main street apartment 4",
+    "123 main street suite 200",
+    "456 e oak ave unit 2b",
+    "12 w 3rd st #5",
+    "12 main st #b-4",
+    "12 main st bldg a",
+    "9 e main street fl 2",
+    "12 main st lot 4",
+    "8 main st rm 12",
+    "8 e main st ph 3",
+    "22 oak ln ste 100",
+    "12 oak ct",
+    "5 old mill rd",
+    "123 mountain view dr",
+    "789 sw martin luther king jr blvd",
+    "1600 pennsylvania ave nw",
+    "77 n main st se",
+    "1 main st n",
+    "3 1st ave n",
+    "10 n 1st st",
+    "500 s 3rd ave",
+    "12 3 st",
+    "45 w 42 street",
+    "11 11 st",
+    "4 112 ave",
+    "100 county road 12",
+    "5 county rd 12 unit b",
+    "10 state hwy 9",
+    "44 us hwy 1",
+    "6 ave a",
+    "55 elm",
+    "7 broadway",
+    "201 s el camino real",
+    "123 e st",
+    "140 n. broadway ave. apt. 3c",
+    "12-14 main st",
+    "1 park pl",
+    "2 grand central ter",
+    "19 oak crescent",
+    "15 mt vernon st",
+    "21 st james pl",
+    "16 river rd bldg 5 apt 3",
+    "12 main st apt 3 bldg 5",
+    "12 main st apt 2 # 3",
+    "10 n 2nd st basement",
+    "14 park ave lower",
+    "310 n king st rear",
+    "12 main st apt 4 rear",
+    "500 w main st #",
+    "5 front st",
+    "7 hwy",
+    "123 main st apt",
+    "2 maple ave apt 2 fl 3",
+    "123 st",
+    "33 rr 2",
+    "77 interstate 10",
+    "1 sw la brea rm 3",
+    "12 ne st james se lot 7",
+    "5 ave of the americas",
+    "1 north lake shore pike east",
+    "12 ne 2 run s",
+    "12 2 run",
+    "3 apartment 4",
+    "12 n main apartment 4",
+    "main st",
+    "po box 12",
+    "",
+]
+
+
+def reference(address: str) -> str | None:
+    # The per-row normalization previously used when merging footprints
+    # and addresses.
+    for short, long in (
+        ("dr", "drive"),
+        ("st", "street"),
+        ("ct", "court"),
+        ("ln", "lane"),
+        ("ave", "avenue"),
+        ("rd", "road"),
+    ):
+        address = re.sub(f"\\s+{short}$", f" {long}", address)
+
+    return addr_normalize(address).strip() or None
+
+
+def normalize(addresses: list[str | None]) -> list[str | None]:
+    return (
+        pl.DataFrame({"address": addresses}, schema={"address": pl.String()})
+        .select(pl.col("address").pipe(normalize_address))
+        .to_series()
+        .to_list()
+    )
+
+
+@pytest.mark.parametrize("address", ADDRESSES)
+def test_normalize_address_parity(address: str):
+    assert normalize([address]) == [reference(address)]
+
+
+def test_normalize_address_generated():
+    # Combinations of the parts of line 1 and 2 that `addr_normalize`
+    # parses consistently. Its parser is statistical, so e.g. LA BREA or
+    # spelled out postdirectionals are tested as single cases above.
+    parts = itertools.product(
+        ["1", "12", "12-14"],
+        ["", "n", "ne", "w"],
+        [
+            "main",
+            "oak",
+            "cedar",
+            "2",
+            "42",
+            "martin luther king jr",
+            "old mill",
+        ],
+        [
+            "st",
+            "ave",
+            "rd",
+            "blvd",
+            "ln",
+            "ct",
+            "dr",
+            "pl",
+            "ter",
+            "cir",
+            "hwy",
+        ],
+        ["", "s", "se"],
+        [
+            "",
+            "apt 4",
+            "ste 100",
+            "unit b",
+            "# 5",
+            "bldg 2",
+            "lot 7",
+            "rm 3",
+            "apartment 4",
+        ],
+    )
+    addresses = [
+        " ".join(filter(None, p))
+        for p in random.Random(0).sample(list(parts), 500)
+    ]
+
+    assert normalize(addresses) == list(map(reference, addresses))
+
+
+def test_normalize_address_pike():
+    # PIKE is its own USPS long-hand form, where scourgify has PIKES
+    assert normalize(["12 main pike", "12 main pikes"]) == [
+        "12 MAIN PIKE",
+        "12 MAIN PIKE",
+    ]
+
+
+def test_normalize_address_column():
+    assert normalize([None, *ADDRESSES]) == [
+        None,
+        *map(reference, ADDRESSES),
+    ]
+
+
+def test_address_cache(tmp_path):
+    path = tmp_path / "addresses.sqlite"
+    addresses = pl.Series(["123 n main st", None, "55 elm", "123 n main st"])
+    expected = [
+        "123 NORTH MAIN STREET",
+        None,
+        "55 ELM",
+        "123 NORTH MAIN STREET",
+    ]
+
+    with AddressCache(path) as cache:
+        assert cache.normalize(addresses).to_list() == expected
+        assert (cache.hits, cache.misses) == (0, 2)
+
+    # Results of concurrent runs are appended to the same database
+    with AddressCache(path) as cache, AddressCache(path) as other:
+        assert cache.normalize(addresses).to_list() == expected
+        assert (cache.hits, cache.misses) == (2, 0)
+
+        assert other.normalize(pl.Series(["7 hwy", "55 elm"])).to_list() == [
+            "7 HIGHWAY",
+            "55 ELM",
+        ]
+        assert (other.hits, other.misses) == (1, 1)
+
+    # Results of other normalizer versions are not reused
+    with sqlite3.connect(path) as connection:
+        connection.execute("UPDATE addresses SET version = 0")
+    connection.close()
+
+    with AddressCache(path) as cache:
+        assert cache.normalize(addresses).to_list() == expected
+        assert (cache.hits, cache.misses) == (0, 2)
@@ -0,0 +1,68 @@
+import polars as pl
+
+from bear.expr._correspondence import (
+    sc_cluster_roots,
+    sc_match_indices,
+    sc_unmatched,
+)
+
+
+def test_unmatched():
+    evaluations = []
+
+    def evaluated(s: pl.Series) -> pl.Series:
+        evaluations.append(s.len())
+        return s
+
+    matched = pl.LazyFrame(
+        {"index_left": [0, 0, 2], "index_right": [1, 3, 3]},
+        schema={"index_left": pl.get_index_type(), "index_right": pl.UInt32},
+    ).with_columns(
+        pl.col("index_left").map_batches(
+            evaluated, return_dtype=pl.get_index_type()
+        )
+    )
+    left = pl.LazyFrame({"id": ["l0", "l1", "l2", "l3"]})
+    right = pl.LazyFrame({"id": ["r0", "r1", "r2", "r3"]})
+
+    # Matched pairs are evaluated once for the unmatched rows of both
+    # sides and the matched rows themselves.
+    matched = matched.cache()
+    indices = sc_match_indices(matched)
+    result = pl.concat(
+        (
+            matched.select(id=pl.format("{}-{}", "index_left", "index_right")),
+            sc_unmatched(left, indices, "index_left", ["id"]),
+            sc_unmatched(right, indices, "index_right", ["id"]),
+        ),
+        how="vertical",
+    ).collect()
+
+    assert result["id"].to_list() == [
+        *("0-1", "0-3", "2-3"),
+        *("l1", "l3"),
+        *("r0", "r2"),
+    ]
+    assert evaluations == [3]
+
+
+def test_cluster_roots():
+    # Datasets 0, 1 and 2 hold the geometries 0-1, 2-3 and 4-5
+    pairs = pl.LazyFrame(
+        {
+            "priority": [0, 0, 0, 0, 0, 1, 1],
+            "index_left": [0, 1, 0, 1, 0, 3, 2],
+            "index_right": [2, 2, 3, 3, 4, 4, 5],
+            "metric": [0.5, 0.9, 0.6, 0.6, 0.4, 0.8, 0.7],
+        },
+        schema_overrides={
+            "index_left": pl.get_index_type(),
+            "index_right": pl.get_index_type(),
+        },
+    )
+
+    # Geometries are anchored to their overlap of highest priority, then
+    # largest metric, then lowest index, and anchors are followed across
+    # datasets to the root of each cluster.
+    roots = sc_cluster_roots(pairs, 3).sort("index").collect()
+    assert roots.rows() == [(2, 1), (3, 0), (4, 0), (5, 1)]
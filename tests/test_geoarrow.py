@@ -0,0 +1,41 @@
+import polars as pl
+import shapely
+
+from bear.core import geoarrow
+
+
+def wkb(geometries) -> pl.Series:
+    return pl.Series(
+        "geometry", shapely.to_wkb(geometries).tolist(), dtype=pl.Binary()
+    )
+
+
+def test_geoarrow_points():
+    encoded = geoarrow.encode(wkb([shapely.Point(1, 2), None]))
+
+    assert encoded.name == "geometry"
+    assert encoded.dtype == geoarrow.POINT
+    assert encoded.to_list() == [{"x": 1.0, "y": 2.0}, None]
+
+
+def test_geoarrow_polygons():
+    polygon = shapely.box(0, 0, 1, 1)
+    multipolygon = shapely.MultiPolygon(
+        [shapely.box(2, 2, 3, 3), shapely.box(5, 5, 6, 6)]
+    )
+
+    encoded = geoarrow.encode(wkb([polygon, None, multipolygon]))
+
+    assert encoded.dtype == geoarrow.MULTIPOLYGON
+    assert encoded.null_count() == 1
+    assert encoded.list.len().to_list() == [1, None, 2]
+
+    ring = encoded[0][0][0]
+    assert len(ring) == 5
+    assert shapely.Polygon([(c["x"], c["y"]) for c in ring]).equals(polygon)
+
+
+def test_geoarrow_mixed():
+    geometry = wkb([shapely.Point(1, 2), shapely.box(0, 0, 1, 1)])
+
+    assert geoarrow.encode(geometry).dtype == pl.Binary()
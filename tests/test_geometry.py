@@ -0,0 +1,47 @@
+import polars as pl
+
+from bear.expr._geometry import hilbert, intersects_bbox
+
+
+def test_hilbert():
+    n = 8
+    cells = pl.DataFrame(
+        {
+            "x": [i + 0.5 for i in range(n) for _ in range(n)],
+            "y": [j + 0.5 for _ in range(n) for j in range(n)],
+        }
+    )
+
+    keyed = cells.with_columns(
+        key=hilbert(pl.col("x"), pl.col("y"), (0.0, 0.0, n, n), order=3)
+    ).sort("key")
+
+    # Every cell has its own key, and consecutive keys are neighbours
+    assert keyed["key"].to_list() == list(range(n * n))
+    steps = keyed.select(
+        pl.col("x").diff().abs() + pl.col("y").diff().abs()
+    ).to_series()
+    assert steps.drop_nulls().to_list() == [1.0] * (n * n - 1)
+
+    # Points outside of the bounds, or without coordinates, are clamped
+    outside = pl.DataFrame(
+        {"x": [-5.0, 100.0, float("nan")], "y": [-5.0, 0.5, float("nan")]}
+    )
+    keys = outside.select(
+        hilbert(pl.col("x"), pl.col("y"), (0.0, 0.0, n, n), order=3)
+    ).to_series()
+    assert keys.to_list() == [0, n * n - 1, 0]
+
+
+def test_intersects_bbox():
+    boxes = pl.DataFrame(
+        {
+            "xmin": [0.0, 10.0, 20.0],
+            "ymin": [0.0, 10.0, 20.0],
+            "xmax": [5.0, 15.0, 25.0],
+            "ymax": [5.0, 15.0, 25.0],
+        }
+    )
+
+    matched = boxes.filter(intersects_bbox((4.0, 4.0, 12.0, 12.0)))
+    assert matched["xmin"].to_list() == [0.0, 10.0]
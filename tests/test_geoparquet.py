@@ -0,0 +1,31 @@
+import json
+
+import polars as pl
+
+from bear.core import geoarrow, geoparquet, schema
+
+
+def test_metadata():
+    columns = pl.Schema(
+        {
+            "id": pl.String(),
+            "geometry": pl.Binary(),
+            "bbox": pl.Struct(schema.bbox),
+        }
+    )
+
+    geo = json.loads(geoparquet.metadata(columns, 5070)["geo"])
+    assert geo["version"] == "1.1.0"
+    assert geo["primary_column"] == "geometry"
+
+    column = geo["columns"]["geometry"]
+    assert column["encoding"] == "WKB"
+    assert column["crs"]["id"] == {"authority": "EPSG", "code": 5070}
+    assert column["covering"]["bbox"]["xmax"] == ["bbox", "xmax"]
+
+    # Without a covering column, or natively encoded
+    columns = pl.Schema({"geometry": geoarrow.MULTIPOLYGON})
+    geo = json.loads(geoparquet.metadata(columns, 5070)["geo"])
+    column = geo["columns"]["geometry"]
+    assert column["encoding"] == "multipolygon"
+    assert "covering" not in column
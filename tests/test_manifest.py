@@ -0,0 +1,33 @@
+from bear.core.manifest import Manifest
+
+
+def test_manifest(tmp_path):
+    osm = tmp_path / "osm.parquet"
+    nad = tmp_path / "nad.parquet"
+    osm.write_bytes(b"osm")
+    nad.write_bytes(b"nad")
+
+    path = tmp_path / "manifest" / "manifest.json"
+    assert Manifest.read(path) is None
+
+    inputs = {"openstreetmap": osm, "nad": nad}
+    manifest = Manifest.from_inputs(inputs, version=1, tile_size=None)
+    manifest.write(path)
+    assert Manifest.read(path) == manifest
+
+    # Changed contents, providers or parameters all change the manifest
+    assert Manifest.from_inputs(inputs, version=2, tile_size=None) != manifest
+    only_nad = Manifest.from_inputs({"nad": nad}, version=1, tile_size=None)
+    assert only_nad != manifest
+    assert manifest.select(["nad"]) == only_nad
+    nad.write_bytes(b"nad, refreshed")
+    assert Manifest.from_inputs(inputs, version=1, tile_size=None) != manifest
+
+    # Stamps identify the contents of the inputs in order, regardless of
+    # the parameters, and are None for missing inputs
+    stamp = manifest.stamp(["openstreetmap", "nad"])
+    assert stamp == manifest.select(inputs, version=3).stamp(
+        ["openstreetmap", "nad"]
+    )
+    assert stamp != manifest.stamp(["nad", "openstreetmap"])
+    assert manifest.stamp(["openstreetmap", "microsoft"]) is None
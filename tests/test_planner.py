@@ -0,0 +1,64 @@
+from bear.core.planner import (
+    ExecutionMode,
+    MAX_TILES,
+    MIN_TILE_HALOS,
+    ProviderSize,
+    estimate,
+    plan,
+    resident,
+)
+
+BOUNDS = (0.0, 0.0, 100_000.0, 100_000.0)
+HALO = 500.0
+SIZES = [
+    ProviderSize(1_000_000, nbytes=200_000_000, geometry_bytes=150_000_000),
+    ProviderSize(500_000, nbytes=50_000_000, geometry_bytes=0),
+]
+
+
+def test_plan_memory():
+    working_set = estimate(SIZES)
+    assert plan(SIZES, None, BOUNDS, HALO).mode == ExecutionMode.memory
+    result = plan(SIZES, working_set, BOUNDS, HALO)
+    assert result.mode == ExecutionMode.memory
+    assert result.tile_size is None
+    assert not result.checkpoint
+
+
+def test_plan_tiled():
+    # Half of the working set is left once inputs are resident
+    limit = resident(SIZES) + estimate(SIZES) // 2
+    result = plan(SIZES, limit, BOUNDS, HALO)
+    assert result.mode == ExecutionMode.tiled
+    # Four tiles, each within half of what is left
+    assert result.tile_size == 50_000.0
+
+    # A smaller requested tile size is kept
+    result = plan(SIZES, limit, BOUNDS, HALO, tile_size=10_000.0)
+    assert result.tile_size == 10_000.0
+
+    # Tiles evaluated concurrently share the budget
+    result = plan(SIZES, limit, BOUNDS, HALO, parallel=4)
+    assert result.tile_size == 25_000.0
+
+
+def test_plan_spill():
+    bounds = (0.0, 0.0, 20_000.0, 20_000.0)
+    result = plan(SIZES, 1 << 16, bounds, HALO)
+    assert result.mode == ExecutionMode.spill
+    assert result.tile_size == MIN_TILE_HALOS * HALO
+    assert result.checkpoint
+
+    # Large counties are split into at most `MAX_TILES` tiles
+    result = plan(SIZES, 1 << 16, BOUNDS, HALO)
+    assert result.mode == ExecutionMode.spill
+    assert (BOUNDS[2] / result.tile_size) ** 2 == MAX_TILES
+
+
+def test_plan_spill_resident():
+    # Inputs near the limit leave too little for any tile, even though
+    # the limit alone would allow a few large tiles.
+    for limit in (resident(SIZES) - 1, resident(SIZES) + (1 << 20)):
+        result = plan(SIZES, limit, BOUNDS, HALO)
+        assert result.mode == ExecutionMode.spill
+        assert result.checkpoint
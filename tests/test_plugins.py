@@ -0,0 +1,308 @@
+import polars as pl
+import pytest
+import shapely
+
+import bear._plugins as udf
+from bear.core import geoarrow
+from bear.expr._correspondence import multi_correspondence
+
+# The geometry plugins need the compiled extension (e.g. built by
+# `maturin develop`, as in CI), so these tests are skipped without it.
+pytestmark = pytest.mark.skipif(
+    not any(
+        path.suffix in {".so", ".pyd", ".dll"}
+        for path in udf.PLUGIN_PATH.iterdir()
+    ),
+    reason="geometry plugins are not built",
+)
+
+
+def wkb(geometries: list, n: int = 0) -> pl.Series:
+    # Padded with nulls to at least `n` rows, as the left and right
+    # operands of the aggregate plugins are columns of a single frame.
+    geometries = geometries + [None] * (n - len(geometries))
+    return pl.Series(shapely.to_wkb(geometries).tolist(), dtype=pl.Binary())
+
+
+def pairs(left: list, right: list) -> pl.DataFrame:
+    n = max(len(left), len(right))
+    return pl.DataFrame({"a": wkb(left, n), "b": wkb(right, n)})
+
+
+def test_overlaps():
+    left = [
+        shapely.box(0, 0, 10, 10),
+        shapely.box(20, 20, 30, 30),
+        shapely.box(100, 100, 110, 110),
+    ]
+    right = [
+        shapely.box(5, 0, 15, 10),
+        shapely.box(9, 9, 40, 40),
+        shapely.box(22, 22, 28, 28),
+        shapely.box(0, 0, 2, 2),
+    ]
+
+    threshold = 0.3
+    expected = {}
+    for i, a in enumerate(left):
+        for j, b in enumerate(right):
+            if not a.intersects(b):
+                continue
+
+            metric = a.intersection(b).area / min(a.area, b.area)
+            if metric > threshold:
+                expected[(i, j)] = metric
+
+    overlaps = pairs(left, right).select(
+        udf.overlaps("a", "b", threshold=threshold).struct.unnest()
+    )
+
+    actual = {
+        (row["index_left"], row["index_right"]): row["metric"]
+        for row in overlaps.iter_rows(named=True)
+    }
+
+    assert actual.keys() == expected.keys()
+    for pair, metric in expected.items():
+        assert actual[pair] == pytest.approx(metric)
+
+
+def test_area_and_centroid():
+    square = shapely.box(0, 0, 10, 10)
+    holed = shapely.Polygon(
+        [(0, 0), (10, 0), (10, 10), (0, 10)],
+        holes=[[(1, 1), (4, 1), (4, 4), (1, 4)]],
+    )
+    geometries = [
+        square,
+        # Clockwise exterior
+        shapely.Polygon([(0, 0), (0, 5), (20, 5), (20, 0)]),
+        holed,
+        shapely.MultiPolygon([holed, shapely.box(20, 20, 25, 30)]),
+        # Degenerate ring, whose centroid is that of its boundary
+        shapely.Polygon([(0, 0), (1, 1), (2, 2), (0, 0)]),
+        # Decoded into an owned geometry, without a borrowed fast path
+        shapely.GeometryCollection([square, shapely.Point(50, 50)]),
+        shapely.Point(3, 4),
+    ]
+
+    result = (
+        pl.DataFrame({"geometry": wkb(geometries)})
+        .select(
+            area=udf.area("geometry"),
+            centroid=udf.centroid_xy("geometry"),
+        )
+        .unnest("centroid")
+    )
+
+    centroids = shapely.get_coordinates(shapely.centroid(geometries))
+    assert result["area"].to_list() == pytest.approx(
+        shapely.area(geometries).tolist()
+    )
+    assert result["x"].to_list() == pytest.approx(centroids[:, 0].tolist())
+    assert result["y"].to_list() == pytest.approx(centroids[:, 1].tolist())
+
+
+def test_nearest_one():
+    left = [
+        # Equidistant from right rows 1 and 2, and tied on the lowest
+        shapely.Point(0, 0),
+        # Exactly `max_distance` from right row 3, which is excluded
+        shapely.Point(100, 0),
+        None,
+        shapely.Point(1, 2),
+    ]
+    right = [
+        None,
+        shapely.Point(3, 0),
+        shapely.Point(-3, 0),
+        shapely.Point(100, 10),
+    ]
+
+    nearest = (
+        pairs(left, right)
+        .select(udf.nearest_one("a", "b", max_distance=10.0))
+        .unnest("a")
+    )
+
+    assert nearest["index"].to_list() == [1, None, None, 1]
+    distances = nearest["distance"].to_list()
+    assert distances[1:3] == [None, None]
+    assert distances[0] == pytest.approx(shapely.distance(left[0], right[1]))
+    assert distances[3] == pytest.approx(shapely.distance(left[3], right[1]))
+
+
+def test_centroid_of_geoarrow_points():
+    points = wkb([shapely.Point(1, 2), shapely.Point(3, 4)])
+    frames = [
+        pl.DataFrame({"geometry": points}),
+        pl.DataFrame({"geometry": geoarrow.encode(points)}),
+    ]
+
+    wkb_result, geoarrow_result = (
+        df.select(
+            udf.centroid_x("geometry"),
+            udf.centroid_y("geometry").alias("y"),
+            xy=udf.centroid_xy("geometry"),
+        )
+        for df in frames
+    )
+
+    assert geoarrow_result.equals(wkb_result)
+    assert wkb_result.columns == ["geometry", "y", "xy"]
+
+
+def registered(token: str) -> bool:
+    point = wkb([shapely.Point(0, 0)]).to_frame("a")
+    try:
+        point.select(udf.nearest_broadcast("a", token=token))
+    except pl.exceptions.ComputeError:
+        return False
+
+    return True
+
+
+def test_broadcast_released():
+    geometry = wkb([shapely.Point(0, 0)])
+
+    with udf.broadcast(geometry) as token:
+        assert registered(token)
+
+    assert not registered(token)
+    # Releasing again reports that nothing was registered
+    assert pl.select(udf.broadcast_release(pl.lit(token))).item() is False
+
+    # Released as well when the body raises
+    with pytest.raises(ValueError):
+        with udf.broadcast(geometry) as token:
+            raise ValueError
+
+    assert not registered(token)
+
+
+def test_broadcast_matches_aggregate():
+    left = [
+        shapely.box(0, 0, 10, 10),
+        None,
+        shapely.box(20, 20, 30, 30),
+        shapely.Point(2, 1),
+        shapely.box(100, 100, 110, 110),
+    ]
+    right = [
+        shapely.box(5, 0, 15, 10),
+        shapely.box(9, 9, 40, 40),
+        None,
+        shapely.Point(2, 3),
+    ]
+
+    n = len(left)
+    df = pairs(left, right)
+    expected = df.select(
+        nearest=udf.nearest("a", "b"),
+        nearest_one=udf.nearest_one("a", "b"),
+    ).head(n)
+    aggregate = df.select(udf.overlaps("a", "b").struct.unnest())
+
+    with udf.broadcast(df["b"].head(len(right))) as token:
+        result = (
+            wkb(left)
+            .to_frame("a")
+            .select(
+                nearest=udf.nearest_broadcast("a", token=token),
+                nearest_one=udf.nearest_one_broadcast("a", token=token),
+                overlaps=udf.overlaps_broadcast("a", token=token),
+            )
+        )
+
+    assert result["nearest"].to_list() == expected["nearest"].to_list()
+    assert result["nearest_one"].to_list() == expected["nearest_one"].to_list()
+
+    overlaps = (
+        result.select("overlaps")
+        .with_row_index("index_left")
+        .unnest("overlaps")
+        .explode("index_right", "metric")
+        .drop_nulls()
+    )
+    assert {(i, j): m for i, j, m in overlaps.rows()} == pytest.approx(
+        {(i, j): m for i, j, m in aggregate.rows()}
+    )
+
+
+def footprints(provider: str, geometries: list, **attrs) -> pl.DataFrame:
+    n = len(geometries)
+    return pl.DataFrame(
+        {
+            "id": [f"{provider}{i}" for i in range(n)],
+            "provider": provider,
+            "classification": attrs.get("classification", [None] * n),
+            "address": attrs.get("address", [None] * n),
+            "height": attrs.get("height", [None] * n),
+            "levels": attrs.get("levels", [None] * n),
+            "geometry": wkb(geometries),
+        },
+        schema_overrides={
+            "classification": pl.String(),
+            "address": pl.String(),
+            "height": pl.Float64(),
+            "levels": pl.Int64(),
+        },
+    )
+
+
+@pytest.mark.parametrize("streamed", [False, True])
+def test_multi_correspondence(streamed: bool):
+    frames = [
+        footprints(
+            "a",
+            [shapely.box(0, 0, 10, 10), shapely.box(100, 100, 110, 110)],
+        ),
+        footprints(
+            "b",
+            [
+                # Overlaps a0 by half
+                shapely.box(5, 0, 15, 10),
+                # Within a1
+                shapely.box(101, 101, 109, 109),
+                shapely.box(50, 50, 60, 60),
+            ],
+            height=[8.0, 3.0, None],
+        ),
+        footprints(
+            "c",
+            [
+                # Overlaps b0 only, so is clustered with a0 through b0
+                shapely.box(9, 0, 19, 10),
+                # Overlaps both a1 and b1, and is anchored to a1
+                shapely.box(100, 100, 110, 110),
+                shapely.box(200, 200, 210, 210),
+            ],
+            height=[4.0, 6.0, 2.0],
+        ),
+    ]
+
+    lfs = [df.lazy() for df in frames]
+    if streamed:
+        geometry = pl.concat([df["geometry"] for df in frames])
+        with udf.broadcast(geometry) as token:
+            result = multi_correspondence(lfs, broadcast=token).collect()
+    else:
+        result = multi_correspondence(lfs).collect()
+
+    clusters = {
+        row["id"]: (
+            row["provider"],
+            sorted(f["key"] for f in row["foreign"]),
+            row["height"],
+        )
+        for row in result.iter_rows(named=True)
+    }
+
+    # Clusters take the id of their highest priority member, and each
+    # attribute from the first member providing it.
+    assert clusters == {
+        "a0": ("a", ["b0", "c0"], 8.0),
+        "a1": ("a", ["b1", "c1"], 3.0),
+        "b2": ("b", [], None),
+        "c2": ("c", [], 2.0),
+    }
@@ -0,0 +1,37 @@
+import json
+
+from bear.core.profile import Profiler
+
+
+def test_profiler_report(tmp_path):
+    profiler = Profiler(True, workflow="conflate", fips="01001")
+
+    with profiler.stage("perform_merge", rows_in=10) as stage:
+        stage.rows_out = 4
+
+    with profiler.stage("write_entities", rows_in=4):
+        pass
+
+    profiler.write(tmp_path)
+
+    report = json.loads((tmp_path / "report.json").read_text())
+    assert report["context"] == {"workflow": "conflate", "fips": "01001"}
+    assert [
+        (s["name"], s["rows_in"], s["rows_out"]) for s in report["stages"]
+    ] == [("perform_merge", 10, 4), ("write_entities", 4, None)]
+    assert all(s["max_rss"] > 0 for s in report["stages"])
+    # The high-water mark is cumulative across stages
+    first, second = report["stages"]
+    assert second["max_rss"] >= first["max_rss"]
+    assert second["max_rss"] - second["max_rss_growth"] >= first["max_rss"]
+    assert "perform_merge" in (tmp_path / "report.html").read_text()
+
+
+def test_profiler_disabled(tmp_path):
+    profiler = Profiler()
+    with profiler.stage("perform_merge"):
+        pass
+
+    profiler.write(tmp_path / "profile")
+    assert profiler.stages == []
+    assert not (tmp_path / "profile").exists()
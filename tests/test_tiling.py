@@ -0,0 +1,87 @@
+import polars as pl
+
+from bear.expr._tiling import TileGrid, _centroids, tiled
+
+
+def test_tile_grid():
+    grid = TileGrid((0.0, 0.0, 250.0, 100.0), size=100.0, halo=10.0)
+    assert grid.shape == (3, 1)
+    assert len(grid) == 3
+
+    points = pl.DataFrame(
+        {
+            "x": [5.0, 95.0, 105.0, 240.0, -50.0, 400.0],
+            "y": [50.0, 50.0, 50.0, 50.0, 50.0, 500.0],
+        }
+    )
+
+    # Points outside of the bounds belong to the nearest edge tile
+    tiles = points.select(grid.tile(pl.col("x"), pl.col("y"))).to_series()
+    assert tiles.to_list() == [0, 0, 1, 2, 0, 2]
+
+    # Points near a tile boundary are also covered by the neighbour
+    covers = [
+        points.select(grid.covers(tile, pl.col("x"), pl.col("y")))
+        .to_series()
+        .to_list()
+        for tile in range(len(grid))
+    ]
+
+    assert covers == [
+        [True, True, True, False, True, False],
+        [False, True, True, False, False, False],
+        [False, False, False, True, False, True],
+    ]
+
+    # Partitioning rows at once agrees with filtering them per tile
+    df = points.with_row_index("row")
+    rows = grid.rows(points)
+    assert rows.keys() == {0, 1, 2}
+    for tile, covered in enumerate(covers):
+        assert df[rows[tile]].equals(df.filter(covered))
+
+
+def test_centroids_from_derived_columns():
+    grid = TileGrid((0.0, 0.0, 100.0, 100.0), size=50.0)
+    df = pl.DataFrame(
+        {
+            "geometry": [b"", None],
+            "cx": [75.0, float("nan")],
+            "cy": [25.0, float("nan")],
+        }
+    )
+
+    # Derived centroids are used as is, without parsing geometries
+    assert _centroids(df, grid).rows() == [(75.0, 25.0), (0.0, 0.0)]
+
+
+def test_tiled():
+    grid = TileGrid((0.0, 0.0, 300.0, 100.0), size=100.0, halo=10.0)
+    frames = [
+        pl.DataFrame(
+            {
+                "provider": provider,
+                "id": [f"{provider}{i}" for i in range(len(cx))],
+                "geometry": [b""] * len(cx),
+                "cx": cx,
+                "cy": 50.0,
+            }
+        )
+        for provider, cx in (
+            ("a", [5.0, 95.0, 150.0]),
+            ("b", [105.0, 295.0]),
+        )
+    ]
+
+    def union(*lfs: pl.LazyFrame) -> pl.LazyFrame:
+        return pl.concat(lfs, how="vertical").select("provider", "id")
+
+    # Rows seen through a halo are only output by their home tile
+    result = tiled(union, frames, grid, max_parallel=2)
+    assert sorted(result.rows()) == [
+        ("a", "a0"),
+        ("a", "a1"),
+        ("a", "a2"),
+        ("b", "b0"),
+        ("b", "b1"),
+    ]